@@ -9,7 +9,18 @@ import logging
 from datetime import datetime, timezone
 from flask import Flask, render_template, request, jsonify, session
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 import pytz
+from team_resolver import init_team_resolver, team_ids_from_matches
+from event_bus import get_event_bus, PICK_CHANGED
+from pick_scoring import score_picks
+from standings_history import get_standings_history, record_completed_weeks
+from leaderboard import get_leaderboard_rows
+from data_version import VersionedCache, bump_data_version, STANDINGS
+from job_queue import JobQueue
+from job_api_endpoints import register_job_endpoints
+from pick_api_endpoints import register_pick_endpoints
+from sqlite_connection import get_database_url, register_sqlite_pragmas
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,10 +30,8 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'nfl_pickem_2025_secret_key_very_secure')
 
-# Database configuration
-database_url = os.environ.get('DATABASE_URL', f'sqlite:///{os.path.abspath("nfl_pickem_robust.db")}')
-if database_url.startswith('postgres://'):
-    database_url = database_url.replace('postgres://', 'postgresql://', 1)
+# Database configuration (same URL the raw-sqlite validator resolves its file from)
+database_url = get_database_url()
 
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -30,6 +39,10 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 # Initialize database
 db = SQLAlchemy(app)
 
+# WAL mode and busy timeout for the ORM connections too (SQLite only)
+with app.app_context():
+    register_sqlite_pragmas(db.engine)
+
 # Vienna timezone
 VIENNA_TZ = pytz.timezone('Europe/Vienna')
 
@@ -59,6 +72,9 @@ class Match(db.Model):
     is_completed = db.Column(db.Boolean, default=False)
     source = db.Column(db.String(50), default='nfl_official')
     last_sync = db.Column(db.String(50))
+    sync_fingerprint = db.Column(db.String(64))  # Hash of the last synced provider payload
+    espn_event_id = db.Column(db.String(20), unique=True, index=True)  # ESPN event id
+    sportsdata_game_key = db.Column(db.String(20), unique=True, index=True)  # SportsData.io GameKey
     created_at = db.Column(db.String(50), default=lambda: datetime.now().isoformat())
 
 class HistoricalPick(db.Model):
@@ -93,6 +109,15 @@ class TeamUsage(db.Model):
     user = db.relationship('User', backref='team_usage')
     match = db.relationship('Match', backref='team_usage')
 
+class TeamAlias(db.Model):
+    __tablename__ = 'team_aliases'
+    __table_args__ = (db.UniqueConstraint('alias_type', 'alias_value'),)
+    id = db.Column(db.Integer, primary_key=True)
+    alias_type = db.Column(db.String(20), nullable=False)  # 'espn_id', 'sportsdata', 'abbreviation', 'display_name', ...
+    alias_value = db.Column(db.String(100), nullable=False)  # normalized (lowercase)
+    abbreviation = db.Column(db.String(5), nullable=False)  # canonical team abbreviation
+    team_id = db.Column(db.Integer)  # database team id, if known
+
 # Legacy Pick model for current week picks
 class Pick(db.Model):
     __tablename__ = 'picks'
@@ -102,10 +127,42 @@ class Pick(db.Model):
     chosen_team_id = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.String(50), default=lambda: datetime.now().isoformat())
     is_correct = db.Column(db.Boolean)
+    points_earned = db.Column(db.Integer)  # Stored by pick_scoring, NULL until the match is final
     
     user = db.relationship('User', backref='picks')
     match = db.relationship('Match', backref='picks')
 
+# Standings after each completed week (appended by the scoring pipeline)
+class StandingsHistory(db.Model):
+    __tablename__ = 'standings_history'
+    __table_args__ = (db.Index('ix_standings_history_week_user', 'week', 'user_id', unique=True),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    week = db.Column(db.Integer, nullable=False)
+    points = db.Column(db.Integer, nullable=False)  # cumulative through this week
+    rank = db.Column(db.Integer, nullable=False)
+    delta = db.Column(db.Integer)  # previous rank - rank (positive = moved up), NULL in the first week
+    created_at = db.Column(db.String(50), default=lambda: datetime.now().isoformat())
+
+# Global change counters (see data_version.py) - bumped by scoring and pick writes
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.String(50))
+
+# Per-worker caches, rebuilt when the standings data version changes
+leaderboard_cache = VersionedCache(STANDINGS)
+standings_history_cache = VersionedCache(STANDINGS)
+
+# Durable job queue - the web tier only enqueues syncs, sync_worker.py runs them
+with app.app_context():
+    job_queue = JobQueue(db.engine)
+register_job_endpoints(app, job_queue)
+
+# Pick validation, available teams and the season pick history (/api/picks/history)
+register_pick_endpoints(app)
+
 # Helper functions
 def convert_to_vienna_time(utc_time):
     """Convert UTC time to Vienna timezone"""
@@ -277,7 +334,9 @@ def create_pick():
             )
             db.session.add(new_pick)
         
+        bump_data_version(db.session)
         db.session.commit()
+        get_event_bus().publish(PICK_CHANGED, user_id=user_id, match_id=match_id, week=match.week)
         
         logger.info(f"✅ Pick saved: User {user_id} picked {chosen_team_name} for match {match_id}")
         
@@ -308,10 +367,10 @@ def get_dashboard():
         # Get user picks
         picks = Pick.query.filter_by(user_id=user_id).all()
         
-        # Calculate stats
+        # Calculate stats from the stored scoring columns
         total_picks = len(picks)
         correct_picks = len([p for p in picks if p.is_correct])
-        points = correct_picks
+        points = sum(p.points_earned or 0 for p in picks)
         
         # Get current week (simplified to 3 for now)
         current_week = 3
@@ -353,39 +412,54 @@ def get_dashboard():
 
 @app.route('/api/leaderboard')
 def get_leaderboard():
-    """Get leaderboard data"""
+    """Get leaderboard data (?top=N, ?around=me&radius=2 - ranked and sliced in SQL)"""
     try:
-        users = User.query.all()
-        leaderboard = []
-        
-        for user in users:
-            picks = Pick.query.filter_by(user_id=user.id).all()
-            correct_picks = len([p for p in picks if p.is_correct])
-            total_picks = len(picks)
-            
-            leaderboard.append({
-                'username': user.username,
-                'points': correct_picks,
-                'total_picks': total_picks,
-                'correct_picks': correct_picks
-            })
-        
-        # Sort by points descending
-        leaderboard.sort(key=lambda x: x['points'], reverse=True)
-        
-        # Add rankings
-        for i, player in enumerate(leaderboard):
-            player['rank'] = i + 1
+        top = request.args.get('top', type=int)
+        radius = request.args.get('radius', default=2, type=int)
+        around_user_id = session.get('user_id') if request.args.get('around') == 'me' else None
+        
+        rows = leaderboard_cache.get(
+            db.session, ('leaderboard', top, around_user_id, radius),
+            lambda: get_leaderboard_rows(db, User, Pick, Match, top=top, around_user_id=around_user_id, radius=radius)
+        )
+        
+        leaderboard = [{
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'points': row['points'],
+            'total_picks': row['total_picks'],
+            'correct_picks': row['correct_picks'],
+            'rank': row['rank'],
+            'position': row['position'],
+            'is_me': row['user_id'] == session.get('user_id')
+        } for row in rows]
         
         return jsonify({
             'success': True,
-            'leaderboard': leaderboard
+            'leaderboard': leaderboard,
+            'total_users': rows[0]['total_users'] if rows else 0
         })
         
     except Exception as e:
         logger.error(f"❌ Leaderboard error: {str(e)}")
         return jsonify({'success': False, 'message': 'Fehler beim Laden des Leaderboards'})
 
+@app.route('/api/leaderboard/history')
+def get_leaderboard_history():
+    """Points and rank per user and completed week (season chart)"""
+    try:
+        from_week = request.args.get('from_week', type=int)
+        to_week = request.args.get('to_week', type=int)
+        history = standings_history_cache.get(
+            db.session, ('history', from_week, to_week),
+            lambda: get_standings_history(db, StandingsHistory, User, from_week=from_week, to_week=to_week)
+        )
+        return jsonify({'success': True, **history})
+        
+    except Exception as e:
+        logger.error(f"❌ Leaderboard history error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Fehler beim Laden des Verlaufs'})
+
 @app.route('/api/all-picks')
 def get_all_picks():
     """Get all picks from all users"""
@@ -424,19 +498,74 @@ def get_all_picks():
         logger.error(f"❌ All picks error: {str(e)}")
         return jsonify({'success': False, 'message': 'Fehler beim Laden aller Picks'})
 
+# Columns added after the first deployment - db.create_all() does not alter existing tables
+SCHEMA_UPGRADES = {
+    'matches': {
+        'sync_fingerprint': 'VARCHAR(64)',
+        'espn_event_id': 'VARCHAR(20)',
+        'sportsdata_game_key': 'VARCHAR(20)'
+    },
+    'picks': {
+        'points_earned': 'INTEGER'
+    }
+}
+
+# Unique indexes for upgraded columns (same names as create_all uses)
+SCHEMA_UNIQUE_INDEXES = {
+    'matches': ['espn_event_id', 'sportsdata_game_key']
+}
+
+def upgrade_schema():
+    """Add columns that are missing in existing databases (returns the added 'table.column' names)"""
+    inspector = inspect(db.engine)
+    added = []
+    
+    for table_name, columns in SCHEMA_UPGRADES.items():
+        if not inspector.has_table(table_name):
+            continue
+        
+        existing_columns = {column['name'] for column in inspector.get_columns(table_name)}
+        for column_name, column_type in columns.items():
+            if column_name not in existing_columns:
+                db.session.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}'))
+                logger.info(f"✅ Added column {table_name}.{column_name}")
+                added.append(f"{table_name}.{column_name}")
+    
+    for table_name, columns in SCHEMA_UNIQUE_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        
+        for column_name in columns:
+            db.session.execute(text(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS ix_{table_name}_{column_name} ON {table_name} ({column_name})'
+            ))
+    
+    db.session.commit()
+    return added
+
 # Initialize database
 def init_db():
     """Initialize database with tables and sample data"""
     with app.app_context():
         db.create_all()
+        added_columns = upgrade_schema()
+        # Team ids as stored on the matches, so team_aliases.team_id matches match/pick team ids
+        init_team_resolver(db, TeamAlias, team_ids_from_matches(db, Match))
+        
+        # Backfill stored points once for databases scored before points_earned existed
+        if 'picks.points_earned' in added_columns:
+            score_picks(db, Match, Pick)
+        
+        # Snapshot completed weeks that have no standings yet (new table or missed events)
+        record_completed_weeks(db, Match, Pick, User, StandingsHistory)
         
         # Check if users exist
         if User.query.count() == 0:
             users = [
-                User(username='Manuel', password='Manuel1'),
-                User(username='Daniel', password='Daniel1'),
-                User(username='Raff', password='Raff1'),
-                User(username='Haunschi', password='Haunschi1')
+                User(username='Manuel', password_hash='Manuel1', display_name='Manuel'),
+                User(username='Daniel', password_hash='Daniel1', display_name='Daniel'),
+                User(username='Raff', password_hash='Raff1', display_name='Raff'),
+                User(username='Haunschi', password_hash='Haunschi1', display_name='Haunschi')
             ]
             for user in users:
                 db.session.add(user)
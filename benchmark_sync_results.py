@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ESPN result matching
+Runs ESPNDataSync.sync_results on a multi-season matches table seeded through the app models
+and compares it with the old per-result scan of the week's matches (same models, same results)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+import pytz
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+# app.py reads DATABASE_URL at import time - benchmark on a throwaway SQLite file, never the real database
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='nfl_pickem_benchmark_'), 'benchmark.db')}"
+
+from sqlalchemy import event
+
+from app import app, db, init_db, Match, TeamAlias
+from espn_data_sync import ESPNDataSync
+from team_resolver import NFL_TEAMS, get_team_resolver
+
+VIENNA_TZ = pytz.timezone('Europe/Vienna')
+ESPN_ID_BY_ABBR = {abbreviation: espn_id for abbreviation, espn_id, _ in NFL_TEAMS}
+
+
+class BenchmarkESPNClient:
+    """Serves prepared ESPN results instead of calling the API"""
+
+    def __init__(self, results_by_week):
+        self.results_by_week = results_by_week
+
+    def get_game_results(self, week, season=2024):
+        return self.results_by_week.get(week, [])
+
+
+class LegacyESPNDataSync(ESPNDataSync):
+    """
+    sync_results before the hash-join: the week's matches are loaded again for every result and
+    each match's teams are looked up one by one (the team_aliases rows stand in for the old Team rows)
+    """
+
+    def _abbreviation(self, team_id):
+        alias = self.TeamAlias.query.filter_by(alias_type='abbreviation', team_id=team_id).first()
+        return alias.abbreviation if alias else None
+
+    def sync_results(self, week, dry_run=False):
+        espn_results = self.espn_client.get_game_results(week=week)
+
+        with self.app.app_context():
+            updated = 0
+            for espn_result in espn_results:
+                for m in self.Match.query.filter_by(week=week).all():
+                    home_team_abbr = self._map_espn_team_id(espn_result.get('home_team_id', ''))
+                    away_team_abbr = self._map_espn_team_id(espn_result.get('away_team_id', ''))
+
+                    if self._abbreviation(m.home_team_id) == home_team_abbr and self._abbreviation(m.away_team_id) == away_team_abbr:
+                        fingerprint = self._game_fingerprint(espn_result)
+                        if m.sync_fingerprint == fingerprint:
+                            break
+
+                        m.is_completed = True
+                        m.home_score = espn_result['home_score']
+                        m.away_score = espn_result['away_score']
+                        winner = self.TeamAlias.query.filter_by(
+                            alias_type='abbreviation', abbreviation=self._map_espn_team_id(espn_result['winner_team_id'])
+                        ).first()
+                        if winner:
+                            m.winner_team_id = winner.team_id
+                        m.sync_fingerprint = fingerprint
+                        updated += 1
+                        break
+
+            if updated:
+                self.db.session.commit()
+            self.last_sync_stats = {'created': 0, 'updated': updated, 'unchanged': len(espn_results) - updated}
+            return True
+
+
+def seed_matches(seasons, weeks, games_per_week=16):
+    """
+    Regular seasons up to 2025 through the Match model - earlier seasons are final and linked to ESPN events
+
+    Returns:
+        Dict[int, List[Dict]]: ESPN-style results of the open 2025 season per week
+    """
+    teams = get_team_resolver().teams()
+    rng = random.Random(2025)
+    results_by_week = {}
+    matches = []
+
+    for season in range(2025 - seasons + 1, 2026):
+        kickoff = VIENNA_TZ.localize(datetime(season, 9, 7, 19, 0))
+        for week in range(1, weeks + 1):
+            abbreviations = sorted(teams)
+            rng.shuffle(abbreviations)
+            for game in range(games_per_week):
+                home, away = teams[abbreviations[2 * game]], teams[abbreviations[2 * game + 1]]
+                home_score, away_score = rng.randint(0, 45), rng.randint(0, 45)
+                espn_id = f"{season}{week:02d}{game:02d}"
+                completed = season < 2025
+
+                matches.append(Match(
+                    week=week, home_team_id=home.id, home_team_name=home.name, away_team_id=away.id,
+                    away_team_name=away.name, start_time=(kickoff + timedelta(weeks=week - 1)).isoformat(),
+                    is_completed=completed, home_score=home_score if completed else None,
+                    away_score=away_score if completed else None, espn_event_id=espn_id, source='espn'
+                ))
+                if not completed:
+                    winner = home if home_score > away_score else away if away_score > home_score else None
+                    results_by_week.setdefault(week, []).append({
+                        'espn_id': espn_id,
+                        'week': week,
+                        'home_team_id': ESPN_ID_BY_ABBR[home.abbreviation],
+                        'away_team_id': ESPN_ID_BY_ABBR[away.abbreviation],
+                        'start_time': kickoff + timedelta(weeks=week - 1),
+                        'is_completed': True,
+                        'winner_team_id': ESPN_ID_BY_ABBR[winner.abbreviation] if winner else None,
+                        'home_score': home_score,
+                        'away_score': away_score
+                    })
+
+    db.session.add_all(matches)
+    db.session.commit()
+    return results_by_week
+
+
+def reset_open_season(season_start):
+    """Clear the results of the benchmarked season, so every run writes the same rows"""
+    Match.query.filter(Match.start_time >= season_start).update({
+        'is_completed': False, 'home_score': None, 'away_score': None,
+        'winner_team_id': None, 'sync_fingerprint': None
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def timed_sync(sync, weeks):
+    """Run sync_results for every week - (games updated, SQL statements, seconds)"""
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        updated = 0
+        start = time.perf_counter()
+        for week in weeks:
+            sync.sync_results(week)
+            updated += sync.last_sync_stats['updated']
+        return updated, queries[0], time.perf_counter() - start
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+
+def run_benchmark(seasons, weeks):
+    init_db()
+    with app.app_context():
+        results_by_week = seed_matches(seasons, weeks)
+        match_count = Match.query.count()
+        season_start = VIENNA_TZ.localize(datetime(2025, 9, 1)).isoformat()
+
+        print(f"Seeded {seasons} seasons, {match_count} matches - syncing {weeks} weeks of season 2025")
+        print(f"{'':12} {'updated':>8} {'queries':>8} {'seconds':>9}")
+
+        for label, sync_class in (('legacy', LegacyESPNDataSync), ('hash-join', ESPNDataSync)):
+            reset_open_season(season_start)
+            sync = sync_class(app, db)
+            sync.espn_client = BenchmarkESPNClient(results_by_week)
+            updated, queries, seconds = timed_sync(sync, sorted(results_by_week))
+            print(f"{label:12} {updated:>8} {queries:>8} {seconds:>9.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark ESPN result matching on the app models')
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--weeks', type=int, default=18)
+    args = parser.parse_args()
+    run_benchmark(args.seasons, args.weeks)
@@ -5,12 +5,14 @@ Complete historical matches for Woche 1 & 2 with real NFL results
 
 from app import app, db, Team, Match
 from datetime import datetime
+from team_resolver import get_team_resolver
 
 def complete_historical_matches():
     with app.app_context():
-        # Get teams by searching for partial names
+        # Get teams by nickname via the team resolver
         def find_team(name_part):
-            return Team.query.filter(Team.name.contains(name_part)).first()
+            abbreviation = get_team_resolver().resolve(name_part)
+            return Team.query.filter_by(abbreviation=abbreviation).first() if abbreviation else None
             
         # Real NFL results for Woche 1 & 2
         historical_results = [
@@ -0,0 +1,111 @@
+"""
+Data Version for NFL PickEm 2025
+Global change counter in the database - lets every worker cache leaderboards until scoring or picks change
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Counter bumped by scoring and pick writes (leaderboard, standings history)
+STANDINGS = 'standings'
+
+# Named parameters - the same statements work with SQLAlchemy text() and sqlite3
+CREATE_DATA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name VARCHAR(50) PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at VARCHAR(50)
+    )
+"""
+BUMP_DATA_VERSION = """
+    INSERT INTO data_versions (name, version, updated_at) VALUES (:name, 1, :updated_at)
+    ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1, updated_at = :updated_at
+"""
+READ_DATA_VERSION = "SELECT version FROM data_versions WHERE name = :name"
+
+
+def _bump_params(name):
+    return {'name': name, 'updated_at': datetime.now().isoformat()}
+
+
+def bump_data_version(session, name=STANDINGS):
+    """Increment the counter inside the caller's transaction (commits with the data it describes)"""
+    session.execute(text(BUMP_DATA_VERSION), _bump_params(name))
+
+
+def bump_sqlite_data_version(conn, name=STANDINGS):
+    """bump_data_version() for raw sqlite3 connections"""
+    conn.execute(BUMP_DATA_VERSION, _bump_params(name))
+
+
+def read_data_version(session, name=STANDINGS):
+    """Current counter value (0 before the first bump, None if the table is unavailable)"""
+    try:
+        version = session.execute(text(READ_DATA_VERSION), {'name': name}).scalar()
+        return version or 0
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read data version {name}: {e}")
+        session.rollback()
+        return None
+
+
+class VersionedCache:
+    """Per-process cache that is dropped whenever the global data version changes"""
+
+    def __init__(self, name=STANDINGS, check_interval=None, max_entries=256):
+        """
+        Args:
+            check_interval: Seconds between version reads (0 = one read per request);
+                            default from DATA_VERSION_CHECK_SECONDS
+        """
+        if check_interval is None:
+            check_interval = float(os.environ.get('DATA_VERSION_CHECK_SECONDS', 0))
+        self.name = name
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._entries = {}
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _current_version(self, session):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._version
+
+        version = read_data_version(session, self.name)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+        return version
+
+    def get(self, session, key, build):
+        """Cached value for key, rebuilt with build() after the data version changed"""
+        version = self._current_version(session)
+        if version is None:
+            return build()
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+
+        value = build()
+        with self._lock:
+            if self._version == version:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                self._entries[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = None
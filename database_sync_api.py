@@ -3,21 +3,20 @@ NFL PickEm Database Sync API
 Provides endpoints for real-time database synchronization
 """
 
-import sqlite3
 import json
 import os
 from datetime import datetime
 from flask import Blueprint, jsonify, request, send_file
 import tempfile
 import zipfile
+from sqlite_connection import get_connection_manager
 
 # Create blueprint for database sync
 db_sync_bp = Blueprint('db_sync', __name__)
 
 def get_database_path():
-    """Get the database path dynamically"""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(current_dir, 'instance', 'nfl_pickem.db')
+    """Get the database path (shared with the game validator)"""
+    return get_connection_manager().db_path
 
 @db_sync_bp.route('/api/database/export', methods=['GET'])
 def export_database():
@@ -28,8 +27,7 @@ def export_database():
         if not os.path.exists(db_path):
             return jsonify({'error': 'Database not found'}), 404
         
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection_manager().connection()
         cursor = conn.cursor()
         
         # Export all tables
@@ -55,7 +53,7 @@ def export_database():
             for row in rows:
                 export_data['tables'][table_name].append(dict(row))
         
-        conn.close()
+        get_connection_manager().release(conn)
         
         return jsonify(export_data)
         
@@ -71,6 +69,9 @@ def download_database():
         if not os.path.exists(db_path):
             return jsonify({'error': 'Database not found'}), 404
         
+        # Include pending WAL pages in the downloaded file
+        get_connection_manager().checkpoint()
+        
         return send_file(
             db_path,
             as_attachment=True,
@@ -91,6 +92,9 @@ def create_backup_package():
         if not os.path.exists(db_path):
             return jsonify({'error': 'Database not found'}), 404
         
+        # Include pending WAL pages in the packaged file
+        get_connection_manager().checkpoint()
+        
         # Create temporary zip file
         temp_dir = tempfile.mkdtemp()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -132,14 +136,14 @@ def database_status():
         if not os.path.exists(db_path):
             return jsonify({'error': 'Database not found'}), 404
         
-        conn = sqlite3.connect(db_path)
+        conn = get_connection_manager().connection()
         cursor = conn.cursor()
         
         # Get statistics
         stats = {}
         
         # Count records in each table
-        tables = ['user', 'team', 'match', 'pick', 'eliminated_team', 'team_winner_usage']
+        tables = ['users', 'matches', 'picks', 'team_usage', 'historical_picks', 'team_aliases']
         for table in tables:
             try:
                 cursor.execute(f"SELECT COUNT(*) FROM {table}")
@@ -148,21 +152,21 @@ def database_status():
                 stats[f'{table}_count'] = 0
         
         # Get current week info
-        cursor.execute("SELECT MAX(week) FROM match")
+        cursor.execute("SELECT MAX(week) FROM matches")
         max_week = cursor.fetchone()[0] or 0
         
-        cursor.execute("SELECT COUNT(DISTINCT week) FROM match")
+        cursor.execute("SELECT COUNT(DISTINCT week) FROM matches")
         weeks_available = cursor.fetchone()[0] or 0
         
         # Get recent picks
         cursor.execute("""
-            SELECT COUNT(*) FROM pick p
-            JOIN match m ON p.match_id = m.id
-            WHERE m.week = (SELECT MAX(week) FROM match WHERE week <= ?)
+            SELECT COUNT(*) FROM picks p
+            JOIN matches m ON p.match_id = m.id
+            WHERE m.week = (SELECT MAX(week) FROM matches WHERE week <= ?)
         """, (max_week,))
         current_week_picks = cursor.fetchone()[0] or 0
         
-        conn.close()
+        get_connection_manager().release(conn)
         
         return jsonify({
             'status': 'healthy',
@@ -188,8 +192,7 @@ def picks_summary():
         if not os.path.exists(db_path):
             return jsonify({'error': 'Database not found'}), 404
         
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        conn = get_connection_manager().connection()
         cursor = conn.cursor()
         
         # Get picks summary
@@ -197,17 +200,15 @@ def picks_summary():
             SELECT 
                 m.week,
                 u.username,
-                t.name as chosen_team,
+                CASE WHEN p.chosen_team_id = m.home_team_id THEN m.home_team_name
+                     ELSE m.away_team_name END as chosen_team,
                 m.id as match_id,
-                at.name as away_team,
-                ht.name as home_team,
+                m.away_team_name as away_team,
+                m.home_team_name as home_team,
                 m.start_time
-            FROM pick p
-            JOIN user u ON p.user_id = u.id
-            JOIN match m ON p.match_id = m.id
-            JOIN team t ON p.chosen_team_id = t.id
-            JOIN team at ON m.away_team_id = at.id
-            JOIN team ht ON m.home_team_id = ht.id
+            FROM picks p
+            JOIN users u ON p.user_id = u.id
+            JOIN matches m ON p.match_id = m.id
             ORDER BY m.week, u.username
         """)
         
@@ -228,7 +229,7 @@ def picks_summary():
                 'start_time': pick['start_time']
             })
         
-        conn.close()
+        get_connection_manager().release(conn)
         
         return jsonify({
             'picks_by_week': picks_by_week,
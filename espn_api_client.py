@@ -5,9 +5,10 @@ Provides real NFL data without cost or registration
 
 import requests
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timezone, date, timedelta
 import pytz
 import logging
+from rate_limiter import rate_limited_get
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +17,24 @@ class ESPNAPIClient:
     
     BASE_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl"
     
+    # Regular season is fetched in a few large date-range requests instead of one per week
+    SEASON_RANGE_DAYS = 50
+    
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'NFL-PickEm-2025/1.0'
         })
     
+    def _get(self, url, **kwargs):
+        """GET through the shared ESPN rate limiter"""
+        return rate_limited_get('espn', url, session=self.session, **kwargs)
+    
     def get_current_week(self):
         """Get current NFL week"""
         try:
             url = f"{self.BASE_URL}/scoreboard"
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -54,7 +62,7 @@ class ESPNAPIClient:
         """Get all NFL teams"""
         try:
             url = f"{self.BASE_URL}/teams"
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -84,7 +92,7 @@ class ESPNAPIClient:
             else:
                 url = f"{self.BASE_URL}/scoreboard?seasontype=2&year={season}"
             
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -102,11 +110,65 @@ class ESPNAPIClient:
             logger.error(f"❌ Error getting schedule: {e}")
             return []
     
+    def get_season_events(self, season=2024):
+        """Get raw ESPN events for the whole regular season, grouped by week"""
+        events_by_week = {}
+        seen_ids = set()
+        
+        for range_start, range_end in self._season_date_ranges(season):
+            dates = f"{range_start.strftime('%Y%m%d')}-{range_end.strftime('%Y%m%d')}"
+            url = f"{self.BASE_URL}/scoreboard?dates={dates}&seasontype=2&limit=1000"
+            
+            response = self._get(url, timeout=30)
+            response.raise_for_status()
+            
+            for event in response.json().get('events', []):
+                # Range queries can include preseason/postseason games at the edges
+                if event.get('season', {}).get('type', 2) != 2:
+                    continue
+                if event.get('id') in seen_ids:
+                    continue
+                seen_ids.add(event.get('id'))
+                
+                week = event.get('week', {}).get('number')
+                if week:
+                    events_by_week.setdefault(week, []).append(event)
+        
+        total = sum(len(events) for events in events_by_week.values())
+        logger.info(f"✅ Loaded {total} games in {len(events_by_week)} weeks from ESPN for season {season}")
+        return events_by_week
+    
+    def get_season_schedule(self, season=2024):
+        """Get parsed NFL schedule for the whole regular season, grouped by week"""
+        try:
+            games_by_week = {}
+            for week, events in self.get_season_events(season).items():
+                games = [game for game in (self._parse_game_data(event) for event in events) if game]
+                if games:
+                    games_by_week[week] = games
+            return games_by_week
+            
+        except Exception as e:
+            logger.error(f"❌ Error getting season schedule: {e}")
+            return {}
+    
+    def _season_date_ranges(self, season):
+        """Split the regular season window (Sep 1 - Jan 15) into large date ranges"""
+        current = date(season, 9, 1)
+        season_end = date(season + 1, 1, 15)
+        
+        ranges = []
+        while current <= season_end:
+            range_end = min(current + timedelta(days=self.SEASON_RANGE_DAYS - 1), season_end)
+            ranges.append((current, range_end))
+            current = range_end + timedelta(days=1)
+        return ranges
+    
     def get_game_results(self, week, season=2024):
         """Get completed game results for a specific week"""
         try:
             url = f"{self.BASE_URL}/scoreboard?week={week}&seasontype=2&year={season}"
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -213,6 +275,11 @@ class ESPNAPIClient:
         if game_data and game_data['is_completed']:
             return {
                 'espn_id': game_data['espn_id'],
+                'week': game_data['week'],
+                'home_team_id': game_data['home_team_id'],
+                'away_team_id': game_data['away_team_id'],
+                'start_time': game_data['start_time'],
+                'is_completed': True,
                 'winner_team_id': game_data['winner_team_id'],
                 'home_score': game_data['home_score'],
                 'away_score': game_data['away_score']
@@ -5,7 +5,14 @@ Handles automatic syncing of real NFL data from ESPN API
 
 import logging
 from datetime import datetime, timezone
+from sqlalchemy import or_
 from espn_api_client import ESPNAPIClient
+from rate_limiter import request_priority, PRIORITY_BACKFILL
+from sync_fingerprint import game_fingerprint, new_sync_stats
+from result_matcher import build_match_index, build_external_index, match_results
+from team_resolver import get_team_resolver, init_team_resolver, normalize_alias
+from sync_diff import SyncDiff
+from job_progress import job_stage, report_progress
 
 logger = logging.getLogger(__name__)
 
@@ -16,55 +23,81 @@ class ESPNDataSync:
         self.app = app
         self.db = db
         self.espn_client = ESPNAPIClient()
+        self.last_sync_stats = new_sync_stats()
+        self.last_diff = SyncDiff('espn_schedule')
+        self.last_team_diff = SyncDiff('espn_teams')
         
-        # Import models within app context
+        # Import models within app context (teams live in the alias table, matches store team ids and names)
         with app.app_context():
-            from app import Team, Match
-            self.Team = Team
+            from app import TeamAlias, Match
+            self.TeamAlias = TeamAlias
             self.Match = Match
     
-    def sync_teams(self):
-        """Sync NFL teams from ESPN"""
+    def sync_teams(self, dry_run=False):
+        """Sync the ESPN team ids, abbreviations and names into the team alias table (dry_run: only compute the diff)"""
         try:
             logger.info("🔄 Syncing NFL teams from ESPN...")
             
             espn_teams = self.espn_client.get_teams()
+            resolver = get_team_resolver()
             
             with self.app.app_context():
-                teams_created = 0
-                teams_updated = 0
+                diff = SyncDiff('espn_teams', dry_run=dry_run)
+                
+                # Preload all aliases once instead of one query per team
+                existing = {(alias.alias_type, alias.alias_value): alias for alias in self.TeamAlias.query.all()}
+                new_aliases = set()
                 
                 for espn_team in espn_teams:
-                    # Check if team exists
-                    team = self.Team.query.filter_by(abbreviation=espn_team['abbreviation']).first()
+                    # ESPN abbreviations differ from ours (WSH) - everything is keyed by the canonical one (WAS)
+                    abbreviation = resolver.resolve(espn_team['abbreviation']) or resolver.resolve(espn_team['id'], 'espn_id')
+                    if not abbreviation:
+                        logger.warning(f"⚠️ Unknown ESPN team: {espn_team['name']} ({espn_team['abbreviation']})")
+                        continue
                     
-                    if team:
-                        # Update existing team
-                        team.name = espn_team['name']
-                        team.logo_url = espn_team['logo_url']
-                        teams_updated += 1
-                    else:
-                        # Create new team
-                        team = self.Team(
-                            name=espn_team['name'],
-                            abbreviation=espn_team['abbreviation'],
-                            logo_url=espn_team['logo_url']
-                        )
-                        self.db.session.add(team)
-                        teams_created += 1
+                    aliases = [('abbreviation', espn_team['abbreviation']), ('display_name', espn_team['name'])]
+                    if str(espn_team['id']).isdigit():
+                        aliases.append(('espn_id', espn_team['id']))
+                    
+                    for alias_type, value in aliases:
+                        value = normalize_alias(value)
+                        if not value:
+                            continue
+                        
+                        alias = existing.get((alias_type, value))
+                        if alias:
+                            # Update an alias only if it points to another team
+                            diff.compare(alias.id, {'abbreviation': alias.abbreviation}, {'abbreviation': abbreviation}, abbreviation)
+                        elif (alias_type, value) not in new_aliases:
+                            new_aliases.add((alias_type, value))
+                            diff.add_insert({
+                                'alias_type': alias_type,
+                                'alias_value': value,
+                                'abbreviation': abbreviation,
+                                'team_id': resolver.team_id(abbreviation)
+                            }, abbreviation, 'new_alias')
+                
+                diff.apply_to_session(self.db, self.TeamAlias)
+                self.last_team_diff = diff
                 
-                self.db.session.commit()
-                logger.info(f"✅ Teams sync completed: {teams_created} created, {teams_updated} updated")
+                # Reload the process-wide resolver with the new aliases
+                if not dry_run and diff.has_changes:
+                    init_team_resolver(self.db, self.TeamAlias)
+                
+                stats = diff.stats
+                logger.info(f"✅ Teams sync {'dry run' if dry_run else 'completed'}: {stats['created']} aliases created, {stats['updated']} updated")
                 return True
                 
         except Exception as e:
             logger.error(f"❌ Error syncing teams: {e}")
             return False
     
-    def sync_schedule(self, week=None):
-        """Sync NFL schedule from ESPN"""
+    def sync_schedule(self, week=None, espn_games=None, dry_run=False):
+        """Sync NFL schedule from ESPN (or from already loaded ESPN games; dry_run: only compute the diff)"""
         try:
-            if week:
+            if espn_games is not None:
+                logger.info(f"🔄 Syncing {len(espn_games)} preloaded ESPN games...")
+            elif week:
                 logger.info(f"🔄 Syncing NFL schedule for week {week} from ESPN...")
                 espn_games = self.espn_client.get_schedule(week=week)
             else:
@@ -72,112 +105,231 @@ class ESPNDataSync:
                 espn_games = self.espn_client.get_schedule()
             
             with self.app.app_context():
-                games_created = 0
-                games_updated = 0
+                diff = SyncDiff('espn_schedule', dry_run=dry_run)
+                
+                # Preload teams and the target weeks' matches, then diff in memory
+                team_by_abbr, _ = self._team_lookup()
+                matches_by_key, matches_by_espn_id = self._load_existing_matches(
+                    {game['week'] for game in espn_games},
+                    {self._espn_event_id(game) for game in espn_games} - {None}
+                )
                 
                 for espn_game in espn_games:
                     # Find teams by abbreviation
-                    home_team = self.Team.query.filter_by(abbreviation=self._map_espn_team_id(espn_game['home_team_id'])).first()
-                    away_team = self.Team.query.filter_by(abbreviation=self._map_espn_team_id(espn_game['away_team_id'])).first()
+                    home_team = team_by_abbr.get(self._map_espn_team_id(espn_game['home_team_id']))
+                    away_team = team_by_abbr.get(self._map_espn_team_id(espn_game['away_team_id']))
                     
                     if not home_team or not away_team:
                         logger.warning(f"⚠️ Teams not found for game: {espn_game['away_team_name']} @ {espn_game['home_team_name']}")
                         continue
                     
-                    # Check if match exists
-                    match = self.Match.query.filter_by(
-                        week=espn_game['week'],
-                        home_team_id=home_team.id,
-                        away_team_id=away_team.id
-                    ).first()
+                    winner_team_id = None
+                    if espn_game['is_completed'] and espn_game['winner_team_id']:
+                        winner_team = team_by_abbr.get(self._map_espn_team_id(espn_game['winner_team_id']))
+                        winner_team_id = winner_team.id if winner_team else None
+                    
+                    espn_event_id = self._espn_event_id(espn_game)
+                    label = f"{away_team.abbreviation} @ {home_team.abbreviation}"
+                    values = {
+                        'week': espn_game['week'],
+                        'start_time': self._start_time(espn_game),
+                        'sync_fingerprint': self._game_fingerprint(espn_game)
+                    }
                     
-                    if match:
-                        # Update existing match
-                        match.start_time = espn_game['start_time']
+                    # ESPN event id first (also finds flexed games in another week), then week + teams
+                    existing = matches_by_espn_id.get(espn_event_id) or \
+                        matches_by_key.get((espn_game['week'], home_team.id, away_team.id))
+                    
+                    if existing:
+                        values['espn_event_id'] = espn_event_id or existing['espn_event_id']
                         if espn_game['is_completed']:
-                            match.is_completed = True
-                            match.home_score = espn_game['home_score']
-                            match.away_score = espn_game['away_score']
-                            # Set winner
-                            if espn_game['winner_team_id']:
-                                winner_team = self.Team.query.filter_by(abbreviation=self._map_espn_team_id(espn_game['winner_team_id'])).first()
-                                if winner_team:
-                                    match.winner_team_id = winner_team.id
-                        games_updated += 1
-                    else:
-                        # Create new match
-                        match = self.Match(
-                            week=espn_game['week'],
-                            home_team_id=home_team.id,
-                            away_team_id=away_team.id,
-                            start_time=espn_game['start_time'],
-                            is_completed=espn_game['is_completed'],
-                            home_score=espn_game['home_score'],
-                            away_score=espn_game['away_score']
-                        )
+                            values.update({
+                                'is_completed': True,
+                                'home_score': espn_game['home_score'],
+                                'away_score': espn_game['away_score']
+                            })
+                            if winner_team_id:
+                                values['winner_team_id'] = winner_team_id
+                            elif espn_game['home_score'] == espn_game['away_score']:
+                                values['winner_team_id'] = None  # Tie
                         
-                        # Set winner if completed
-                        if espn_game['is_completed'] and espn_game['winner_team_id']:
-                            winner_team = self.Team.query.filter_by(abbreviation=self._map_espn_team_id(espn_game['winner_team_id'])).first()
-                            if winner_team:
-                                match.winner_team_id = winner_team.id
-                        
-                        self.db.session.add(match)
-                        games_created += 1
+                        # Only changed columns of changed matches are written
+                        diff.compare(existing['id'], existing, values, label)
+                    elif values['start_time'] is None:
+                        logger.warning(f"⚠️ No kickoff time for new game {label}, skipped")
+                    else:
+                        # Create new match (matches store the team names next to the ids)
+                        values.update({
+                            'home_team_id': home_team.id,
+                            'home_team_name': home_team.name,
+                            'away_team_id': away_team.id,
+                            'away_team_name': away_team.name,
+                            'source': 'espn',
+                            'is_completed': espn_game['is_completed'],
+                            'home_score': espn_game['home_score'],
+                            'away_score': espn_game['away_score'],
+                            'winner_team_id': winner_team_id,
+                            'espn_event_id': espn_event_id
+                        })
+                        diff.add_insert(values, label)
+                
+                # Apply all changes in one transaction, then notify scoring/usage/caches
+                stats = diff.apply_to_session(self.db, self.Match)
+                diff.publish_events()
+                report_progress(games_written=stats['created'] + stats['updated'], games_unchanged=stats['unchanged'])
                 
-                self.db.session.commit()
-                logger.info(f"✅ Schedule sync completed: {games_created} created, {games_updated} updated")
+                self.last_sync_stats = stats
+                self.last_diff = diff
+                logger.info(f"✅ Schedule sync {'dry run' if dry_run else 'completed'}: {stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged")
                 return True
                 
         except Exception as e:
             logger.error(f"❌ Error syncing schedule: {e}")
             return False
     
-    def sync_results(self, week):
-        """Sync game results for a specific week"""
+    def _load_existing_matches(self, weeks, espn_event_ids):
+        """
+        Existing matches of the given weeks or ESPN events
+        
+        Returns:
+            ({(week, home_team_id, away_team_id): row}, {espn_event_id: row})
+            with row = {column: stored value} of the columns a sync writes
+        """
+        if not weeks and not espn_event_ids:
+            return {}, {}
+        
+        Match = self.Match
+        columns = (
+            Match.id, Match.week, Match.home_team_id, Match.away_team_id, Match.espn_event_id,
+            Match.start_time, Match.is_completed, Match.home_score, Match.away_score,
+            Match.winner_team_id, Match.sync_fingerprint
+        )
+        rows = Match.query.with_entities(*columns).filter(
+            or_(Match.week.in_(weeks), Match.espn_event_id.in_(espn_event_ids))
+        ).all()
+        
+        by_key = {}
+        by_espn_id = {}
+        for row in rows:
+            row = dict(row._mapping)
+            by_key[(row['week'], row['home_team_id'], row['away_team_id'])] = row
+            if row['espn_event_id']:
+                by_espn_id[row['espn_event_id']] = row
+        return by_key, by_espn_id
+    
+    def sync_season(self, season=2024, dry_run=False):
+        """Sync schedule and results for the whole regular season in one batch"""
+        try:
+            logger.info(f"🔄 Syncing NFL season {season} from ESPN date-range scoreboards...")
+            
+            games_by_week = self.espn_client.get_season_schedule(season)
+            if not games_by_week:
+                logger.warning(f"⚠️ No games loaded for season {season}")
+                return False
+            
+            # Completed games carry scores and winners, so one schedule pass covers the results too
+            espn_games = [game for week in sorted(games_by_week) for game in games_by_week[week]]
+            report_progress(weeks_fetched=len(games_by_week), games_fetched=len(espn_games))
+            return self.sync_schedule(espn_games=espn_games, dry_run=dry_run)
+            
+        except Exception as e:
+            logger.error(f"❌ Error syncing season {season}: {e}")
+            return False
+    
+    def sync_results(self, week, dry_run=False):
+        """Sync game results for a specific week (dry_run: only compute the diff)"""
         try:
             logger.info(f"🔄 Syncing game results for week {week} from ESPN...")
             
             espn_results = self.espn_client.get_game_results(week=week)
+            report_progress(weeks_fetched=1, games_fetched=len(espn_results))
             
             with self.app.app_context():
-                results_updated = 0
+                diff = SyncDiff('espn_results', dry_run=dry_run)
+                
+                # One team lookup table per run; ESPN event ids first, then a match index per week
+                team_by_abbr, abbr_by_team_id = self._team_lookup()
+                espn_event_ids = {self._espn_event_id(result) for result in espn_results} - {None}
+                matches = self.Match.query.filter(
+                    or_(self.Match.week == week, self.Match.espn_event_id.in_(espn_event_ids))
+                ).all()
+                match_index = build_match_index([m for m in matches if m.week == week], abbr_by_team_id)
+                
+                matched, unmatched = match_results(
+                    espn_results, match_index, self._result_key,
+                    external_index=build_external_index(matches, 'espn_event_id'),
+                    external_key=self._espn_event_id
+                )
                 
-                for espn_result in espn_results:
-                    # Find the match by ESPN ID or teams
-                    match = self.Match.query.filter_by(week=week).all()
+                for espn_result, m in matched:
+                    # Link the ESPN event and follow games moved to another week
+                    values = {
+                        'week': week,
+                        'espn_event_id': self._espn_event_id(espn_result) or m.espn_event_id,
+                        'is_completed': True,
+                        'home_score': espn_result['home_score'],
+                        'away_score': espn_result['away_score'],
+                        'sync_fingerprint': self._game_fingerprint(espn_result)
+                    }
                     
-                    for m in match:
-                        home_team_abbr = self._map_espn_team_id(espn_result.get('home_team_id', ''))
-                        away_team_abbr = self._map_espn_team_id(espn_result.get('away_team_id', ''))
-                        
-                        if (m.home_team.abbreviation == home_team_abbr and 
-                            m.away_team.abbreviation == away_team_abbr):
-                            
-                            # Update match with results
-                            m.is_completed = True
-                            m.home_score = espn_result['home_score']
-                            m.away_score = espn_result['away_score']
-                            
-                            # Set winner
-                            if espn_result['winner_team_id']:
-                                winner_team = self.Team.query.filter_by(
-                                    abbreviation=self._map_espn_team_id(espn_result['winner_team_id'])
-                                ).first()
-                                if winner_team:
-                                    m.winner_team_id = winner_team.id
-                            
-                            results_updated += 1
-                            break
+                    # Set winner (none for a tie)
+                    if espn_result['winner_team_id']:
+                        winner_team = team_by_abbr.get(self._map_espn_team_id(espn_result['winner_team_id']))
+                        if winner_team:
+                            values['winner_team_id'] = winner_team.id
+                    elif espn_result['home_score'] == espn_result['away_score']:
+                        values['winner_team_id'] = None
+                    
+                    stored = {field: getattr(m, field) for field in values}
+                    label = f"{abbr_by_team_id.get(m.away_team_id)} @ {abbr_by_team_id.get(m.home_team_id)}"
+                    diff.compare(m.id, stored, values, label)
+                
+                for espn_result in unmatched:
+                    logger.warning(f"⚠️ No match found for ESPN game {espn_result.get('espn_id')} in week {week}")
                 
-                self.db.session.commit()
-                logger.info(f"✅ Results sync completed: {results_updated} games updated")
+                stats = diff.apply_to_session(self.db, self.Match)
+                diff.publish_events()
+                report_progress(games_written=stats['updated'], games_unchanged=stats['unchanged'])
+                self.last_sync_stats = stats
+                self.last_diff = diff
+                logger.info(f"✅ Results sync {'dry run' if dry_run else 'completed'}: {stats['updated']} games updated, {stats['unchanged']} unchanged")
                 return True
                 
         except Exception as e:
             logger.error(f"❌ Error syncing results: {e}")
             return False
     
+    def _team_lookup(self):
+        """All teams once: ({canonical abbreviation: TeamInfo}, {team_id: canonical abbreviation})"""
+        teams = get_team_resolver().teams()
+        return teams, {team.id: abbreviation for abbreviation, team in teams.items()}
+    
+    def _result_key(self, espn_result):
+        """(home_abbr, away_abbr) key of an ESPN result"""
+        return (
+            self._map_espn_team_id(espn_result.get('home_team_id', '')),
+            self._map_espn_team_id(espn_result.get('away_team_id', ''))
+        )
+    
+    def _espn_event_id(self, espn_game):
+        """ESPN event id of a parsed game as stored in matches.espn_event_id"""
+        espn_id = espn_game.get('espn_id')
+        return str(espn_id) if espn_id else None
+    
+    def _start_time(self, espn_game):
+        """Kickoff of a parsed game as stored in matches.start_time (ISO string)"""
+        start_time = espn_game.get('start_time')
+        return start_time.isoformat() if isinstance(start_time, datetime) else start_time
+    
+    def _game_fingerprint(self, espn_game):
+        """Content hash of the fields a sync writes for an ESPN game"""
+        return game_fingerprint(
+            start_time=espn_game.get('start_time'),
+            is_completed=espn_game.get('is_completed'),
+            home_score=espn_game.get('home_score'),
+            away_score=espn_game.get('away_score')
+        )
+    
     def get_current_week(self):
         """Get current NFL week from ESPN"""
         try:
@@ -190,68 +342,41 @@ class ESPNDataSync:
     
     def _map_espn_team_id(self, espn_id):
         """Map ESPN team ID to our abbreviation format"""
-        # ESPN uses different IDs, map them to standard abbreviations
-        espn_to_abbr = {
-            '22': 'ARI',  # Arizona Cardinals
-            '1': 'ATL',   # Atlanta Falcons
-            '33': 'BAL',  # Baltimore Ravens
-            '2': 'BUF',   # Buffalo Bills
-            '29': 'CAR',  # Carolina Panthers
-            '3': 'CHI',   # Chicago Bears
-            '4': 'CIN',   # Cincinnati Bengals
-            '5': 'CLE',   # Cleveland Browns
-            '6': 'DAL',   # Dallas Cowboys
-            '7': 'DEN',   # Denver Broncos
-            '8': 'DET',   # Detroit Lions
-            '9': 'GB',    # Green Bay Packers
-            '34': 'HOU',  # Houston Texans
-            '11': 'IND',  # Indianapolis Colts
-            '30': 'JAX',  # Jacksonville Jaguars
-            '12': 'KC',   # Kansas City Chiefs
-            '13': 'LV',   # Las Vegas Raiders
-            '24': 'LAC',  # Los Angeles Chargers
-            '14': 'LAR',  # Los Angeles Rams
-            '15': 'MIA',  # Miami Dolphins
-            '16': 'MIN',  # Minnesota Vikings
-            '17': 'NE',   # New England Patriots
-            '18': 'NO',   # New Orleans Saints
-            '19': 'NYG',  # New York Giants
-            '20': 'NYJ',  # New York Jets
-            '21': 'PHI',  # Philadelphia Eagles
-            '23': 'PIT',  # Pittsburgh Steelers
-            '25': 'SF',   # San Francisco 49ers
-            '26': 'SEA',  # Seattle Seahawks
-            '27': 'TB',   # Tampa Bay Buccaneers
-            '10': 'TEN',  # Tennessee Titans
-            '28': 'WAS'   # Washington Commanders
-        }
-        
-        return espn_to_abbr.get(str(espn_id), str(espn_id))
+        return get_team_resolver().resolve(espn_id, 'espn_id') or str(espn_id)
     
-    def full_sync(self):
-        """Perform complete data sync"""
+    def full_sync(self, dry_run=False):
+        """
+        Perform complete data sync
+        
+        Args:
+            dry_run: Compute what would change without writing
+        
+        Returns:
+            bool, or the structured diff {'teams': ..., 'matches': ...} for dry runs (None on error)
+        """
         try:
-            logger.info("🚀 Starting full ESPN data sync...")
+            logger.info(f"🚀 Starting full ESPN data sync{' (dry run)' if dry_run else ''}...")
             
-            # Sync teams first
-            if not self.sync_teams():
-                return False
-            
-            # Sync complete schedule
-            if not self.sync_schedule():
-                return False
+            with request_priority(PRIORITY_BACKFILL):
+                # Sync teams first
+                with job_stage('teams'):
+                    if not self.sync_teams(dry_run=dry_run):
+                        return None if dry_run else False
+                
+                # Sync complete schedule and results of completed weeks
+                with job_stage('season'):
+                    if not self.sync_season(dry_run=dry_run):
+                        return None if dry_run else False
             
-            # Sync results for completed weeks
-            current_week = self.get_current_week()
-            for week in range(1, current_week):
-                self.sync_results(week)
+            if dry_run:
+                return {'teams': self.last_team_diff.to_dict(), 'matches': self.last_diff.to_dict()}
             
             logger.info("✅ Full ESPN data sync completed successfully")
             return True
             
         except Exception as e:
             logger.error(f"❌ Error in full sync: {e}")
-            return False
+            return None if dry_run else False
 
 # Test function
 if __name__ == "__main__":
@@ -5,6 +5,12 @@ Calculates user points based on real NFL game results
 
 import logging
 from datetime import datetime, timezone
+from sqlalchemy import func
+from event_bus import MATCH_STARTED, MATCH_COMPLETED, PICK_CHANGED
+from pick_scoring import score_picks, points_by_user
+from standings_history import record_week_standings, record_completed_weeks
+from leaderboard import get_leaderboard_rows
+from live_game_poller import parse_kickoff
 
 logger = logging.getLogger(__name__)
 
@@ -17,132 +23,80 @@ class ESPNPointsCalculator:
         
         # Import models within app context
         with app.app_context():
-            from app import User, Pick, Match, Team, TeamWinnerUsage, TeamLoserUsage
+            from app import User, Pick, HistoricalPick, Match, TeamUsage, StandingsHistory
             self.User = User
             self.Pick = Pick
+            self.HistoricalPick = HistoricalPick
             self.Match = Match
-            self.Team = Team
-            self.TeamWinnerUsage = TeamWinnerUsage
-            self.TeamLoserUsage = TeamLoserUsage
+            self.TeamUsage = TeamUsage
+            self.StandingsHistory = StandingsHistory
     
     def calculate_points_for_week(self, week):
-        """Calculate points for all users for a specific week"""
+        """Score all picks of the week's completed matches with one set-based UPDATE"""
         try:
             logger.info(f"🔄 Calculating points for week {week}...")
             
             with self.app.app_context():
-                # Get all completed matches for this week
-                completed_matches = self.Match.query.filter_by(
-                    week=week, 
-                    is_completed=True
-                ).all()
-                
-                if not completed_matches:
-                    logger.info(f"⚠️ No completed matches found for week {week}")
+                scored = score_picks(self.db, self.Match, self.Pick, weeks=[week])
+                
+                if not scored:
+                    logger.info(f"⚠️ No scored picks for week {week}")
                     return True
                 
-                points_awarded = 0
-                
-                for match in completed_matches:
-                    if not match.winner_team_id:
-                        logger.warning(f"⚠️ Match {match.id} completed but no winner set")
-                        continue
-                    
-                    # Get all picks for this match
-                    picks = self.Pick.query.filter_by(match_id=match.id).all()
-                    
-                    for pick in picks:
-                        # Award point if user picked the winning team
-                        if pick.chosen_team_id == match.winner_team_id:
-                            # User gets 1 point for correct pick
-                            logger.info(f"✅ User {pick.user.username} gets 1 point for correct pick in week {week}")
-                            points_awarded += 1
-                        else:
-                            logger.info(f"❌ User {pick.user.username} gets 0 points for incorrect pick in week {week}")
-                
-                logger.info(f"✅ Points calculation completed for week {week}: {points_awarded} points awarded")
+                points_awarded = self.db.session.query(func.coalesce(func.sum(self.Pick.points_earned), 0)).join(
+                    self.Match, self.Pick.match_id == self.Match.id
+                ).filter(self.Match.week == week).scalar()
+                
+                logger.info(f"✅ Points calculation completed for week {week}: {points_awarded} points awarded ({scored} picks)")
                 return True
                 
         except Exception as e:
             logger.error(f"❌ Error calculating points for week {week}: {e}")
+            self.db.session.rollback()
             return False
     
     def calculate_all_points(self):
-        """Recalculate points for all completed weeks"""
+        """Rescore the picks and historical picks of all completed matches (one UPDATE per batch)"""
         try:
             logger.info("🔄 Recalculating all user points...")
             
             with self.app.app_context():
-                # Get all completed weeks
-                completed_weeks = self.db.session.query(self.Match.week).filter_by(is_completed=True).distinct().all()
-                
-                total_points_awarded = 0
-                
-                for (week,) in completed_weeks:
-                    if self.calculate_points_for_week(week):
-                        # Count points for this week
-                        week_matches = self.Match.query.filter_by(week=week, is_completed=True).all()
-                        for match in week_matches:
-                            if match.winner_team_id:
-                                correct_picks = self.Pick.query.filter_by(
-                                    match_id=match.id,
-                                    chosen_team_id=match.winner_team_id
-                                ).count()
-                                total_points_awarded += correct_picks
+                # Historical picks store the result as is_winner, committed together with the picks
+                score_picks(self.db, self.Match, self.HistoricalPick, correct_field='is_winner', commit=False)
+                score_picks(self.db, self.Match, self.Pick)
+                record_completed_weeks(self.db, self.Match, self.Pick, self.User, self.StandingsHistory)
+                total_points_awarded = self.db.session.query(func.coalesce(func.sum(self.Pick.points_earned), 0)).scalar()
                 
                 logger.info(f"✅ All points recalculated: {total_points_awarded} total points awarded")
                 return True
                 
         except Exception as e:
             logger.error(f"❌ Error recalculating all points: {e}")
+            self.db.session.rollback()
             return False
     
     def get_user_score(self, user_id):
-        """Get total score for a specific user"""
+        """Get total score for a specific user (sum of the stored pick points)"""
         try:
             with self.app.app_context():
-                user = self.User.query.get(user_id)
-                if not user:
-                    return 0
-                
-                total_points = 0
-                
-                # Get all user picks
-                picks = self.Pick.query.filter_by(user_id=user_id).all()
-                
-                for pick in picks:
-                    match = pick.match
-                    if match.is_completed and match.winner_team_id:
-                        if pick.chosen_team_id == match.winner_team_id:
-                            total_points += 1
-                
-                return total_points
+                totals = points_by_user(self.db, self.Pick, user_ids=[user_id])
+                return totals.get(user_id, {}).get('points', 0)
                 
         except Exception as e:
             logger.error(f"❌ Error getting user score: {e}")
             return 0
     
-    def get_leaderboard(self):
-        """Get leaderboard with all user scores"""
+    def get_leaderboard(self, top=None, around_user_id=None):
+        """Get leaderboard with all user scores (ranked in SQL, ties share a rank)"""
         try:
             with self.app.app_context():
-                users = self.User.query.all()
-                leaderboard = []
-                
-                for user in users:
-                    score = self.get_user_score(user.id)
-                    leaderboard.append({
-                        'user_id': user.id,
-                        'username': user.username,
-                        'score': score
-                    })
-                
-                # Sort by score (highest first)
-                leaderboard.sort(key=lambda x: x['score'], reverse=True)
-                
-                # Add rank
-                for i, entry in enumerate(leaderboard):
-                    entry['rank'] = i + 1
+                rows = get_leaderboard_rows(self.db, self.User, self.Pick, self.Match, top=top, around_user_id=around_user_id)
+                leaderboard = [{
+                    'user_id': row['user_id'],
+                    'username': row['username'],
+                    'score': row['points'],
+                    'rank': row['rank']
+                } for row in rows]
                 
                 logger.info(f"✅ Leaderboard generated with {len(leaderboard)} users")
                 return leaderboard
@@ -160,47 +114,17 @@ class ESPNPointsCalculator:
                 now = datetime.now(timezone.utc)
                 
                 # Get all matches that have started but haven't been processed for team usage
-                started_matches = self.Match.query.filter(
-                    self.Match.start_time <= now,
-                    self.Match.is_completed == False  # Only process once
-                ).all()
+                # (start_time is stored as an ISO string - compared after parsing, not in SQL)
+                started_matches = []
+                for match in self.Match.query.filter(self.Match.is_completed == False).all():  # Only process once
+                    kickoff = parse_kickoff(match.start_time)
+                    if kickoff is not None and kickoff <= now:
+                        started_matches.append(match)
                 
                 usage_processed = 0
                 
                 for match in started_matches:
-                    # Get all picks for this match
-                    picks = self.Pick.query.filter_by(match_id=match.id).all()
-                    
-                    for pick in picks:
-                        # Process winner usage
-                        existing_winner = self.TeamWinnerUsage.query.filter_by(
-                            user_id=pick.user_id,
-                            team_id=pick.chosen_team_id
-                        ).first()
-                        
-                        if not existing_winner:
-                            winner_usage = self.TeamWinnerUsage(
-                                user_id=pick.user_id,
-                                team_id=pick.chosen_team_id
-                            )
-                            self.db.session.add(winner_usage)
-                        
-                        # Process loser usage (the other team)
-                        loser_team_id = match.away_team_id if pick.chosen_team_id == match.home_team_id else match.home_team_id
-                        
-                        existing_loser = self.TeamLoserUsage.query.filter_by(
-                            user_id=pick.user_id,
-                            team_id=loser_team_id
-                        ).first()
-                        
-                        if not existing_loser:
-                            loser_usage = self.TeamLoserUsage(
-                                user_id=pick.user_id,
-                                team_id=loser_team_id
-                            )
-                            self.db.session.add(loser_usage)
-                        
-                        usage_processed += 1
+                    usage_processed += self._add_team_usage(match)
                 
                 self.db.session.commit()
                 logger.info(f"✅ Team usage processed for {usage_processed} picks")
@@ -210,8 +134,104 @@ class ESPNPointsCalculator:
             logger.error(f"❌ Error processing team usage: {e}")
             return False
     
+    def _add_team_usage(self, match):
+        """Add missing winner/loser usage for all picks of a started match (no commit)"""
+        picks = self.Pick.query.filter_by(match_id=match.id).all()
+        team_names = {match.home_team_id: match.home_team_name, match.away_team_id: match.away_team_name}
+        
+        for pick in picks:
+            # Winner usage for the chosen team, loser usage for the other team
+            loser_team_id = match.away_team_id if pick.chosen_team_id == match.home_team_id else match.home_team_id
+            
+            for usage_type, team_id in (('winner', pick.chosen_team_id), ('loser', loser_team_id)):
+                existing_usage = self.TeamUsage.query.filter_by(
+                    user_id=pick.user_id,
+                    team_id=team_id,
+                    usage_type=usage_type
+                ).first()
+                
+                if not existing_usage:
+                    self.db.session.add(self.TeamUsage(
+                        user_id=pick.user_id,
+                        username=pick.user.username,
+                        team_id=team_id,
+                        team_name=team_names.get(team_id, ''),
+                        usage_type=usage_type,
+                        week_used=match.week,
+                        match_id=match.id
+                    ))
+        
+        return len(picks)
+    
+    def process_team_usage_for_match(self, match_id):
+        """Process team usage for one match that has just started"""
+        try:
+            with self.app.app_context():
+                match = self.Match.query.get(match_id)
+                if not match:
+                    logger.warning(f"⚠️ Match {match_id} not found for team usage")
+                    return False
+                
+                usage_processed = self._add_team_usage(match)
+                self.db.session.commit()
+                logger.info(f"✅ Team usage processed for match {match_id}: {usage_processed} picks")
+                return True
+                
+        except Exception as e:
+            logger.error(f"❌ Error processing team usage for match {match_id}: {e}")
+            self.db.session.rollback()
+            return False
+    
+    def calculate_points_for_match(self, match_id):
+        """Score the picks of one completed match (stores is_correct/points_earned)"""
+        try:
+            with self.app.app_context():
+                scored = score_picks(self.db, self.Match, self.Pick, match_ids=[match_id])
+                logger.info(f"✅ Points calculated for match {match_id}: {scored} picks scored")
+                return scored > 0
+                
+        except Exception as e:
+            logger.error(f"❌ Error calculating points for match {match_id}: {e}")
+            self.db.session.rollback()
+            return False
+    
+    def register_event_handlers(self, bus):
+        """Subscribe the incremental scoring and usage work to the domain events"""
+        bus.subscribe(MATCH_STARTED, self.on_match_started)
+        bus.subscribe(MATCH_COMPLETED, self.on_match_completed)
+        bus.subscribe(PICK_CHANGED, self.on_pick_changed)
+    
+    def on_match_started(self, match_id, **payload):
+        """match_started: lock in team usage for this match only"""
+        self.process_team_usage_for_match(match_id)
+    
+    def on_match_completed(self, match_id, **payload):
+        """match_completed: usage (if the start was missed), scoring for this match, standings once the week is final"""
+        self.process_team_usage_for_match(match_id)
+        self.calculate_points_for_match(match_id)
+        # The week's last game often has no picks - record the standings regardless of the scored count
+        self.record_standings_for_match_week(match_id)
+    
+    def record_standings_for_match_week(self, match_id):
+        """Append the week's standings if this was its last game to go final"""
+        try:
+            with self.app.app_context():
+                match = self.Match.query.get(match_id)
+                if not match:
+                    return 0
+                return record_week_standings(self.db, self.Match, self.Pick, self.User, self.StandingsHistory, match.week)
+                
+        except Exception as e:
+            logger.error(f"❌ Error recording standings for match {match_id}: {e}")
+            self.db.session.rollback()
+            return 0
+    
+    def on_pick_changed(self, match_id, **payload):
+        """pick_changed: re-score if the match is already final (e.g. admin correction)"""
+        self.calculate_points_for_match(match_id)
+    
     def validate_completed_games(self):
-        """Validate and process all completed games"""
+        """Validate and process all completed games (full rebuild - the schedulers use the events)"""
         try:
             logger.info("🔄 Validating completed games...")
             
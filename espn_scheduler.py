@@ -4,9 +4,13 @@ Handles automatic scheduling of ESPN data syncs
 """
 
 import logging
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+from datetime import datetime, timezone
 import pytz
+from rate_limiter import request_priority, PRIORITY_LIVE, PRIORITY_BACKFILL
+from live_game_poller import LiveGamePoller, parse_kickoff
+from event_bus import get_event_bus, MATCH_STARTED, SCHEDULE_CHANGED
+from job_scheduler import get_job_scheduler, Cron
+from job_progress import job_stage
 
 logger = logging.getLogger(__name__)
 
@@ -17,65 +21,47 @@ class ESPNScheduler:
         self.app = app
         self.espn_sync = espn_sync
         self.points_calculator = points_calculator
-        self.scheduler = BackgroundScheduler()
+        self.live_poller = LiveGamePoller(self.load_kickoffs, self.live_game_validation, name='espn-live-poller')
+        
+        # Shared job scheduler - the leader lease row lives in the app database
+        with app.app_context():
+            self.scheduler = get_job_scheduler(espn_sync.db.engine)
+        
+        # Sync writers publish match events; scoring and usage only touch the affected match
+        self.events = get_event_bus()
+        self.points_calculator.register_event_handlers(self.events)
+        self.events.subscribe(SCHEDULE_CHANGED, self.live_poller.wake)
+        self._started_match_ids = set()
         
         # Vienna timezone for scheduling
         self.vienna_tz = pytz.timezone('Europe/Vienna')
     
     def start_scheduler(self):
-        """Start the background scheduler"""
+        """Register the ESPN jobs and start the shared scheduler (jobs only run in the leader process)"""
         try:
             logger.info("🚀 Starting ESPN scheduler...")
             
             # Daily sync at 07:00 Vienna time
             self.scheduler.add_job(
-                func=self.daily_sync,
-                trigger=CronTrigger(
-                    hour=7,
-                    minute=0,
-                    timezone=self.vienna_tz
-                ),
-                id='daily_espn_sync',
-                name='Daily ESPN Data Sync',
-                replace_existing=True
+                'daily_espn_sync',
+                self.daily_sync,
+                Cron(7, 0, tz=self.vienna_tz),
+                name='Daily ESPN Data Sync'
             )
             
             # Weekly schedule sync on Tuesday at 07:00 Vienna time
             self.scheduler.add_job(
-                func=self.weekly_schedule_sync,
-                trigger=CronTrigger(
-                    day_of_week='tue',
-                    hour=7,
-                    minute=0,
-                    timezone=self.vienna_tz
-                ),
-                id='weekly_schedule_sync',
-                name='Weekly ESPN Schedule Sync',
-                replace_existing=True
+                'weekly_schedule_sync',
+                self.weekly_schedule_sync,
+                Cron(7, 0, weekdays='tue', tz=self.vienna_tz),
+                name='Weekly ESPN Schedule Sync'
             )
             
-            # Hourly game validation during game days (Sunday)
-            self.scheduler.add_job(
-                func=self.hourly_game_validation,
-                trigger=CronTrigger(
-                    day_of_week='sun',
-                    hour='*',
-                    minute=0,
-                    timezone=self.vienna_tz
-                ),
-                id='hourly_game_validation',
-                name='Hourly Game Validation on Sundays',
-                replace_existing=True
-            )
+            # Live game validation follows the kickoff calendar instead of a fixed Sunday cron
+            self.scheduler.add_leader_service(self.live_poller.name, self.live_poller.start, self.live_poller.stop)
             
             self.scheduler.start()
             logger.info("✅ ESPN scheduler started successfully")
-            
-            # Log scheduled jobs
-            jobs = self.scheduler.get_jobs()
-            for job in jobs:
-                logger.info(f"📅 Scheduled job: {job.name} - {job.trigger}")
-            
             return True
             
         except Exception as e:
@@ -83,18 +69,19 @@ class ESPNScheduler:
             return False
     
     def stop_scheduler(self):
-        """Stop the background scheduler"""
+        """Stop the shared scheduler (also stops the live poller and releases the leader lease)"""
         try:
             if self.scheduler.running:
-                self.scheduler.shutdown()
+                self.scheduler.stop()
                 logger.info("✅ ESPN scheduler stopped")
+            self.live_poller.stop()
             return True
         except Exception as e:
             logger.error(f"❌ Error stopping scheduler: {e}")
             return False
     
     def daily_sync(self):
-        """Daily sync job - runs every day at 07:00 Vienna time"""
+        """Daily sync job - runs every day at 07:00 Vienna time (False if a week failed, so the run counts as failed)"""
         try:
             logger.info("🔄 Running daily ESPN sync...")
             
@@ -103,50 +90,88 @@ class ESPNScheduler:
                 current_week = self.espn_sync.get_current_week()
                 
                 # Sync results for current and previous weeks
+                success = True
                 for week in range(max(1, current_week - 1), current_week + 1):
-                    self.espn_sync.sync_results(week)
-                
-                # Validate completed games and calculate points
-                self.points_calculator.validate_completed_games()
+                    with job_stage(f'week_{week}'):
+                        self.publish_started_matches(week)
+                        
+                        # Newly final games publish match_completed -> scoring per match
+                        if not self.espn_sync.sync_results(week):
+                            logger.error(f"❌ Results sync for week {week} failed")
+                            success = False
                 
-                logger.info("✅ Daily ESPN sync completed")
+                if success:
+                    logger.info("✅ Daily ESPN sync completed")
+                return success
                 
         except Exception as e:
             logger.error(f"❌ Error in daily sync: {e}")
+            return False
     
     def weekly_schedule_sync(self):
-        """Weekly schedule sync job - runs every Tuesday at 07:00 Vienna time"""
+        """Weekly schedule sync job - runs every Tuesday at 07:00 Vienna time (False if the sync failed)"""
         try:
             logger.info("🔄 Running weekly ESPN schedule sync...")
             
-            with self.app.app_context():
+            with self.app.app_context(), request_priority(PRIORITY_BACKFILL):
                 # Sync complete schedule to catch any changes
-                self.espn_sync.sync_schedule()
+                if not self.espn_sync.sync_season():
+                    logger.error("❌ Weekly ESPN schedule sync failed")
+                    return False
                 
                 logger.info("✅ Weekly ESPN schedule sync completed")
+                return True
                 
         except Exception as e:
             logger.error(f"❌ Error in weekly schedule sync: {e}")
+            return False
     
-    def hourly_game_validation(self):
-        """Hourly game validation - runs every hour on Sundays"""
+    def load_kickoffs(self):
+        """Kickoff calendar for the live game poller"""
+        with self.app.app_context():
+            Match = self.espn_sync.Match
+            rows = Match.query.with_entities(Match.week, Match.start_time, Match.is_completed).all()
+            return [(week, start_time, bool(is_completed)) for week, start_time, is_completed in rows]
+    
+    def publish_started_matches(self, week):
+        """Publish match_started once for every game of the week that has kicked off"""
+        Match = self.espn_sync.Match
+        now = datetime.now(timezone.utc)
+        
+        started = []
+        for match_id, start_time in Match.query.with_entities(Match.id, Match.start_time).filter(Match.week == week):
+            kickoff = parse_kickoff(start_time)
+            if match_id in self._started_match_ids or kickoff is None or kickoff > now:
+                continue
+            
+            self.events.publish(MATCH_STARTED, match_id=match_id, week=week)
+            self._started_match_ids.add(match_id)
+            started.append(match_id)
+        
+        if started:
+            logger.info(f"🏈 {len(started)} games started in week {week}")
+        return started
+    
+    def live_game_validation(self, week):
+        """Live game validation - called by the live poller while games of a week are running"""
         try:
-            logger.info("🔄 Running hourly game validation...")
+            logger.info(f"🔄 Running live game validation for week {week}...")
             
-            with self.app.app_context():
-                # Get current week
-                current_week = self.espn_sync.get_current_week()
-                
-                # Sync results for current week
-                self.espn_sync.sync_results(current_week)
+            with self.app.app_context(), request_priority(PRIORITY_LIVE):
+                # Lock in team usage for games that kicked off since the last poll
+                self.publish_started_matches(week)
                 
-                # Validate completed games and calculate points
-                self.points_calculator.validate_completed_games()
+                # Sync results for the running week - newly final games publish match_completed
+                self.espn_sync.sync_results(week)
                 
-                logger.info("✅ Hourly game validation completed")
+                logger.info("✅ Live game validation completed")
                 
         except Exception as e:
-            logger.error(f"❌ Error in hourly validation: {e}")
+            logger.error(f"❌ Error in live validation: {e}")
+    
+    def hourly_game_validation(self):
+        """Validate the current week once (kept for manual runs)"""
+        self.live_game_validation(self.espn_sync.get_current_week())
     
     def manual_sync(self):
         """Manual sync for testing purposes"""
@@ -155,9 +180,13 @@ class ESPNScheduler:
             
             with self.app.app_context():
                 # Full sync
-                if self.espn_sync.full_sync():
+                with job_stage('full_sync'):
+                    synced = self.espn_sync.full_sync()
+                
+                if synced:
                     # Validate and calculate points
-                    self.points_calculator.validate_completed_games()
+                    with job_stage('scoring'):
+                        self.points_calculator.validate_completed_games()
                     logger.info("✅ Manual ESPN sync completed successfully")
                     return True
                 else:
@@ -168,24 +197,20 @@ class ESPNScheduler:
             logger.error(f"❌ Error in manual sync: {e}")
             return False
     
-    def get_scheduler_status(self):
-        """Get current scheduler status"""
+    def submit_manual_sync(self):
+        """Queue a manual sync for the sync worker - returns the job id right away (None without a job queue)"""
+        if self.scheduler.queue is None:
+            logger.warning("⚠️ No job queue configured - use manual_sync()")
+            return None
+        return self.scheduler.queue.enqueue('manual_sync')
+    
+    def get_scheduler_status(self, recent_jobs=10):
+        """Get current scheduler status (with progress, results and errors of the recent queued runs)"""
         try:
-            status = {
-                'running': self.scheduler.running if hasattr(self, 'scheduler') else False,
-                'jobs': []
-            }
-            
-            if hasattr(self, 'scheduler') and self.scheduler.running:
-                jobs = self.scheduler.get_jobs()
-                for job in jobs:
-                    status['jobs'].append({
-                        'id': job.id,
-                        'name': job.name,
-                        'next_run': job.next_run_time.isoformat() if job.next_run_time else None,
-                        'trigger': str(job.trigger)
-                    })
-            
+            status = self.scheduler.get_status()
+            status['live_games'] = self.live_poller.has_live_games()
+            if self.scheduler.queue is not None:
+                status['recent_jobs'] = self.scheduler.queue.recent(recent_jobs)
             return status
             
         except Exception as e:
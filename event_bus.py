@@ -0,0 +1,71 @@
+"""
+Event Bus for NFL PickEm 2025
+In-process domain events - sync writers publish, scoring/usage/caches react per match or user
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Domain events and their payloads
+MATCH_STARTED = 'match_started'        # match_id, week
+MATCH_COMPLETED = 'match_completed'    # match_id, winner_team_id, source
+PICK_CHANGED = 'pick_changed'          # user_id, match_id
+SCHEDULE_CHANGED = 'schedule_changed'  # match_ids, weeks, source
+
+EVENTS = (MATCH_STARTED, MATCH_COMPLETED, PICK_CHANGED, SCHEDULE_CHANGED)
+
+
+class EventBus:
+    """Synchronous publish/subscribe - handlers run in the publishing thread"""
+
+    def __init__(self):
+        self._handlers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event, handler):
+        """Register a handler(**payload) for an event (registering the same handler twice is a no-op)"""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event: {event}")
+
+        with self._lock:
+            handlers = self._handlers.setdefault(event, [])
+            if handler not in handlers:
+                handlers.append(handler)
+
+    def unsubscribe(self, event, handler):
+        """Remove a handler"""
+        with self._lock:
+            handlers = self._handlers.get(event, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def publish(self, event, **payload):
+        """
+        Deliver an event to all subscribers
+
+        A failing handler is logged and does not stop the others or the publisher.
+
+        Returns:
+            int: Number of handlers that ran successfully
+        """
+        with self._lock:
+            handlers = list(self._handlers.get(event, []))
+
+        delivered = 0
+        for handler in handlers:
+            try:
+                handler(**payload)
+                delivered += 1
+            except Exception as e:
+                logger.error(f"❌ Handler {getattr(handler, '__qualname__', handler)} failed for {event}: {e}")
+        return delivered
+
+
+_bus = EventBus()
+
+
+def get_event_bus():
+    """Process-wide event bus"""
+    return _bus
@@ -9,10 +9,22 @@ import sqlite3
 import json
 import logging
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Tuple
-import time
-import schedule
-import threading
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from espn_api_client import ESPNAPIClient
+from rate_limiter import rate_limited_get, request_priority, PRIORITY_LIVE, PRIORITY_BACKFILL
+from sync_fingerprint import game_fingerprint, new_sync_stats
+from live_game_poller import LiveGamePoller, validator_kickoff_loader
+from team_resolver import get_team_resolver
+from sqlite_connection import get_connection_manager, get_database_url, register_sqlite_pragmas
+from sync_diff import SyncDiff
+from scoring_rules import get_scoring_rules
+from data_version import CREATE_DATA_VERSION_TABLE, bump_sqlite_data_version
+from standings_history import record_completed_weeks
+from job_scheduler import get_job_scheduler, Cron
+from job_progress import job_stage, report_progress
 
 # Configure logging with maximum deployment compatibility
 import os
@@ -30,39 +42,52 @@ class NFLGameValidator:
     """Validates NFL game results and updates the database"""
     
     def __init__(self, db_path: str = None):
-        # Use relative path for Render compatibility
-        if db_path is None:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # Try multiple possible database locations
-            possible_paths = [
-                os.path.join(current_dir, 'instance', 'nfl_pickem.db'),
-                os.path.join(current_dir, 'nfl_pickem.db'),
-                'instance/nfl_pickem.db',
-                'nfl_pickem.db'
-            ]
-            
-            db_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    db_path = path
-                    break
-            
-            # If no database found, use the first path (will be created if needed)
-            if db_path is None:
-                db_path = possible_paths[0]
-                # Ensure instance directory exists
-                instance_dir = os.path.dirname(db_path)
-                if not os.path.exists(instance_dir):
-                    os.makedirs(instance_dir, exist_ok=True)
-        
-        self.db_path = db_path
+        # One resolved database path shared with the database sync API
+        self.connections = get_connection_manager(db_path)
+        self.db_path = self.connections.db_path
         self.espn_base_url = "https://site.api.espn.com/apis/site/v2/sports/football/nfl"
+        self.last_sync_stats = new_sync_stats()
+        self.last_diff = SyncDiff('espn_validator')
+        self._sync_columns_checked = False
+        self._standings_engine = None
         
     def get_database_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get this thread's pooled WAL connection"""
+        return self.connections.connection()
+    
+    def release_database_connection(self, conn: sqlite3.Connection) -> None:
+        """Return the pooled connection (rolls back uncommitted work, stays open)"""
+        self.connections.release(conn)
+    
+    def ensure_sync_columns(self, conn: sqlite3.Connection) -> None:
+        """Add the sync columns to an existing matches table and the scoring columns to picks"""
+        if self._sync_columns_checked:
+            return
+        
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(matches)").fetchall()]
+        if columns:
+            if 'sync_fingerprint' not in columns:
+                conn.execute("ALTER TABLE matches ADD COLUMN sync_fingerprint VARCHAR(64)")
+                logger.info("Added sync_fingerprint column to matches table")
+            if 'espn_event_id' not in columns:
+                conn.execute("ALTER TABLE matches ADD COLUMN espn_event_id VARCHAR(20)")
+                logger.info("Added espn_event_id column to matches table")
+            # Same index name as the app's schema upgrade
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_matches_espn_event_id ON matches (espn_event_id)")
+            conn.commit()
+        
+        # Change counter read by the app's leaderboard caches
+        conn.execute(CREATE_DATA_VERSION_TABLE)
+        
+        pick_columns = [row['name'] for row in conn.execute("PRAGMA table_info(picks)").fetchall()]
+        if pick_columns:
+            for column, column_type in (('is_correct', 'BOOLEAN'), ('points_earned', 'INTEGER')):
+                if column not in pick_columns:
+                    conn.execute(f"ALTER TABLE picks ADD COLUMN {column} {column_type}")
+                    logger.info(f"Added {column} column to picks table")
+            conn.commit()
+        
+        self._sync_columns_checked = True
     
     def row_to_dict(self, row) -> dict:
         """Convert sqlite3.Row to dictionary for safe .get() access"""
@@ -80,7 +105,7 @@ class NFLGameValidator:
                 'year': year
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = rate_limited_get('espn', url, params=params, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -114,134 +139,99 @@ class NFLGameValidator:
             # Extract team information and scores
             home_team = None
             away_team = None
+            home_abbr = None
+            away_abbr = None
             home_score = None
             away_score = None
             
             for competitor in competitors:
                 team_name = competitor.get('team', {}).get('displayName', '')
+                team_abbr = competitor.get('team', {}).get('abbreviation')
                 score = int(competitor.get('score', 0))
                 is_home = competitor.get('homeAway') == 'home'
                 
                 if is_home:
                     home_team = team_name
+                    home_abbr = team_abbr
                     home_score = score
                 else:
                     away_team = team_name
+                    away_abbr = team_abbr
                     away_score = score
             
             if not all([home_team, away_team, home_score is not None, away_score is not None]):
                 return None
             
-            # Determine winner team ID (we'll need to look this up)
-            winner_name = home_team if home_score > away_score else away_team
+            # Determine winner team ID (we'll need to look this up) - no winner for a tie
+            if home_score == away_score:
+                winner_name = None
+                result = f"Tie {home_score} - {away_score}"
+            else:
+                winner_name = home_team if home_score > away_score else away_team
+                result = f"{winner_name} {max(home_score, away_score)} - {min(home_score, away_score)}"
             
             return {
+                'espn_id': game_data.get('id'),
                 'home_team': home_team,
                 'away_team': away_team,
+                'home_team_abbr': home_abbr,
+                'away_team_abbr': away_abbr,
+                'start_time': game_data.get('date'),
                 'home_score': home_score,
                 'away_score': away_score,
                 'winner_name': winner_name,
                 'winner_team_id': None,  # Will be set later
-                'result': f"{winner_name} {max(home_score, away_score)} - {min(home_score, away_score)}"
+                'result': result
             }
             
         except Exception as e:
             logger.error(f"Failed to parse ESPN game data: {e}")
             return None
     
-    def update_game_result(self, conn: sqlite3.Connection, match_id: int, result_data: Dict) -> bool:
-        """Update game result in the database"""
-        try:
-            cursor = conn.cursor()
-            
-            # Safely extract required data
-            winner_team_id = result_data.get('winner_team_id')
-            home_score = result_data.get('home_score')
-            away_score = result_data.get('away_score')
-            result_text = result_data.get('result', 'Unknown result')
-            
-            if winner_team_id is None or home_score is None or away_score is None:
-                logger.warning(f"Missing required data for match {match_id}: winner_id={winner_team_id}, home={home_score}, away={away_score}")
-                return False
-            
-            # Update the match with result
-            cursor.execute("""
-                UPDATE match 
-                SET is_completed = 1, winner_team_id = ?, home_score = ?, away_score = ?
-                WHERE id = ?
-            """, (winner_team_id, home_score, away_score, match_id))
-            
-            if cursor.rowcount == 0:
-                logger.warning(f"No match found with ID {match_id}")
-                return False
-            
-            conn.commit()
-            logger.info(f"Updated match {match_id}: {result_text}")
-            return True
-            
-        except sqlite3.Error as e:
-            logger.error(f"Database error updating match {match_id}: {e}")
-            conn.rollback()
-            return False
-    
-    def calculate_user_points(self, conn: sqlite3.Connection, week: int) -> None:
-        """Calculate and update user points for completed games in a week"""
+    def calculate_user_points(self, conn: sqlite3.Connection, week: int,
+                              match_ids: Optional[List[int]] = None, commit: bool = True) -> None:
+        """
+        Score picks for completed games with one set-based UPDATE
+        
+        Args:
+            week: Week to score (all completed matches of the week)
+            match_ids: Only score picks of these matches (e.g. the ones just updated)
+            commit: False leaves the commit to the caller
+        """
         try:
-            cursor = conn.cursor()
-            
-            # Get all completed matches for the week
-            cursor.execute("""
-                SELECT m.id, m.winner_team_id, ht.name as home_team, at.name as away_team
-                FROM match m
-                JOIN team ht ON m.home_team_id = ht.id
-                JOIN team at ON m.away_team_id = at.id
-                WHERE m.week = ? AND m.is_completed = 1
-            """, (week,))
-            
-            completed_matches = cursor.fetchall()
-            
-            for match in completed_matches:
-                match_dict = self.row_to_dict(match)
-                match_id = match_dict.get('id')
-                winner_team_id = match_dict.get('winner_team_id')
-                
-                if match_id is None or winner_team_id is None:
-                    logger.warning(f"Missing match data: id={match_id}, winner_id={winner_team_id}")
-                    continue
-                
-                # Get all picks for this match
-                cursor.execute("""
-                    SELECT p.id, p.user_id, p.chosen_team_id, u.username
-                    FROM pick p
-                    JOIN user u ON p.user_id = u.id
-                    WHERE p.match_id = ?
-                """, (match_id,))
-                
-                picks = cursor.fetchall()
-                
-                for pick in picks:
-                    # Safely extract pick data
-                    pick_dict = self.row_to_dict(pick)
-                    chosen_team_id = pick_dict.get('chosen_team_id')
-                    username = pick_dict.get('username', 'Unknown')
-                    
-                    if chosen_team_id is None:
-                        logger.warning(f"Missing chosen_team_id for pick")
-                        continue
-                    
-                    # Check if prediction was correct
-                    is_correct = chosen_team_id == winner_team_id
-                    points = 1 if is_correct else 0
-                    
-                    # Log the result (no database update needed for is_correct/points)
-                    logger.info(f"User {username}: Team ID {chosen_team_id} -> {'✅' if is_correct else '❌'} ({points} points)")
-            
-            conn.commit()
-            logger.info(f"Updated points for Week {week}")
+            if match_ids is not None:
+                if not match_ids:
+                    return
+                match_filter = f"m.id IN ({', '.join('?' * len(match_ids))})"
+                params = list(match_ids)
+            else:
+                match_filter = "m.week = ?"
+                params = [week]
+            
+            rules = get_scoring_rules()
+            cursor = conn.execute(f"""
+                UPDATE picks
+                SET is_correct = {rules.correct_sql('picks', 'm')},
+                    points_earned = {rules.points_sql('picks', 'm')}
+                FROM matches m
+                WHERE m.id = picks.match_id
+                  AND {match_filter} AND {rules.scored_match_sql('m')}
+            """, params)
+            
+            if cursor.rowcount:
+                bump_sqlite_data_version(conn)
+            report_progress(picks_written=cursor.rowcount)
+            
+            if commit:
+                conn.commit()
+            logger.info(f"Updated points for Week {week}: {cursor.rowcount} picks scored")
             
         except sqlite3.Error as e:
             logger.error(f"Database error calculating points for Week {week}: {e}")
-            conn.rollback()
+            if commit:
+                conn.rollback()
+            else:
+                raise
     
     def update_team_eliminations(self, conn: sqlite3.Connection, week: int) -> None:
         """
@@ -258,61 +248,153 @@ class NFLGameValidator:
             logger.error(f"Database error in update_team_eliminations for Week {week}: {e}")
             conn.rollback()
     
-    def find_matching_game(self, conn: sqlite3.Connection, espn_game: Dict, week: int) -> Optional[int]:
-        """Find matching game in database based on ESPN data"""
+    def record_standings(self) -> int:
+        """
+        Append the standings snapshot of every completed week that has none yet
+        
+        Same code as the app (standings_history) on an ORM session over the validator's database.
+        """
         try:
-            cursor = conn.cursor()
-            
-            # Safely extract team names with fallback
-            home_team = espn_game.get('home_team')
-            away_team = espn_game.get('away_team')
+            from app import Match, Pick, User, StandingsHistory
             
-            if not home_team or not away_team:
-                logger.warning(f"Missing team names in ESPN data: home={home_team}, away={away_team}")
-                return None
+            if self._standings_engine is None:
+                self._standings_engine = create_engine(f"sqlite:///{self.db_path}")
+                register_sqlite_pragmas(self._standings_engine)
             
-            # Try exact match first
-            cursor.execute("""
-                SELECT m.id FROM match m
-                JOIN team ht ON m.home_team_id = ht.id
-                JOIN team at ON m.away_team_id = at.id
-                WHERE m.week = ? AND ht.name = ? AND at.name = ?
-            """, (week, home_team, away_team))
+            with Session(self._standings_engine) as session:
+                return record_completed_weeks(SimpleNamespace(session=session), Match, Pick, User, StandingsHistory)
             
-            result = cursor.fetchone()
-            if result:
-                return result['id']
+        except Exception as e:
+            logger.error(f"Error recording standings: {e}")
+            return 0
+    
+    def get_espn_season_scoreboard(self, year: int = 2025) -> Optional[Dict[int, Dict]]:
+        """Get ESPN scoreboard data for the whole regular season, split by week"""
+        try:
+            events_by_week = ESPNAPIClient().get_season_events(year)
+            return {week: {'events': events} for week, events in events_by_week.items()}
             
-            # Try fuzzy matching (in case team names differ slightly)
-            cursor.execute("""
-                SELECT m.id, ht.name as home_team, at.name as away_team FROM match m
-                JOIN team ht ON m.home_team_id = ht.id
-                JOIN team at ON m.away_team_id = at.id
-                WHERE m.week = ? AND m.is_completed = 0
-            """, (week,))
-            
-            matches = cursor.fetchall()
-            
-            for match in matches:
-                # Check if team names contain each other (fuzzy match)
-                if (home_team in match['home_team'] or match['home_team'] in home_team) and \
-                   (away_team in match['away_team'] or match['away_team'] in away_team):
-                    logger.info(f"Fuzzy matched: {home_team} vs {away_team} -> {match['home_team']} vs {match['away_team']}")
-                    return match['id']
-            
-            logger.warning(f"No matching game found for {away_team} @ {home_team} in Week {week}")
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch ESPN season data for {year}: {e}")
             return None
-            
-        except sqlite3.Error as e:
-            logger.error(f"Database error finding matching game: {e}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse ESPN season JSON for {year}: {e}")
             return None
     
-    def validate_week(self, week: int, year: int = 2025) -> bool:
-        """Validate all games for a specific week"""
-        logger.info(f"Starting validation for Week {week}")
+    def load_team_map(self, conn: sqlite3.Connection) -> Tuple[Dict[str, int], Dict[int, str]]:
+        """
+        Load all teams once: ({canonical abbreviation: team id}, {team id: canonical abbreviation})
+        
+        There is no team table - the team ids and names stored on the matches are resolved,
+        teams without a match yet use the resolver's team ids.
+        """
+        resolver = get_team_resolver()
+        ids_by_abbr = {abbreviation: team.id for abbreviation, team in resolver.teams().items()}
+        
+        for row in conn.execute("""
+            SELECT home_team_id AS id, home_team_name AS name FROM matches
+            UNION
+            SELECT away_team_id, away_team_name FROM matches
+        """).fetchall():
+            abbreviation = resolver.resolve(row['name'])
+            if abbreviation:
+                ids_by_abbr[abbreviation] = row['id']
+        
+        abbr_by_id = {team_id: abbreviation for abbreviation, team_id in ids_by_abbr.items()}
+        return ids_by_abbr, abbr_by_id
+    
+    def load_match_index(self, conn: sqlite3.Connection, week: int, espn_ids: List[str],
+                         abbr_by_id: Dict[int, str]) -> Tuple[Dict[str, Dict], Dict[Tuple[str, str], Dict]]:
+        """
+        Load the week's matches (plus matches already linked to the given ESPN events) in one query
+        
+        Returns:
+            ({espn_event_id: row}, {(home_abbr, away_abbr): row}) with rows as dicts
+        """
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(matches)").fetchall()}
+        placeholders = ', '.join('?' * len(espn_ids))
+        espn_filter = f" OR espn_event_id IN ({placeholders})" if espn_ids and 'espn_event_id' in columns else ""
+        params = [week, *espn_ids] if espn_filter else [week]
+        
+        # SELECT * so dry runs also work on tables that were not upgraded yet
+        rows = [dict(row) for row in conn.execute("SELECT * FROM matches WHERE week = ?" + espn_filter, params).fetchall()]
+        
+        by_espn_id = {row['espn_event_id']: row for row in rows if row.get('espn_event_id')}
+        by_teams = {
+            (abbr_by_id.get(row['home_team_id']), abbr_by_id.get(row['away_team_id'])): row
+            for row in rows if row['week'] == week
+        }
+        return by_espn_id, by_teams
+    
+    def diff_week(self, conn: sqlite3.Connection, week: int, espn_data: Dict, dry_run: bool = False) -> SyncDiff:
+        """
+        Compare a week's ESPN results with the database in memory
+        
+        Returns:
+            SyncDiff: Only the changed columns (results, winner, ESPN link, week moves) of changed matches
+        """
+        resolver = get_team_resolver()
+        diff = SyncDiff('espn_validator', dry_run=dry_run)
+        
+        # Parse completed games first, then preload everything needed to resolve them
+        results = [result for result in map(self.parse_espn_game_result, espn_data.get('events', [])) if result]
+        espn_ids = [str(result['espn_id']) for result in results if result.get('espn_id')]
+        
+        ids_by_abbr, abbr_by_id = self.load_team_map(conn)
+        matches_by_espn_id, matches_by_teams = self.load_match_index(conn, week, espn_ids, abbr_by_id)
+        
+        for result_data in results:
+            espn_id = str(result_data['espn_id']) if result_data.get('espn_id') else None
+            home_abbr = resolver.resolve(result_data.get('home_team_abbr')) or resolver.resolve(result_data.get('home_team'))
+            away_abbr = resolver.resolve(result_data.get('away_team_abbr')) or resolver.resolve(result_data.get('away_team'))
+            
+            # ESPN event id first (also finds games moved to another week), then the team pair
+            match = matches_by_espn_id.get(espn_id) or matches_by_teams.get((home_abbr, away_abbr))
+            if match is None:
+                logger.warning(f"No matching game found for {result_data.get('away_team')} @ {result_data.get('home_team')} in Week {week}")
+                continue
+            
+            # Winner from the preloaded team map (a tie is completed without a winner, scored with tie_points)
+            winner_team_id = None
+            if result_data.get('winner_name'):
+                winner_team_id = ids_by_abbr.get(resolver.resolve(result_data['winner_name']))
+                if winner_team_id is None:
+                    logger.warning(f"Could not find team ID for winner: {result_data['winner_name']}")
+                    continue
+            
+            values = {
+                'week': week,
+                'espn_event_id': espn_id or match.get('espn_event_id'),
+                'is_completed': True,
+                'winner_team_id': winner_team_id,
+                'home_score': result_data['home_score'],
+                'away_score': result_data['away_score'],
+                'sync_fingerprint': game_fingerprint(
+                    start_time=result_data.get('start_time'),
+                    is_completed=True,
+                    home_score=result_data.get('home_score'),
+                    away_score=result_data.get('away_score')
+                )
+            }
+            
+            if diff.compare(match['id'], match, values, f"{away_abbr} @ {home_abbr}"):
+                logger.info(f"{'Would update' if dry_run else 'Updated'} match {match['id']}: {result_data.get('result', 'Unknown result')}")
+        
+        return diff
+    
+    def validate_week(self, week: int, year: int = 2025, espn_data: Optional[Dict] = None, dry_run: bool = False) -> bool:
+        """
+        Validate all games for a specific week (optionally from preloaded ESPN data)
+        
+        The week is diffed in memory, changed columns are written with executemany
+        and the picks are scored with one UPDATE - all in one transaction. With
+        dry_run nothing is written; the change set is kept in last_diff.
+        """
+        logger.info(f"Starting validation for Week {week}{' (dry run)' if dry_run else ''}")
         
         # Get ESPN data
-        espn_data = self.get_espn_scoreboard(week, year)
+        if espn_data is None:
+            espn_data = self.get_espn_scoreboard(week, year)
         if not espn_data:
             logger.error(f"Failed to get ESPN data for Week {week}")
             return False
@@ -321,56 +403,47 @@ class NFLGameValidator:
         conn = self.get_database_connection()
         
         try:
-            games = espn_data.get('events', [])
-            updated_count = 0
-            
-            for game in games:
-                # Parse game result
-                result_data = self.parse_espn_game_result(game)
-                if not result_data:
-                    continue  # Game not completed yet
-                
-                # Find matching game in database
-                match_id = self.find_matching_game(conn, result_data, week)
-                if not match_id:
-                    continue
-                
-                # Look up winner team ID
-                cursor = conn.cursor()
-                winner_name = result_data.get('winner_name')
-                if not winner_name:
-                    logger.warning("Missing winner_name in result data")
-                    continue
-                    
-                cursor.execute("SELECT id FROM team WHERE name = ?", (winner_name,))
-                winner_team = cursor.fetchone()
-                if winner_team:
-                    result_data['winner_team_id'] = winner_team['id']
-                else:
-                    logger.warning(f"Could not find team ID for winner: {winner_name}")
-                    continue
-                
-                # Update game result
-                if self.update_game_result(conn, match_id, result_data):
-                    updated_count += 1
+            if not dry_run:
+                self.ensure_sync_columns(conn)
             
-            if updated_count > 0:
-                # Calculate points and update eliminations
-                self.calculate_user_points(conn, week)
+            diff = self.diff_week(conn, week, espn_data, dry_run=dry_run)
+            self.last_diff = diff
+            self.last_sync_stats = diff.stats
+            
+            if dry_run:
+                logger.info(f"Dry run for Week {week}: {len(diff.updates)} games would change, {diff.unchanged} unchanged")
+                return True
+            
+            diff.apply_to_sqlite(conn, 'matches')
+            
+            if diff.updates:
+                self.calculate_user_points(conn, week, match_ids=[update['id'] for update in diff.updates], commit=False)
+            
+            # One commit for links, results and pick scoring
+            if conn.in_transaction:
+                conn.commit()
+            
+            stats = diff.stats
+            if stats['updated'] > 0:
                 self.update_team_eliminations(conn, week)
-                
-                logger.info(f"Successfully validated Week {week}: {updated_count} games updated")
+                # Snapshot the standings once the week is final (its last game often has no picks)
+                self.record_standings()
+                logger.info(f"Successfully validated Week {week}: {stats['updated']} games updated, {stats['unchanged']} unchanged")
             else:
-                logger.info(f"No new completed games found for Week {week}")
+                logger.info(f"No new completed games found for Week {week} ({stats['unchanged']} unchanged)")
             
+            # Committed - let subscribers (usage, caches) react to the finished games
+            diff.publish_events()
+            report_progress(games_written=stats['updated'], games_unchanged=stats['unchanged'])
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error validating Week {week}: {e}")
+            conn.rollback()
             return False
         finally:
-            conn.close()
-    
+            self.release_database_connection(conn)
+
     def validate_current_week(self) -> bool:
         """Validate the current NFL week"""
         # Determine current week based on date
@@ -388,10 +461,16 @@ class NFLGameValidator:
         current_week = min(18, max(1, (days_since_start // 7) + 1))
         
         logger.info(f"Validating current week: {current_week}")
-        return self.validate_week(current_week)
+        with request_priority(PRIORITY_LIVE):
+            return self.validate_week(current_week)
     
-    def validate_all_incomplete_weeks(self) -> bool:
-        """Validate all weeks that have incomplete games"""
+    def validate_all_incomplete_weeks(self, dry_run: bool = False):
+        """
+        Validate all weeks that have incomplete games
+        
+        Returns:
+            bool, or the structured diff of all weeks for dry runs (None on error)
+        """
         conn = self.get_database_connection()
         
         try:
@@ -400,68 +479,94 @@ class NFLGameValidator:
             # Get all weeks with incomplete games
             cursor.execute("""
                 SELECT DISTINCT week 
-                FROM match 
-                WHERE completed = 0 AND week <= 18
+                FROM matches 
+                WHERE is_completed = 0 AND week <= 18
                 ORDER BY week
             """)
             
             incomplete_weeks = cursor.fetchall()
             
             success = True
-            for week_row in incomplete_weeks:
-                week = week_row['week']
-                if not self.validate_week(week):
-                    success = False
-            
+            season_diff = SyncDiff('espn_validator', dry_run=dry_run)
+            with request_priority(PRIORITY_BACKFILL):
+                # Several open weeks: load the season in a few range requests instead of one per week
+                season_data = None
+                if len(incomplete_weeks) > 1:
+                    season_data = self.get_espn_season_scoreboard()
+                
+                for week_row in incomplete_weeks:
+                    week = week_row['week']
+                    espn_data = season_data.get(week, {'events': []}) if season_data else None
+                    with job_stage(f'week_{week}'):
+                        if self.validate_week(week, espn_data=espn_data, dry_run=dry_run):
+                            season_diff.merge(self.last_diff)
+                            report_progress(weeks_validated=1)
+                        else:
+                            success = False
+            
+            self.last_diff = season_diff
+            if dry_run:
+                return season_diff.to_dict() if success else None
             return success
             
         except sqlite3.Error as e:
             logger.error(f"Database error getting incomplete weeks: {e}")
-            return False
+            return None if dry_run else False
         finally:
-            conn.close()
+            self.release_database_connection(conn)
 
 # Scheduler functions
+def register_validation_jobs(validator, live_poller=None, scheduler=None):
+    """
+    Register the validator jobs with the shared job scheduler (they only run in the leader process)
+    
+    Standalone validation service only - sync_worker.py runs the ESPN scheduler's results job and
+    live poller instead and keeps the validator for queued on-demand runs.
+    """
+    if scheduler is None:
+        # Leader lease and job state live in the app database (DATABASE_URL), not next to the validator's file
+        engine = create_engine(get_database_url())
+        register_sqlite_pragmas(engine)
+        scheduler = get_job_scheduler(engine)
+    
+    # Daily at midnight and Tuesday 6 AM (after MNF) - one job, so overlapping triggers run once
+    scheduler.add_job(
+        'validate_incomplete_weeks',
+        validator.validate_all_incomplete_weeks,
+        [Cron(0, 0), Cron(6, 0, weekdays='tue')],
+        name='Validate all incomplete weeks'
+    )
+    scheduler.add_job(
+        'validate_current_week',
+        validator.validate_current_week,
+        [],
+        name='Initial current week validation',
+        run_on_start=True
+    )
+    
+    # Live results are polled along the kickoff calendar instead of every 30 minutes
+    live_poller = live_poller or LiveGamePoller(validator_kickoff_loader(validator), validator.validate_week)
+    scheduler.add_leader_service(live_poller.name, live_poller.start, live_poller.stop)
+    
+    logger.info("NFL Game Validator jobs registered:")
+    logger.info("- Live games: Poll current week while games are running")
+    logger.info("- Daily at midnight: Validate all incomplete weeks")
+    logger.info("- Tuesday 6 AM: Final weekly validation")
+    return scheduler
+
 def run_validation_service():
-    """Run the validation service with scheduled tasks"""
+    """Run the validation service in the foreground (standalone process)"""
     try:
-        validator = NFLGameValidator()
-        
-        # Schedule validation tasks
-        schedule.every(30).minutes.do(validator.validate_current_week)  # Every 30 minutes during games
-        schedule.every().day.at("00:00").do(validator.validate_all_incomplete_weeks)  # Daily at midnight
-        schedule.every().tuesday.at("06:00").do(validator.validate_all_incomplete_weeks)  # Tuesday 6 AM (after MNF)
-        
-        logger.info("NFL Game Validator Service started")
-        logger.info("Scheduled tasks:")
-        logger.info("- Every 30 minutes: Validate current week")
-        logger.info("- Daily at midnight: Validate all incomplete weeks")
-        logger.info("- Tuesday 6 AM: Final weekly validation")
-        
-        # Run initial validation
-        try:
-            validator.validate_current_week()
-        except Exception as e:
-            logger.error(f"Error in initial validation: {e}")
-        
-        # Keep the service running
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-            except Exception as e:
-                logger.error(f"Error in validation service loop: {e}")
-                time.sleep(60)  # Continue running even if there's an error
-                
+        scheduler = register_validation_jobs(NFLGameValidator())
+        scheduler.start().join()
     except Exception as e:
         logger.error(f"Fatal error in validation service: {e}")
         raise
 
 def start_validation_service_thread():
-    """Start the validation service in a background thread"""
+    """Start the validation service in the shared scheduler thread"""
     try:
-        thread = threading.Thread(target=run_validation_service, daemon=True)
-        thread.start()
+        thread = register_validation_jobs(NFLGameValidator()).start()
         logger.info("Validation service thread started")
         return thread
     except Exception as e:
@@ -582,50 +687,15 @@ class NFLGameValidatorService:
     
     def __init__(self):
         self.validator = NFLGameValidator()
+        self.live_poller = LiveGamePoller(validator_kickoff_loader(self.validator), self.validator.validate_week)
         self.logger = logging.getLogger(__name__)
         
     def start_validation_service(self):
         """Start the background validation service"""
-        def run_validation():
-            while True:
-                try:
-                    current_time = datetime.now()
-                    current_hour = current_time.hour
-                    current_minute = current_time.minute
-                    current_weekday = current_time.weekday()  # 0=Monday, 6=Sunday
-                    
-                    # Every 30 minutes during game days (Friday-Tuesday)
-                    if current_weekday in [4, 5, 6, 0, 1] and current_minute % 30 == 0:
-                        self.validator.validate_current_week()
-                    
-                    # Daily at midnight - validate all incomplete weeks
-                    elif current_hour == 0 and current_minute == 0:
-                        self.validator.validate_all_incomplete_weeks()
-                    
-                    # Tuesday at 6 AM - final weekly validation (after Monday Night Football)
-                    elif current_weekday == 1 and current_hour == 6 and current_minute == 0:
-                        self.validator.validate_all_incomplete_weeks()
-                    
-                    # Tuesday at 7 AM - weekly schedule update
-                    elif current_weekday == 1 and current_hour == 7 and current_minute == 0:
-                        self.validator.update_weekly_schedule()
-                    
-                    time.sleep(60)  # Check every minute
-                    
-                except Exception as e:
-                    self.logger.error(f"Error in validation service: {e}")
-                    time.sleep(300)  # Wait 5 minutes on error
-        
-        validation_thread = threading.Thread(target=run_validation, daemon=True)
-        validation_thread.start()
+        # Same job registry as the standalone service and the ESPN scheduler
+        self.scheduler = register_validation_jobs(self.validator, self.live_poller)
+        self.scheduler.start()
         self.logger.info("Validation service thread started")
-        
-        # Log scheduled tasks
-        self.logger.info("Scheduled tasks:")
-        self.logger.info("- Every 30 minutes: Validate current week")
-        self.logger.info("- Daily at midnight: Validate all incomplete weeks")
-        self.logger.info("- Tuesday 6 AM: Final weekly validation (after Monday Night Football)")
-        self.logger.info("- Tuesday 7 AM: Weekly schedule update")
 
 # Global service instance
 validation_service = NFLGameValidatorService()
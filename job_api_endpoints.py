@@ -0,0 +1,152 @@
+"""
+Job API Endpoints for NFL PickEm 2025
+Web tier side of the job queue - enqueue syncs, poll or stream their progress, list recent runs and metrics
+(sync_worker.py runs the jobs)
+"""
+
+import os
+import json
+import time
+import logging
+from flask import jsonify, session, request, Response, stream_with_context
+from job_queue import FINISHED_STATES
+from job_metrics import get_job_metrics
+
+logger = logging.getLogger(__name__)
+
+# Job types that may be triggered from the web (handlers live in sync_worker.build_worker)
+WEB_JOB_TYPES = ('manual_sync', 'validate_incomplete_weeks', 'validate_week', 'calculate_all_points')
+
+# Players allowed to queue jobs (comma-separated usernames) - everyone else can only watch them
+ADMIN_USERNAMES = {name.strip().lower() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip()}
+
+# Server-sent events: check the job this often, close the stream after this long (EventSource reconnects).
+# Each open stream holds one gunicorn worker for up to SSE_MAX_SECONDS - keep it short against the worker count.
+SSE_POLL_SECONDS = 1.0
+SSE_MAX_SECONDS = float(os.environ.get('JOB_SSE_MAX_SECONDS', 30))
+
+def _is_job_operator():
+    """Logged-in player listed in ADMIN_USERNAMES"""
+    return session.get('username', '').lower() in ADMIN_USERNAMES
+
+def _job_snapshot(job):
+    """Fields a client needs to render a running or finished job"""
+    return {
+        'id': job['id'],
+        'job_type': job['job_type'],
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'max_attempts': job['max_attempts'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+        'progress': job['progress'],
+        'result': job['result'],
+        'last_error': job['last_error']
+    }
+
+def register_job_endpoints(app, queue):
+    """Register the job queue API endpoints"""
+
+    @app.route('/api/jobs', methods=['POST'])
+    def enqueue_job():
+        """Queue a job: {"job_type": "manual_sync", "payload": {...}} - returns immediately with the job id"""
+        try:
+            if 'user_id' not in session:
+                return jsonify({'success': False, 'message': 'Not logged in'})
+            if not _is_job_operator():
+                return jsonify({'success': False, 'message': 'Not allowed to queue jobs'}), 403
+
+            data = request.get_json() or {}
+            job_type = data.get('job_type')
+            if job_type not in WEB_JOB_TYPES:
+                return jsonify({'success': False, 'message': f'Unknown job type: {job_type}'}), 400
+
+            job_id = queue.enqueue(job_type, data.get('payload') or None)
+            return jsonify({'success': True, 'job_id': job_id}), 202
+
+        except Exception as e:
+            logger.error(f"❌ Error queueing job: {e}")
+            return jsonify({'success': False, 'message': 'Could not queue job'}), 500
+
+    @app.route('/api/jobs/<int:job_id>')
+    def get_job(job_id):
+        """State, attempts, result and last error of one job"""
+        try:
+            if 'user_id' not in session:
+                return jsonify({'success': False, 'message': 'Not logged in'})
+
+            job = queue.get(job_id)
+            if job is None:
+                return jsonify({'success': False, 'message': 'Job not found'}), 404
+            return jsonify({'success': True, 'job': _job_snapshot(job)})
+
+        except Exception as e:
+            logger.error(f"❌ Error getting job {job_id}: {e}")
+            return jsonify({'success': False, 'message': 'Could not load job'}), 500
+
+    @app.route('/api/jobs')
+    def list_jobs():
+        """Recent runs with results and errors: ?limit=20&job_type=manual_sync&status=dead"""
+        try:
+            if 'user_id' not in session:
+                return jsonify({'success': False, 'message': 'Not logged in'})
+
+            jobs = queue.recent(
+                limit=min(request.args.get('limit', 20, type=int), 100),
+                job_type=request.args.get('job_type'),
+                status=request.args.get('status')
+            )
+            return jsonify({'success': True, 'jobs': [_job_snapshot(job) for job in jobs]})
+
+        except Exception as e:
+            logger.error(f"❌ Error listing jobs: {e}")
+            return jsonify({'success': False, 'jobs': []}), 500
+
+    @app.route('/api/jobs/metrics')
+    def get_job_metrics_summary():
+        """Latency, outcomes, rows written and overlaps per job from the rolling run log"""
+        try:
+            if 'user_id' not in session:
+                return jsonify({'success': False, 'message': 'Not logged in'})
+
+            return jsonify({'success': True, 'jobs': get_job_metrics().summary()})
+
+        except Exception as e:
+            logger.error(f"❌ Error getting job metrics: {e}")
+            return jsonify({'success': False, 'jobs': {}}), 500
+
+    @app.route('/api/jobs/<int:job_id>/events')
+    def stream_job(job_id):
+        """Server-sent events with the job snapshot whenever it changes, until the job is finished"""
+        if 'user_id' not in session:
+            return jsonify({'success': False, 'message': 'Not logged in'})
+
+        def events():
+            yield f"retry: {int(SSE_POLL_SECONDS * 2000)}\n\n"
+            last_snapshot = None
+            deadline = time.monotonic() + SSE_MAX_SECONDS
+
+            while time.monotonic() < deadline:
+                job = queue.get(job_id)
+                if job is None:
+                    yield f"event: error\ndata: {json.dumps({'message': 'Job not found'})}\n\n"
+                    return
+
+                snapshot = json.dumps(_job_snapshot(job), default=str)
+                if snapshot != last_snapshot:
+                    yield f"data: {snapshot}\n\n"
+                    last_snapshot = snapshot
+
+                if job['status'] in FINISHED_STATES:
+                    yield f"event: done\ndata: {snapshot}\n\n"
+                    return
+                time.sleep(SSE_POLL_SECONDS)
+
+        return Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    logger.info("✅ Job API endpoints registered successfully")
@@ -0,0 +1,205 @@
+"""
+Job Metrics for NFL PickEm 2025
+Latency, outcome, rows written and overlap of every scheduled/queued job run - kept in a rolling
+JSON-lines log on disk (shared by all processes on the host) and summarized for the metrics endpoint
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+# Rolling run log: JOB_METRICS_LOG, rotated at 1 MB with 5 backups
+JOB_METRICS_LOG = os.environ.get('JOB_METRICS_LOG', os.path.join('logs', 'job_metrics.jsonl'))
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUP_COUNT = 5
+
+# Runs per job kept in memory / used for the summary statistics
+RUN_WINDOW = 50
+
+# A job counts as slowing down when its last run takes this many times its median
+SLOWDOWN_FACTOR = 2.0
+
+SUCCESS = 'success'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def rows_written(counters):
+    """Rows written according to the job progress counters (all '*_written' counters)"""
+    return sum(value for name, value in (counters or {}).items() if name.endswith('_written'))
+
+
+class JobMetrics:
+    """Records job runs and summarizes them per job"""
+
+    def __init__(self, log_path=JOB_METRICS_LOG, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT, window=RUN_WINDOW):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.window = window
+        self._runs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._run_log = None
+
+    def _log(self):
+        """Dedicated rotating logger for the run records (created on first use)"""
+        if self._run_log is None and self.log_path:
+            run_log = logging.getLogger(f"{__name__}.runs")
+            run_log.propagate = False
+            run_log.setLevel(logging.INFO)
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                handler = RotatingFileHandler(self.log_path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                run_log.addHandler(handler)
+            except OSError as e:
+                logger.warning(f"⚠️ Job metrics log {self.log_path} unavailable: {e}")
+            self._run_log = run_log
+        return self._run_log
+
+    def _record(self, record):
+        with self._lock:
+            self._runs.setdefault(record['job'], deque(maxlen=self.window)).append(record)
+        run_log = self._log()
+        if run_log is not None:
+            run_log.info(json.dumps(record, default=str))
+
+    def start(self, job, source):
+        """
+        Start timing a run
+
+        A run that starts while another run of the same job is active in this process counts as overlap.
+
+        Returns:
+            Dict: Run handle for finish()
+        """
+        with self._lock:
+            active = self._active.get(job, 0)
+            self._active[job] = active + 1
+
+        if active:
+            logger.warning(f"⚠️ Job {job} started while {active} run(s) still active")
+        return {
+            'job': job,
+            'source': source,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'overlapped': bool(active),
+            '_started': time.monotonic()
+        }
+
+    def finish(self, run, success, error=None, counters=None):
+        """Record the outcome, duration and rows written of a run"""
+        with self._lock:
+            self._active[run['job']] = max(0, self._active.get(run['job'], 1) - 1)
+
+        record = {key: value for key, value in run.items() if not key.startswith('_')}
+        record.update({
+            'outcome': SUCCESS if success else FAILED,
+            'duration': round(time.monotonic() - run['_started'], 3),
+            'rows_written': rows_written(counters),
+            'counters': counters or {},
+            'error': str(error) if error else None
+        })
+        self._record(record)
+
+        logger.info(f"⏱️ Job {run['job']} {record['outcome']} in {record['duration']:.1f}s ({record['rows_written']} rows written)")
+        return record
+
+    def record_skip(self, job, source, reason):
+        """A due run that did not start because the previous one is still running or queued"""
+        logger.warning(f"⚠️ Job {job} skipped: {reason}")
+        self._record({
+            'job': job,
+            'source': source,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'overlapped': True,
+            'outcome': SKIPPED,
+            'duration': None,
+            'rows_written': 0,
+            'counters': {},
+            'error': reason
+        })
+
+    def _read_log(self):
+        """Run records from the rolling log, oldest first (all processes writing to it)"""
+        paths = [f"{self.log_path}.{index}" for index in range(self.backup_count, 0, -1)] + [self.log_path]
+        runs = {}
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as log_file:
+                for line in log_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    runs.setdefault(record['job'], deque(maxlen=self.window)).append(record)
+        return runs
+
+    def summary(self):
+        """
+        Per-job statistics over the recent runs
+
+        Returns:
+            Dict[str, Dict]: {job: {'runs', 'successes', 'failures', 'skipped', 'overlaps', 'duration': {...},
+                                    'rows_written': {...}, 'slowing_down', 'last': {...}}}
+        """
+        try:
+            runs = self._read_log() if self.log_path and os.path.exists(self.log_path) else None
+        except OSError as e:
+            logger.warning(f"⚠️ Could not read job metrics log: {e}")
+            runs = None
+        if runs is None:
+            with self._lock:
+                runs = {job: list(records) for job, records in self._runs.items()}
+
+        summary = {}
+        for job, records in runs.items():
+            records = list(records)
+            durations = [record['duration'] for record in records if record['outcome'] != SKIPPED]
+            written = [record['rows_written'] for record in records if record['outcome'] != SKIPPED]
+            stats = {
+                'runs': len(durations),
+                'successes': sum(1 for record in records if record['outcome'] == SUCCESS),
+                'failures': sum(1 for record in records if record['outcome'] == FAILED),
+                'skipped': sum(1 for record in records if record['outcome'] == SKIPPED),
+                'overlaps': sum(1 for record in records if record['overlapped']),
+                'duration': None,
+                'rows_written': None,
+                'slowing_down': False,
+                'last': records[-1]
+            }
+            if durations:
+                median = _percentile(durations, 0.5)
+                stats['duration'] = {
+                    'last': durations[-1],
+                    'avg': round(sum(durations) / len(durations), 3),
+                    'median': median,
+                    'p95': _percentile(durations, 0.95),
+                    'max': max(durations)
+                }
+                stats['rows_written'] = {'last': written[-1], 'total': sum(written)}
+                stats['slowing_down'] = len(durations) >= 5 and durations[-1] > SLOWDOWN_FACTOR * max(median, 1)
+            summary[job] = stats
+        return summary
+
+
+_metrics = JobMetrics()
+
+
+def get_job_metrics():
+    """Process-wide job metrics"""
+    return _metrics
@@ -0,0 +1,115 @@
+"""
+Job Progress for NFL PickEm 2025
+Progress of the job running in the current thread (stages, counters, elapsed per stage) -
+sync code reports it, the sync worker persists it for the job status API
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes (stage changes are always written)
+FLUSH_INTERVAL = 2.0
+
+_progress_context = threading.local()
+
+
+class JobProgress:
+    """Stages with elapsed time plus free-form counters (weeks_fetched, games_written, ...)"""
+
+    def __init__(self, flush=None, flush_interval=FLUSH_INTERVAL):
+        """
+        Args:
+            flush: Callable(progress_dict) that stores the progress (e.g. JobQueue.update_progress)
+        """
+        self.flush_callback = flush
+        self.flush_interval = flush_interval
+        self.started = time.monotonic()
+        self.stages = []
+        self.counters = {}
+        self.message = None
+        self._current = None
+        self._last_flush = 0.0
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; nested stages are recorded as 'outer/inner'"""
+        parent = self._current
+        entry = {'name': f"{parent['name']}/{name}" if parent else name, 'status': 'running', 'elapsed': None}
+        self.stages.append(entry)
+        self._current = entry
+        started = time.monotonic()
+        self.flush(force=True)
+        try:
+            yield entry
+            entry['status'] = 'done'
+        except Exception:
+            entry['status'] = 'failed'
+            raise
+        finally:
+            entry['elapsed'] = round(time.monotonic() - started, 2)
+            self._current = parent
+            self.flush(force=True)
+
+    def add(self, **counters):
+        """Increment counters"""
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + (value or 0)
+        self.flush()
+
+    def note(self, message):
+        self.message = message
+        self.flush()
+
+    def to_dict(self):
+        return {
+            'stage': self._current['name'] if self._current else None,
+            'stages': [dict(stage) for stage in self.stages],
+            'counters': dict(self.counters),
+            'message': self.message,
+            'elapsed': round(time.monotonic() - self.started, 2)
+        }
+
+    def flush(self, force=False):
+        if self.flush_callback is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        try:
+            self.flush_callback(self.to_dict())
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store job progress: {e}")
+
+
+@contextmanager
+def track_job_progress(progress):
+    """Make progress the current thread's job progress"""
+    previous = getattr(_progress_context, 'progress', None)
+    _progress_context.progress = progress
+    try:
+        yield progress
+    finally:
+        _progress_context.progress = previous
+
+
+def current_job_progress():
+    """Progress of the job running in this thread (None outside the sync worker)"""
+    return getattr(_progress_context, 'progress', None)
+
+
+def job_stage(name):
+    """Stage of the current job - a no-op outside the sync worker"""
+    progress = current_job_progress()
+    return progress.stage(name) if progress is not None else nullcontext()
+
+
+def report_progress(**counters):
+    """Increment counters of the current job - a no-op outside the sync worker"""
+    progress = current_job_progress()
+    if progress is not None:
+        progress.add(**counters)
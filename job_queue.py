@@ -0,0 +1,286 @@
+"""
+Job Queue for NFL PickEm 2025
+Durable job table (SQLite or Postgres) - the web tier enqueues, sync_worker.py claims and runs
+"""
+
+import os
+import json
+import socket
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Text, Float, Index,
+    select, insert, update, delete, and_, or_, inspect, text
+)
+
+logger = logging.getLogger(__name__)
+
+# Job states: queued -> running -> succeeded | queued again (retry) | dead (retries exhausted)
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+DEAD = 'dead'
+OPEN_STATES = (QUEUED, RUNNING)
+FINISHED_STATES = (SUCCEEDED, DEAD)
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30          # 30s, 60s, 120s, ... between attempts
+CLAIM_LEASE_SECONDS = 15 * 60    # A running job without heartbeat for this long is reclaimed
+KEEP_FINISHED_DAYS = 30          # Results and errors of finished jobs are kept this long
+
+metadata = MetaData()
+
+jobs_table = Table(
+    'job_queue', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('job_type', String(50), nullable=False),
+    Column('payload', Text),
+    Column('status', String(20), nullable=False, default=QUEUED),
+    Column('attempts', Integer, nullable=False, default=0),
+    Column('max_attempts', Integer, nullable=False, default=DEFAULT_MAX_ATTEMPTS),
+    Column('run_after', Float, nullable=False),
+    Column('locked_by', String(120)),
+    Column('lease_expires', Float),
+    Column('created_at', String(50)),
+    Column('started_at', String(50)),
+    Column('finished_at', String(50)),
+    Column('result', Text),
+    Column('last_error', Text),
+    Column('progress', Text),
+    Index('ix_job_queue_status_run_after', 'status', 'run_after')
+)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, default=str) if value is not None else None
+
+
+def _loads(value):
+    return json.loads(value) if value else None
+
+
+def worker_id():
+    """Identifier of this worker process (host:pid)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """Enqueue, claim, complete and retry jobs in the job_queue table"""
+
+    def __init__(self, engine, lease_seconds=CLAIM_LEASE_SECONDS):
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self._table_ready = False
+
+    def ensure_table(self):
+        """Create the job table, add columns missing in older versions of it"""
+        if self._table_ready:
+            return
+
+        metadata.create_all(self.engine, checkfirst=True)
+        existing = {column['name'] for column in inspect(self.engine).get_columns(jobs_table.name)}
+        with self.engine.begin() as conn:
+            for column in jobs_table.columns:
+                if column.name not in existing:
+                    conn.execute(text(f"ALTER TABLE {jobs_table.name} ADD COLUMN {column.name} {column.type.compile(self.engine.dialect)}"))
+                    logger.info(f"✅ Added column {jobs_table.name}.{column.name}")
+        self._table_ready = True
+
+    def enqueue(self, job_type, payload=None, max_attempts=DEFAULT_MAX_ATTEMPTS, delay=0, dedupe=True):
+        """
+        Add a job
+
+        Args:
+            payload: JSON-serializable arguments for the handler
+            delay: Seconds before the job may be claimed
+            dedupe: Return the open (queued/running) job with the same type and payload instead of adding one
+
+        Returns:
+            int: Job id
+        """
+        self.ensure_table()
+        payload_json = _dumps(payload)
+        now = _now()
+
+        with self.engine.begin() as conn:
+            if dedupe:
+                existing = self.find_open(job_type, payload, conn)
+                if existing is not None:
+                    logger.info(f"⏭️ Job {job_type} already open as #{existing}")
+                    return existing
+
+            job_id = conn.execute(insert(jobs_table).values(
+                job_type=job_type,
+                payload=payload_json,
+                status=QUEUED,
+                attempts=0,
+                max_attempts=max_attempts,
+                run_after=now.timestamp() + delay,
+                created_at=now.isoformat()
+            )).inserted_primary_key[0]
+
+        logger.info(f"📥 Job {job_type} queued as #{job_id}")
+        return job_id
+
+    def find_open(self, job_type, payload=None, conn=None):
+        """Id of the oldest queued or running job with this type and payload (None if there is none)"""
+        if conn is None:
+            self.ensure_table()
+            with self.engine.connect() as conn:
+                return self.find_open(job_type, payload, conn)
+
+        payload_json = _dumps(payload)
+        return conn.execute(select(jobs_table.c.id).where(
+            jobs_table.c.job_type == job_type,
+            jobs_table.c.status.in_(OPEN_STATES),
+            jobs_table.c.payload == payload_json if payload_json is not None else jobs_table.c.payload.is_(None)
+        ).order_by(jobs_table.c.id).limit(1)).scalar()
+
+    def claim(self, owner=None, job_types=None):
+        """
+        Claim the oldest runnable job (status queued and due, or running with an expired lease)
+
+        The conditional UPDATE makes the claim atomic across worker processes.
+
+        Returns:
+            Dict or None: The claimed job
+        """
+        self.ensure_table()
+        owner = owner or worker_id()
+        now = _now()
+
+        runnable = or_(
+            and_(jobs_table.c.status == QUEUED, jobs_table.c.run_after <= now.timestamp()),
+            and_(jobs_table.c.status == RUNNING, jobs_table.c.lease_expires < now.timestamp())
+        )
+        if job_types is not None:
+            runnable = and_(runnable, jobs_table.c.job_type.in_(list(job_types)))
+
+        with self.engine.begin() as conn:
+            candidates = conn.execute(
+                select(jobs_table.c.id, jobs_table.c.status).where(runnable).order_by(jobs_table.c.run_after, jobs_table.c.id).limit(5)
+            ).all()
+
+            for job_id, status in candidates:
+                claimed = conn.execute(update(jobs_table).where(
+                    jobs_table.c.id == job_id, jobs_table.c.status == status, runnable
+                ).values(
+                    status=RUNNING,
+                    locked_by=owner,
+                    lease_expires=now.timestamp() + self.lease_seconds,
+                    attempts=jobs_table.c.attempts + 1,
+                    started_at=now.isoformat(),
+                    progress=None
+                )).rowcount
+                if claimed:
+                    if status == RUNNING:
+                        logger.warning(f"⚠️ Job #{job_id} reclaimed after its worker stopped heartbeating")
+                    return self.get(job_id, conn)
+        return None
+
+    def heartbeat(self, job_id, owner=None):
+        """Extend the claim of a long-running job (False if another worker took it over)"""
+        with self.engine.begin() as conn:
+            return conn.execute(update(jobs_table).where(
+                jobs_table.c.id == job_id,
+                jobs_table.c.status == RUNNING,
+                jobs_table.c.locked_by == (owner or worker_id())
+            ).values(lease_expires=_now().timestamp() + self.lease_seconds)).rowcount == 1
+
+    def update_progress(self, job_id, progress):
+        """Store the progress dict of a running job (see job_progress.JobProgress)"""
+        with self.engine.begin() as conn:
+            conn.execute(update(jobs_table).where(jobs_table.c.id == job_id).values(progress=_dumps(progress)))
+
+    def complete(self, job_id, result=None, progress=None):
+        """Mark a job as succeeded and store its result"""
+        values = {'progress': _dumps(progress)} if progress is not None else {}
+        with self.engine.begin() as conn:
+            conn.execute(update(jobs_table).where(jobs_table.c.id == job_id).values(
+                **values,
+                status=SUCCEEDED,
+                result=_dumps(result),
+                last_error=None,
+                lease_expires=None,
+                finished_at=_now().isoformat()
+            ))
+
+    def fail(self, job_id, error, progress=None):
+        """
+        Record a failed attempt - requeue with exponential backoff or move to the dead letter state
+
+        Returns:
+            str: New status (queued or dead)
+        """
+        now = _now()
+        with self.engine.begin() as conn:
+            attempts, max_attempts = conn.execute(
+                select(jobs_table.c.attempts, jobs_table.c.max_attempts).where(jobs_table.c.id == job_id)
+            ).one()
+
+            values = {'last_error': str(error), 'lease_expires': None, 'locked_by': None}
+            if progress is not None:
+                values['progress'] = _dumps(progress)
+            if attempts >= max_attempts:
+                values.update(status=DEAD, finished_at=now.isoformat())
+            else:
+                values.update(status=QUEUED, run_after=now.timestamp() + RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            conn.execute(update(jobs_table).where(jobs_table.c.id == job_id).values(**values))
+
+        if values['status'] == DEAD:
+            logger.error(f"❌ Job #{job_id} moved to dead letter after {attempts} attempts: {error}")
+        else:
+            logger.warning(f"⚠️ Job #{job_id} failed (attempt {attempts}/{max_attempts}), retrying: {error}")
+        return values['status']
+
+    def retry(self, job_id):
+        """Put a dead job back into the queue"""
+        with self.engine.begin() as conn:
+            return conn.execute(update(jobs_table).where(
+                jobs_table.c.id == job_id, jobs_table.c.status == DEAD
+            ).values(status=QUEUED, attempts=0, run_after=_now().timestamp(), finished_at=None)).rowcount == 1
+
+    def get(self, job_id, conn=None):
+        """Job as a dict (payload and result decoded), None if unknown"""
+        if conn is None:
+            self.ensure_table()
+            with self.engine.connect() as conn:
+                return self.get(job_id, conn)
+
+        row = conn.execute(select(jobs_table).where(jobs_table.c.id == job_id)).mappings().first()
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ('payload', 'result', 'progress'):
+            job[field] = _loads(job[field])
+        return job
+
+    def recent(self, limit=20, job_type=None, status=None):
+        """Most recent jobs, newest first"""
+        self.ensure_table()
+        query = select(jobs_table.c.id).order_by(jobs_table.c.id.desc()).limit(limit)
+        if job_type is not None:
+            query = query.where(jobs_table.c.job_type == job_type)
+        if status is not None:
+            query = query.where(jobs_table.c.status == status)
+
+        with self.engine.connect() as conn:
+            return [self.get(job_id, conn) for job_id in conn.execute(query).scalars().all()]
+
+    def prune(self, keep_days=KEEP_FINISHED_DAYS):
+        """Delete succeeded and dead jobs that finished more than keep_days ago (returns the count)"""
+        self.ensure_table()
+        cutoff = datetime.fromtimestamp(_now().timestamp() - keep_days * 86400, timezone.utc).isoformat()
+        with self.engine.begin() as conn:
+            deleted = conn.execute(delete(jobs_table).where(
+                jobs_table.c.status.in_(FINISHED_STATES),
+                jobs_table.c.finished_at < cutoff
+            )).rowcount
+        if deleted:
+            logger.info(f"🧹 Pruned {deleted} finished jobs older than {keep_days} days")
+        return deleted
@@ -0,0 +1,593 @@
+"""
+Job Scheduler for NFL PickEm 2025
+One job registry for all background syncs - deduplicated runs, per-job concurrency limits and
+leader election through a lease row, so only one process runs them however many workers start
+"""
+
+import os
+import socket
+import logging
+import threading
+import uuid
+from datetime import datetime, time, timedelta, timezone
+
+import pytz
+from sqlalchemy import text
+from job_progress import JobProgress, track_job_progress
+from job_metrics import get_job_metrics
+
+logger = logging.getLogger(__name__)
+
+VIENNA_TZ = pytz.timezone('Europe/Vienna')
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+# Seconds between scheduler ticks - the leader lease expires after SCHEDULER_LEASE_TICKS missed renewals
+DEFAULT_TICK_SECONDS = 30
+SCHEDULER_LEASE_TICKS = 3
+
+CREATE_LEASE_TABLE = """
+    CREATE TABLE IF NOT EXISTS scheduler_leases (
+        name VARCHAR(50) PRIMARY KEY,
+        owner VARCHAR(120) NOT NULL,
+        expires_at FLOAT NOT NULL,
+        acquired_at VARCHAR(50)
+    )
+"""
+RENEW_LEASE = """
+    UPDATE scheduler_leases SET owner = :owner, expires_at = :expires_at,
+        acquired_at = CASE WHEN owner = :owner THEN acquired_at ELSE :acquired_at END
+    WHERE name = :name AND (owner = :owner OR expires_at < :now)
+"""
+INSERT_LEASE = """
+    INSERT INTO scheduler_leases (name, owner, expires_at, acquired_at) VALUES (:name, :owner, :expires_at, :acquired_at)
+    ON CONFLICT (name) DO NOTHING
+"""
+RELEASE_LEASE = "DELETE FROM scheduler_leases WHERE name = :name AND owner = :owner"
+
+# Last run / last success per job - survives restarts, drives the catch-up of missed runs
+CREATE_JOB_STATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS scheduler_job_state (
+        job_id VARCHAR(50) PRIMARY KEY,
+        last_run_at VARCHAR(50),
+        last_success_at VARCHAR(50),
+        last_outcome VARCHAR(20),
+        last_error TEXT
+    )
+"""
+UPSERT_JOB_STATE = """
+    INSERT INTO scheduler_job_state (job_id, last_run_at, last_success_at, last_outcome, last_error)
+    VALUES (:job_id, :last_run_at, :last_success_at, :last_outcome, :last_error)
+    ON CONFLICT (job_id) DO UPDATE SET
+        last_run_at = :last_run_at,
+        last_success_at = COALESCE(:last_success_at, scheduler_job_state.last_success_at),
+        last_outcome = :last_outcome,
+        last_error = :last_error
+"""
+
+
+class Cron:
+    """Fixed time of day (Vienna time), optionally on certain weekdays only"""
+
+    def __init__(self, hour, minute=0, weekdays=None, tz=VIENNA_TZ):
+        """
+        Args:
+            weekdays: 'tue', ('sat', 'sun') or None for every day
+        """
+        if isinstance(weekdays, str):
+            weekdays = (weekdays,)
+        self.hour = hour
+        self.minute = minute
+        self.weekdays = tuple(WEEKDAYS.index(day) for day in weekdays) if weekdays else None
+        self.tz = tz
+
+    def next_after(self, moment):
+        """First run time strictly after moment (aware datetime)"""
+        day = moment.astimezone(self.tz).date()
+        for offset in range(8):
+            candidate_day = day + timedelta(days=offset)
+            if self.weekdays is not None and candidate_day.weekday() not in self.weekdays:
+                continue
+            candidate = self.tz.localize(datetime.combine(candidate_day, time(self.hour, self.minute)))
+            if candidate > moment:
+                return candidate
+        return None
+
+    def previous_before(self, moment):
+        """Last run time at or before moment (None if there was none in the past week)"""
+        day = moment.astimezone(self.tz).date()
+        for offset in range(8):
+            candidate_day = day - timedelta(days=offset)
+            if self.weekdays is not None and candidate_day.weekday() not in self.weekdays:
+                continue
+            candidate = self.tz.localize(datetime.combine(candidate_day, time(self.hour, self.minute)))
+            if candidate <= moment:
+                return candidate
+        return None
+
+    def __repr__(self):
+        days = ','.join(WEEKDAYS[day] for day in self.weekdays) if self.weekdays else 'daily'
+        return f"Cron({days} {self.hour:02d}:{self.minute:02d})"
+
+
+class Interval:
+    """Every n seconds"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def next_after(self, moment):
+        return moment + timedelta(seconds=self.seconds)
+
+    def previous_before(self, moment):
+        return moment - timedelta(seconds=self.seconds)
+
+    def __repr__(self):
+        return f"Interval({self.seconds}s)"
+
+
+class LeaderLease:
+    """
+    Leader election through one lease row per scheduler name
+
+    The holder renews the row every tick; another process takes it over once it expired.
+    Works with SQLite and Postgres (plain UPDATE / INSERT ... ON CONFLICT).
+    """
+
+    def __init__(self, engine, name='sync-scheduler', ttl=DEFAULT_TICK_SECONDS * SCHEDULER_LEASE_TICKS):
+        self.engine = engine
+        self.name = name
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._table_ready = False
+
+    def _params(self):
+        now = datetime.now(timezone.utc)
+        return {
+            'name': self.name,
+            'owner': self.owner,
+            'now': now.timestamp(),
+            'expires_at': now.timestamp() + self.ttl,
+            'acquired_at': now.isoformat()
+        }
+
+    def acquire(self):
+        """Take or renew the lease - True if this process is the leader"""
+        try:
+            with self.engine.begin() as conn:
+                if not self._table_ready:
+                    conn.execute(text(CREATE_LEASE_TABLE))
+                    self._table_ready = True
+
+                params = self._params()
+                if conn.execute(text(RENEW_LEASE), params).rowcount:
+                    return True
+                return conn.execute(text(INSERT_LEASE), params).rowcount == 1
+        except Exception as e:
+            logger.warning(f"⚠️ Leader lease {self.name} unavailable: {e}")
+            return False
+
+    def release(self):
+        """Give the lease up (on shutdown) so another process can take over right away"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(RELEASE_LEASE), {'name': self.name, 'owner': self.owner})
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release leader lease {self.name}: {e}")
+
+    def holder(self):
+        """Current lease row as a dict (None if nobody holds it)"""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text("SELECT owner, expires_at, acquired_at FROM scheduler_leases WHERE name = :name"),
+                    {'name': self.name}
+                ).mappings().first()
+                return dict(row) if row else None
+        except Exception:
+            return None
+
+
+class JobStateStore:
+    """Persisted last run / last success per job (same database as the leader lease)"""
+
+    SEEDED = 'seeded'
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._table_ready = False
+
+    def _ensure_table(self, conn):
+        if not self._table_ready:
+            conn.execute(text(CREATE_JOB_STATE_TABLE))
+            self._table_ready = True
+
+    def load(self):
+        """{job_id: {'last_run_at', 'last_success_at', 'last_outcome', 'last_error'}} ({} if unavailable)"""
+        try:
+            with self.engine.begin() as conn:
+                self._ensure_table(conn)
+                rows = conn.execute(text("SELECT * FROM scheduler_job_state")).mappings().all()
+                return {row['job_id']: dict(row) for row in rows}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load scheduler job state: {e}")
+            return {}
+
+    def record(self, job_id, outcome, started_at, error=None):
+        """
+        Store a finished run
+
+        Args:
+            outcome: 'success', 'failed' or 'seeded' (first sight of a job - counts as covered)
+            started_at: ISO start time - a success covers every due time before it
+        """
+        try:
+            with self.engine.begin() as conn:
+                self._ensure_table(conn)
+                conn.execute(text(UPSERT_JOB_STATE), {
+                    'job_id': job_id,
+                    'last_run_at': started_at,
+                    'last_success_at': started_at if outcome in ('success', self.SEEDED) else None,
+                    'last_outcome': outcome,
+                    'last_error': str(error) if error else None
+                })
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store scheduler state of {job_id}: {e}")
+
+
+class Job:
+    """Registered job: callable, schedules and concurrency limit"""
+
+    def __init__(self, job_id, func, schedules, name=None, max_instances=1, leader_only=True):
+        self.id = job_id
+        self.func = func
+        self.schedules = list(schedules)
+        self.name = name or job_id
+        self.max_instances = max_instances
+        self.leader_only = leader_only
+        self.next_run = None
+        self.running = 0
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started = None
+        self.last_finished = None
+        self.last_result = None
+        self.last_error = None
+        self.last_success = None
+
+    def missed_run(self, now):
+        """Latest due time before now that no successful run covers (None if up to date)"""
+        due_times = [due for due in (schedule.previous_before(now) for schedule in self.schedules) if due]
+        if not due_times:
+            return None
+        last_due = max(due_times)
+        if self.last_success is None or datetime.fromisoformat(self.last_success) < last_due:
+            return last_due
+        return None
+
+    def compute_next_run(self, after):
+        candidates = [run for run in (schedule.next_after(after) for schedule in self.schedules) if run]
+        self.next_run = min(candidates) if candidates else None
+        return self.next_run
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'schedules': [repr(schedule) for schedule in self.schedules],
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'leader_only': self.leader_only,
+            'max_instances': self.max_instances,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_started': self.last_started,
+            'last_finished': self.last_finished,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+            'last_success': self.last_success
+        }
+
+
+class JobScheduler:
+    """Single scheduler loop: job registry, run deduplication and leader-only services"""
+
+    def __init__(self, lease=None, tick_seconds=DEFAULT_TICK_SECONDS, name='sync-scheduler', state=None):
+        self.lease = lease
+        self.state = state
+        self.tick_seconds = tick_seconds
+        self.name = name
+        self.jobs = {}
+        self.services = {}
+        self.queue = None
+        self.is_leader = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def use_lease(self, lease):
+        """Set the leader lease unless one is configured already"""
+        if self.lease is None:
+            self.lease = lease
+        return self.lease
+
+    def use_state(self, state):
+        """Persist last run / last success per job (set unless one is configured already)"""
+        if self.state is None:
+            self.state = state
+        return self.state
+
+    def use_queue(self, queue):
+        """Enqueue leader-only jobs into the durable job queue instead of running them in this process"""
+        self.queue = queue
+        return queue
+
+    def add_job(self, job_id, func, schedules, name=None, max_instances=1, leader_only=True, run_on_start=False):
+        """
+        Register a job (idempotent)
+
+        Registering an existing id merges the schedules instead of adding a second job, so
+        overlapping triggers (e.g. midnight and Tuesday 06:00) still run the job once per due time.
+
+        Args:
+            schedules: Cron / Interval or a list of them ([] = only run_on_start / run_job)
+            run_on_start: Also run once on the first tick (in the leader)
+        """
+        if not isinstance(schedules, (list, tuple)):
+            schedules = [schedules]
+
+        with self._lock:
+            job = self.jobs.get(job_id)
+            now = datetime.now(timezone.utc)
+            if job is None:
+                job = Job(job_id, func, schedules, name, max_instances, leader_only)
+                self.jobs[job_id] = job
+                job.compute_next_run(now)
+                if run_on_start:
+                    job.next_run = now
+            else:
+                known = {repr(schedule) for schedule in job.schedules}
+                job.schedules.extend(schedule for schedule in schedules if repr(schedule) not in known)
+                if job.next_run is None or job.next_run > now:
+                    job.compute_next_run(now)
+
+        logger.info(f"📅 Job {job.name}: {', '.join(repr(schedule) for schedule in job.schedules) or 'on demand'}")
+        return job
+
+    def add_leader_service(self, name, start, stop):
+        """Long-running service (e.g. the live game poller) that only runs in the leader process"""
+        with self._lock:
+            if name in self.services:
+                return False
+            self.services[name] = {'start': start, 'stop': stop, 'running': False}
+
+        if self.is_leader:
+            self._start_service(name)
+        return True
+
+    def _start_service(self, name):
+        service = self.services[name]
+        if not service['running']:
+            service['start']()
+            service['running'] = True
+            logger.info(f"✅ Leader service {name} started")
+
+    def _stop_service(self, name):
+        service = self.services[name]
+        if service['running']:
+            service['stop']()
+            service['running'] = False
+            logger.info(f"🛑 Leader service {name} stopped")
+
+    def _update_leadership(self, now=None):
+        leader = self.lease.acquire() if self.lease is not None else True
+        if leader != self.is_leader:
+            logger.info(f"👑 {self.name}: {'became leader' if leader else 'lost leadership'}")
+            self.is_leader = leader
+
+            # New leader (boot or failover): run every job that missed a due time once
+            if leader:
+                self.catch_up(now)
+
+        for name in list(self.services):
+            try:
+                if leader:
+                    self._start_service(name)
+                else:
+                    self._stop_service(name)
+            except Exception as e:
+                logger.error(f"❌ Leader service {name} failed: {e}")
+        return leader
+
+    def catch_up(self, now=None):
+        """
+        Schedule one run of every job whose last due time has no successful run since
+
+        Several missed runs collapse into one; jobs seen for the first time are only recorded,
+        so a new deployment does not re-sync everything.
+
+        Returns:
+            List[str]: Job ids scheduled for catch-up
+        """
+        if self.state is None:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        state = self.state.load()
+        caught_up = []
+        for job in list(self.jobs.values()):
+            if not job.schedules:
+                continue
+
+            job_state = state.get(job.id)
+            if job_state is None:
+                self.state.record(job.id, JobStateStore.SEEDED, now.isoformat())
+                job.last_success = now.isoformat()
+                continue
+
+            job.last_success = job_state['last_success_at']
+            missed = job.missed_run(now)
+            if missed is not None and (job.next_run is None or job.next_run > now):
+                logger.info(f"⏪ Catching up {job.name} (missed {missed.isoformat()})")
+                job.next_run = now
+                caught_up.append(job.id)
+        return caught_up
+
+    def run_job(self, job_id, wait=False):
+        """
+        Run a job now, respecting its concurrency limit (or enqueue it when a job queue is configured)
+
+        Returns:
+            bool: False if the job is unknown or already running max_instances times
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+
+        # Durable queue: a worker process runs it (an open job of the same type is reused)
+        if self.queue is not None and job.leader_only and not wait:
+            open_job = self.queue.find_open(job.id)
+            if open_job is not None:
+                job.skipped += 1
+                get_job_metrics().record_skip(job.id, 'scheduler', f"job #{open_job} still open")
+                return False
+            self.queue.enqueue(job.id, dedupe=False)
+            return True
+
+        with self._lock:
+            if job.running >= job.max_instances:
+                job.skipped += 1
+                get_job_metrics().record_skip(job.id, 'scheduler', 'still running')
+                return False
+            job.running += 1
+            job.last_started = datetime.now(timezone.utc).isoformat()
+
+        thread = threading.Thread(target=self._execute, args=(job,), name=f"job-{job_id}", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def _execute(self, job):
+        logger.info(f"🔄 Running job {job.name}")
+        error = None
+        metrics = get_job_metrics()
+        run = metrics.start(job.id, 'scheduler')
+        progress = JobProgress()
+        try:
+            # Jobs report failure by returning False (or raising)
+            with track_job_progress(progress):
+                success = job.func() is not False
+        except Exception as e:
+            success = False
+            error = str(e)
+            logger.error(f"❌ Job {job.name} failed: {e}")
+        metrics.finish(run, success, error, progress.counters)
+        if self.state is not None:
+            self.state.record(job.id, 'success' if success else 'failed', run['started_at'], error)
+
+        with self._lock:
+            job.running -= 1
+            job.runs += 1
+            job.failures += 0 if success else 1
+            job.last_finished = datetime.now(timezone.utc).isoformat()
+            job.last_result = 'success' if success else 'failed'
+            job.last_error = error
+            if success:
+                job.last_success = run['started_at']
+
+        logger.info(f"{'✅' if success else '❌'} Job {job.name} finished: {job.last_result}")
+
+    def tick(self, now=None):
+        """Renew leadership and start every due job once (returns the started job ids)"""
+        now = now or datetime.now(timezone.utc)
+        leader = self._update_leadership(now)
+
+        started = []
+        for job in list(self.jobs.values()):
+            if job.next_run is None or job.next_run > now:
+                continue
+
+            # Several due times since the last tick collapse into one run
+            job.compute_next_run(now)
+            if job.leader_only and not leader:
+                continue
+            if self.run_job(job.id):
+                started.append(job.id)
+        return started
+
+    def seconds_until_next_run(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        upcoming = [job.next_run for job in self.jobs.values() if job.next_run is not None]
+        if not upcoming:
+            return self.tick_seconds
+        return min(max(0, (min(upcoming) - now).total_seconds()), self.tick_seconds)
+
+    def run(self):
+        """Scheduler loop - runs until stop() is called"""
+        logger.info(f"🚀 {self.name} started")
+
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"❌ Error in {self.name}: {e}")
+            self._stop_event.wait(self.seconds_until_next_run())
+
+        for name in list(self.services):
+            self._stop_service(name)
+        if self.is_leader and self.lease is not None:
+            self.lease.release()
+        self.is_leader = False
+        logger.info(f"🛑 {self.name} stopped")
+
+    def start(self):
+        """Start the scheduler loop in a background thread (once per process)"""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        if self.lease is None:
+            logger.warning(f"⚠️ {self.name} has no leader lease - this process runs all jobs")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=10):
+        """Stop the loop, leader services and give up the lease"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def get_status(self):
+        return {
+            'running': self.running,
+            'is_leader': self.is_leader,
+            'queue': self.queue is not None,
+            'leader': self.lease.holder() if self.lease is not None else None,
+            'jobs': [job.to_dict() for job in self.jobs.values()],
+            'services': {name: service['running'] for name, service in self.services.items()}
+        }
+
+
+_scheduler = JobScheduler()
+
+
+def get_job_scheduler(engine=None):
+    """
+    Process-wide job scheduler
+
+    Args:
+        engine: SQLAlchemy engine for the leader lease (the first one configured wins)
+    """
+    if engine is not None and _scheduler.lease is None:
+        _scheduler.use_lease(LeaderLease(engine))
+        _scheduler.use_state(JobStateStore(engine))
+    return _scheduler
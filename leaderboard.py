@@ -0,0 +1,114 @@
+"""
+Leaderboard for NFL PickEm 2025
+Ranking in SQL with RANK()/DENSE_RANK() OVER a configurable tiebreaker chain, top-N and around-me slices
+"""
+
+import os
+import logging
+from sqlalchemy import select, func, case, or_, and_, literal
+
+logger = logging.getLogger(__name__)
+
+# Ranking keys in tiebreaker order - override with LEADERBOARD_TIEBREAKERS=points,correct_picks,...
+DEFAULT_TIEBREAKERS = ('points', 'correct_picks')
+TIEBREAKER_CHOICES = ('points', 'correct_picks', 'accuracy', 'username')
+
+# RANK() leaves gaps after ties (1, 1, 3), DENSE_RANK() does not (1, 1, 2) - LEADERBOARD_RANK_FUNCTION
+DEFAULT_RANK_FUNCTION = 'rank'
+
+
+def leaderboard_settings():
+    """Tiebreaker chain and rank function from the environment (falls back to the defaults)"""
+    tiebreakers = tuple(
+        key.strip() for key in os.environ.get('LEADERBOARD_TIEBREAKERS', ','.join(DEFAULT_TIEBREAKERS)).split(',')
+        if key.strip() in TIEBREAKER_CHOICES
+    ) or DEFAULT_TIEBREAKERS
+    rank_function = os.environ.get('LEADERBOARD_RANK_FUNCTION', DEFAULT_RANK_FUNCTION)
+    if rank_function not in ('rank', 'dense_rank'):
+        rank_function = DEFAULT_RANK_FUNCTION
+    return tiebreakers, rank_function
+
+
+def ranked_standings(User, Pick, Match, through_week=None, tiebreakers=None, rank_function=None):
+    """
+    CTE with one ranked row per user
+
+    Columns: user_id, username, points, correct_picks, total_picks, rank, position, total_users.
+    rank is shared by users equal on every tiebreaker; position is unique (for slicing).
+
+    Args:
+        through_week: Only count picks of matches up to this week (standings history)
+    """
+    default_tiebreakers, default_rank_function = leaderboard_settings()
+    tiebreakers = tiebreakers or default_tiebreakers
+    rank_function = rank_function or default_rank_function
+
+    totals = select(
+        Pick.user_id.label('user_id'),
+        func.coalesce(func.sum(Pick.points_earned), 0).label('points'),
+        func.count(Pick.id).filter(Pick.is_correct == True).label('correct_picks'),
+        func.count(Pick.id).label('total_picks')
+    ).join(Match, Pick.match_id == Match.id)
+    if through_week is not None:
+        totals = totals.where(Match.week <= through_week)
+    totals = totals.group_by(Pick.user_id).subquery('totals')
+
+    points = func.coalesce(totals.c.points, 0)
+    correct_picks = func.coalesce(totals.c.correct_picks, 0)
+    total_picks = func.coalesce(totals.c.total_picks, 0)
+    accuracy = case((total_picks > 0, correct_picks * literal(1.0) / total_picks), else_=0)
+
+    sort_keys = {
+        'points': points.desc(),
+        'correct_picks': correct_picks.desc(),
+        'accuracy': accuracy.desc(),
+        'username': User.username.asc()
+    }
+    order = [sort_keys[key] for key in tiebreakers]
+
+    rank_window = getattr(func, rank_function)().over(order_by=order)
+    # Stable, unique position: tiebreakers first, then username and id
+    position_window = func.row_number().over(order_by=order + [User.username.asc(), User.id.asc()])
+
+    return select(
+        User.id.label('user_id'),
+        User.username.label('username'),
+        points.label('points'),
+        correct_picks.label('correct_picks'),
+        total_picks.label('total_picks'),
+        rank_window.label('rank'),
+        position_window.label('position'),
+        func.count().over().label('total_users')
+    ).outerjoin(totals, totals.c.user_id == User.id).cte('ranked')
+
+
+def get_leaderboard_rows(db, User, Pick, Match, top=None, around_user_id=None, radius=2, through_week=None,
+                         tiebreakers=None, rank_function=None):
+    """
+    Ranked leaderboard rows, sliced in SQL
+
+    Args:
+        top: Only the first N positions (None = everyone, unless around_user_id limits it)
+        around_user_id: Also (or only) the rows within `radius` positions of this user
+        radius: Rows above and below around_user_id
+
+    Returns:
+        List[Dict]: Rows ordered by position
+    """
+    ranked = ranked_standings(User, Pick, Match, through_week, tiebreakers, rank_function)
+    query = select(ranked)
+
+    slices = []
+    if top is not None:
+        slices.append(ranked.c.position <= top)
+    if around_user_id is not None:
+        my_position = select(ranked.c.position).where(ranked.c.user_id == around_user_id).scalar_subquery()
+        slices.append(and_(
+            ranked.c.position >= my_position - radius,
+            ranked.c.position <= my_position + radius
+        ))
+    if slices:
+        query = query.where(or_(*slices))
+
+    rows = db.session.execute(query.order_by(ranked.c.position)).mappings().all()
+    return [dict(row) for row in rows]
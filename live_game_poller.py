@@ -0,0 +1,150 @@
+"""
+Live Game Poller for NFL PickEm 2025
+Polls game results only while games are running, driven by the kickoff calendar
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from rate_limiter import request_priority, PRIORITY_LIVE
+
+logger = logging.getLogger(__name__)
+
+
+def parse_kickoff(start_time):
+    """Parse a stored kickoff (datetime or ISO string) to an aware UTC datetime"""
+    if not start_time:
+        return None
+
+    if isinstance(start_time, str):
+        try:
+            start_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    return start_time.astimezone(timezone.utc)
+
+
+def validator_kickoff_loader(validator):
+    """Kickoff calendar from the matches table, read through NFLGameValidator's raw-sqlite connection"""
+    def load_kickoffs():
+        conn = validator.get_database_connection()
+        try:
+            rows = conn.execute("SELECT week, start_time, is_completed FROM matches WHERE week <= 18").fetchall()
+            return [(row['week'], row['start_time'], bool(row['is_completed'])) for row in rows]
+        finally:
+            validator.release_database_connection(conn)
+    return load_kickoffs
+
+
+class LiveGamePoller:
+    """Sleeps until the next kickoff, polls tightly while games run and idles between weeks"""
+
+    LIVE_POLL_INTERVAL = 120                         # Seconds between polls while games are running
+    OVERTIME_POLL_INTERVAL = 600                     # Game past its expected end but not final yet
+    GAME_DURATION = timedelta(hours=3, minutes=30)   # Expected kickoff-to-final time incl. overtime
+    STALE_AFTER = timedelta(hours=12)                # Never-finalized games stop being polled after this
+    MAX_SLEEP = 6 * 60 * 60                          # Re-read the calendar at least this often
+
+    def __init__(self, load_kickoffs, poll_week, name='live-game-poller'):
+        """
+        Args:
+            load_kickoffs: Callable returning (week, start_time, is_completed) tuples
+            poll_week: Callable that fetches and stores results for one week
+        """
+        self.load_kickoffs = load_kickoffs
+        self.poll_week = poll_week
+        self.name = name
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def next_poll(self, now=None):
+        """
+        Decide when to poll next
+
+        Returns:
+            (seconds_to_sleep, week_to_poll_now or None)
+        """
+        now = now or datetime.now(timezone.utc)
+
+        running_weeks = set()
+        overdue_weeks = set()
+        next_kickoff = None
+
+        for week, start_time, is_completed in self.load_kickoffs():
+            kickoff = parse_kickoff(start_time)
+            if kickoff is None or is_completed:
+                continue
+
+            if kickoff > now:
+                if next_kickoff is None or kickoff < next_kickoff:
+                    next_kickoff = kickoff
+            elif now - kickoff < self.GAME_DURATION:
+                running_weeks.add(week)
+            elif now - kickoff < self.STALE_AFTER:
+                overdue_weeks.add(week)
+
+        if running_weeks:
+            return self.LIVE_POLL_INTERVAL, min(running_weeks)
+
+        if overdue_weeks:
+            return self.OVERTIME_POLL_INTERVAL, min(overdue_weeks)
+
+        # All games final: sleep until the next kickoff (or idle between weeks)
+        if next_kickoff is not None:
+            return min(max((next_kickoff - now).total_seconds(), 1), self.MAX_SLEEP), None
+
+        return self.MAX_SLEEP, None
+
+    def has_live_games(self, now=None):
+        """True while at least one game is running or waiting for its final result"""
+        return self.next_poll(now)[1] is not None
+
+    def run(self):
+        """Polling loop - runs until stop() is called"""
+        logger.info(f"🏈 {self.name} started")
+
+        while not self._stop_event.is_set():
+            try:
+                delay, week = self.next_poll()
+
+                if week is not None:
+                    logger.info(f"🔄 Polling live results for Week {week}")
+                    with request_priority(PRIORITY_LIVE):
+                        self.poll_week(week)
+                else:
+                    logger.info(f"💤 No live games - next calendar check in {int(delay // 60)} minutes")
+
+            except Exception as e:
+                logger.error(f"❌ Error in {self.name}: {e}")
+                delay = self.OVERTIME_POLL_INTERVAL
+
+            # Sleep until the next poll, a stop() or a wake() after a schedule change
+            self._wake_event.wait(delay)
+            self._wake_event.clear()
+
+        logger.info(f"🛑 {self.name} stopped")
+
+    def start(self):
+        """Start the polling loop in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        self._stop_event.clear()
+        self._wake_event.clear()
+        self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wake(self, **payload):
+        """Re-read the kickoff calendar now (e.g. on schedule_changed)"""
+        self._wake_event.set()
+
+    def stop(self):
+        """Stop the polling loop"""
+        self._stop_event.set()
+        self._wake_event.set()
@@ -8,6 +8,8 @@ from sportsdata_integration import SportsDataAPI
 from datetime import datetime
 import logging
 from typing import List, Dict
+from pick_scoring import score_picks, points_by_user
+from standings_history import record_week_standings
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -53,7 +55,7 @@ class NFLResultsValidator:
         Args:
             current_week: Aktuelle NFL Woche
         """
-        from app import db, Team, Match
+        from app import db, Team, Match, Pick, User, StandingsHistory
         
         # Validiere alle Wochen bis zur aktuellen Woche - 1
         # (aktuelle Woche könnte noch laufende Spiele haben)
@@ -67,10 +69,18 @@ class NFLResultsValidator:
             processed_results = self.sportsdata_api.process_game_results(week_scores)
             
             # Matches in Datenbank updaten
-            for result in processed_results:
-                self._update_match_result(result)
+            updated_matches = [match for match in map(self._update_match_result, processed_results) if match]
+            
+            # Picks der neu abgeschlossenen Spiele mit einem UPDATE bewerten, dann Team Usage
+            db.session.flush()
+            score_picks(db, Match, Pick, match_ids=[match.id for match in updated_matches], commit=False)
+            for match in updated_matches:
+                self._validate_picks_for_match(match)
             
             db.session.commit()
+            
+            # Tabellenstand einmal pro abgeschlossener Woche festhalten
+            record_week_standings(db, Match, Pick, User, StandingsHistory, week)
             logger.info(f"✅ Week {week} validation completed")
     
     def _update_match_result(self, result: Dict):
@@ -79,6 +89,9 @@ class NFLResultsValidator:
         
         Args:
             result: Verarbeitetes Spielergebnis von SportsData.io
+        
+        Returns:
+            Das aktualisierte Match oder None
         """
         from app import db, Team, Match
         
@@ -88,7 +101,7 @@ class NFLResultsValidator:
         
         if not home_team or not away_team:
             logger.warning(f"⚠️ Teams not found: {result['home_team_abbr']} vs {result['away_team_abbr']}")
-            return
+            return None
         
         # Match finden
         match = Match.query.filter_by(
@@ -99,12 +112,12 @@ class NFLResultsValidator:
         
         if not match:
             logger.warning(f"⚠️ Match not found: Week {result['week']} - {result['home_team_abbr']} vs {result['away_team_abbr']}")
-            return
+            return None
         
         # Match bereits completed? Dann skip
         if match.is_completed:
             logger.debug(f"⏭️ Match already completed: Week {result['week']} - {result['home_team_abbr']} vs {result['away_team_abbr']}")
-            return
+            return None
         
         # Gewinner-Team finden
         winner_team = None
@@ -121,44 +134,23 @@ class NFLResultsValidator:
         
         logger.info(f"🏆 Updated match: Week {result['week']} - {result['winner_team_abbr']} wins ({result['home_team_abbr']} {result['home_score']}-{result['away_score']} {result['away_team_abbr']})")
         
-        # Picks für dieses Match validieren
-        self._validate_picks_for_match(match)
+        return match
     
     def _validate_picks_for_match(self, match):
         """
-        Validiert alle Picks für ein abgeschlossenes Match
+        Aktualisiert die Team Usage für alle Picks eines abgeschlossenen Matches
+        (Punkte vergibt score_picks() set-basiert für die ganze Woche)
         
         Args:
             match: Abgeschlossenes Match-Objekt
         """
-        from app import db, Pick, User, TeamWinnerUsage, TeamLoserUsage
+        from app import Pick
         
         if not match.is_completed or not match.winner_team_id:
             return
         
-        # Alle Picks für dieses Match finden
-        picks = Pick.query.filter_by(match_id=match.id).all()
-        
-        for pick in picks:
-            user = User.query.get(pick.user_id)
-            chosen_team = pick.chosen_team
-            
-            # Punkte vergeben basierend auf korrektem Tipp
-            if pick.chosen_team_id == match.winner_team_id:
-                # Richtiger Tipp → +1 Punkt
-                pick.points_earned = 1
-                pick.is_correct = True
-                logger.info(f"✅ Correct pick: {user.username} chose {chosen_team.name} (Winner)")
-            else:
-                # Falscher Tipp → 0 Punkte
-                pick.points_earned = 0
-                pick.is_correct = False
-                logger.info(f"❌ Incorrect pick: {user.username} chose {chosen_team.name} (Loser)")
-            
-            # Team Usage aktualisieren
+        for pick in Pick.query.filter_by(match_id=match.id).all():
             self._update_team_usage_for_pick(pick, match)
-        
-        db.session.commit()
     
     def _update_team_usage_for_pick(self, pick, match):
         """
@@ -212,20 +204,12 @@ class NFLResultsValidator:
         
         logger.info("🧮 Recalculating all player scores...")
         
-        users = User.query.all()
+        # Gespeicherte Punkte aller Spieler mit einer Aggregat-Abfrage
+        totals = points_by_user(db, Pick)
         
-        for user in users:
-            # Alle korrekten Picks für diesen User zählen
-            correct_picks = Pick.query.filter_by(
-                user_id=user.id,
-                is_correct=True
-            ).count()
-            
-            # Score in User-Objekt speichern (falls Feld existiert)
-            # Oder über get_score() Methode berechnen lassen
-            total_score = user.get_score()
-            
-            logger.info(f"📊 {user.username}: {total_score} points ({correct_picks} correct picks)")
+        for user in User.query.all():
+            user_totals = totals.get(user.id, {'points': 0, 'correct_picks': 0})
+            logger.info(f"📊 {user.username}: {user_totals['points']} points ({user_totals['correct_picks']} correct picks)")
         
         logger.info("✅ Score recalculation completed")
 
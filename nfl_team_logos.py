@@ -4,6 +4,8 @@ NFL Team-Logo Mapping für NFL PickEm 2025
 Hochqualitative Team-Logos für Frontend-Integration
 """
 
+from team_resolver import get_team_resolver
+
 # NFL Team-Logo URLs (hochqualitativ und konsistent)
 NFL_TEAM_LOGOS = {
     # AFC East
@@ -111,14 +113,15 @@ def get_team_logo_url(team_abbreviation: str, use_alt: bool = False) -> str:
     Holt die Logo-URL für ein NFL Team
     
     Args:
-        team_abbreviation: Team-Abkürzung (z.B. 'KC', 'SF')
+        team_abbreviation: Team-Abkürzung (z.B. 'KC', 'SF') oder ein anderer Team-Alias
         use_alt: Verwende alternative Logo-URLs
         
     Returns:
         str: Logo-URL
     """
     logo_dict = NFL_TEAM_LOGOS_ALT if use_alt else NFL_TEAM_LOGOS
-    return logo_dict.get(team_abbreviation.upper(), '')
+    abbreviation = get_team_resolver().resolve(team_abbreviation) or team_abbreviation.upper()
+    return logo_dict.get(abbreviation, '')
 
 def update_team_logos_in_database():
     """
@@ -6,6 +6,10 @@ Additional API endpoints for pick functionality
 import logging
 from flask import jsonify, session, request
 from datetime import datetime, timezone
+from pick_history import PickHistoryService
+from live_game_poller import parse_kickoff
+from team_resolver import get_team_resolver
+from nfl_team_logos import get_team_logo_url
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +35,14 @@ def register_pick_endpoints(app):
             ).first()
             
             if pick:
+                match = pick.match
+                chosen_team_name = match.home_team_name if pick.chosen_team_id == match.home_team_id else match.away_team_name
                 return jsonify({
                     'success': True,
                     'pick': {
                         'match_id': pick.match_id,
                         'chosen_team_id': pick.chosen_team_id,
-                        'chosen_team_name': pick.chosen_team.name
+                        'chosen_team_name': chosen_team_name
                     }
                 })
             else:
@@ -56,17 +62,16 @@ def register_pick_endpoints(app):
             user_id = session['user_id']
             
             # Import models within app context
-            from app import Team, TeamWinnerUsage, TeamLoserUsage
+            from app import TeamUsage
             
-            # Get all teams
-            all_teams = Team.query.all()
+            # Get all teams (team ids as stored on the matches)
+            all_teams = sorted(get_team_resolver().teams().values(), key=lambda team: team.name)
             
             # Get user's team usage
-            winner_usage = TeamWinnerUsage.query.filter_by(user_id=user_id).all()
-            loser_usage = TeamLoserUsage.query.filter_by(user_id=user_id).all()
+            usage = TeamUsage.query.filter_by(user_id=user_id).all()
             
-            used_winners = [usage.team_id for usage in winner_usage]
-            used_losers = [usage.team_id for usage in loser_usage]
+            used_winners = [entry.team_id for entry in usage if entry.usage_type == 'winner']
+            used_losers = [entry.team_id for entry in usage if entry.usage_type == 'loser']
             
             available_teams = []
             for team in all_teams:
@@ -77,7 +82,7 @@ def register_pick_endpoints(app):
                     'id': team.id,
                     'name': team.name,
                     'abbreviation': team.abbreviation,
-                    'logo_url': team.logo_url,
+                    'logo_url': get_team_logo_url(team.abbreviation),
                     'can_pick_as_winner': winner_count < 2,
                     'can_pick_as_loser': loser_count < 1,
                     'winner_usage_count': winner_count,
@@ -103,46 +108,44 @@ def register_pick_endpoints(app):
             chosen_team_id = data.get('chosen_team_id')
             
             # Import models within app context
-            from app import Match, Team, TeamWinnerUsage, TeamLoserUsage
+            from app import Match, TeamUsage
             
             # Validate match exists
             match = Match.query.get(match_id)
             if not match:
                 return jsonify({'success': False, 'message': 'Match not found'})
             
-            # Check if game has started
+            # Check if game has started (start_time is stored as an ISO string)
             now = datetime.now(timezone.utc)
-            if match.start_time and match.start_time <= now:
+            kickoff = parse_kickoff(match.start_time)
+            if match.is_completed or (kickoff and kickoff <= now):
                 return jsonify({'success': False, 'message': 'Game has already started'})
             
-            # Validate chosen team
-            chosen_team = Team.query.get(chosen_team_id)
-            if not chosen_team:
-                return jsonify({'success': False, 'message': 'Team not found'})
-            
-            # Check if chosen team is in this match
-            if chosen_team_id not in [match.home_team_id, match.away_team_id]:
+            # Check if chosen team is in this match (teams are the ones stored on the match)
+            team_names = {match.home_team_id: match.home_team_name, match.away_team_id: match.away_team_name}
+            if chosen_team_id not in team_names:
                 return jsonify({'success': False, 'message': 'Team not in this match'})
             
             # Check team usage limits
-            winner_usage_count = TeamWinnerUsage.query.filter_by(
+            winner_usage_count = TeamUsage.query.filter_by(
                 user_id=user_id, 
-                team_id=chosen_team_id
+                team_id=chosen_team_id,
+                usage_type='winner'
             ).count()
             
             if winner_usage_count >= 2:
-                return jsonify({'success': False, 'message': f'{chosen_team.name} already used as winner 2 times'})
+                return jsonify({'success': False, 'message': f'{team_names[chosen_team_id]} already used as winner 2 times'})
             
             # Check loser team usage
             loser_team_id = match.away_team_id if chosen_team_id == match.home_team_id else match.home_team_id
-            loser_usage_count = TeamLoserUsage.query.filter_by(
+            loser_usage_count = TeamUsage.query.filter_by(
                 user_id=user_id,
-                team_id=loser_team_id
+                team_id=loser_team_id,
+                usage_type='loser'
             ).count()
             
             if loser_usage_count >= 1:
-                loser_team = Team.query.get(loser_team_id)
-                return jsonify({'success': False, 'message': f'{loser_team.name} already used as loser'})
+                return jsonify({'success': False, 'message': f'{team_names[loser_team_id]} already used as loser'})
             
             return jsonify({'success': True, 'message': 'Pick is valid'})
             
@@ -150,5 +153,36 @@ def register_pick_endpoints(app):
             logger.error(f"❌ Error validating pick: {e}")
             return jsonify({'success': False, 'message': 'Validation failed'})
     
+    @app.route('/api/picks/history')
+    def get_pick_history():
+        """Season pick history: own picks, ?users=1,2,3 or ?users=all (compare all players)"""
+        try:
+            if 'user_id' not in session:
+                return jsonify({'success': False, 'message': 'Not logged in'})
+            
+            from app import db
+            
+            users = request.args.get('users')
+            if users == 'all':
+                user_ids = None
+            elif users:
+                user_ids = [int(user_id) for user_id in users.split(',') if user_id.strip()]
+            else:
+                user_ids = [session['user_id']]
+            
+            history = PickHistoryService(db).get_history(user_ids, week=request.args.get('week', type=int))
+            
+            for entries in history.values():
+                for entry in entries:
+                    entry['start_time'] = entry['start_time'].isoformat() if entry['start_time'] else None
+            
+            return jsonify({'success': True, 'history': {str(user_id): entries for user_id, entries in history.items()}})
+            
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid user ids'})
+        except Exception as e:
+            logger.error(f"❌ Error getting pick history: {e}")
+            return jsonify({'success': False, 'history': {}})
+    
     logger.info("✅ Pick API endpoints registered successfully")
 
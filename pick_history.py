@@ -0,0 +1,110 @@
+"""
+Pick History for NFL PickEm 2025
+Season pick history with team names and results for one or many users from one query
+"""
+
+import logging
+from datetime import datetime
+from sqlalchemy import case
+from scoring_rules import get_scoring_rules
+from team_resolver import get_team_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _team_info(team_id, team_name):
+    """Team entry from the id and name stored on the match (there is no team table)"""
+    if team_id is None:
+        return None
+    return {'id': team_id, 'name': team_name, 'abbreviation': get_team_resolver().resolve(team_name)}
+
+
+def _kickoff(start_time):
+    """Stored kickoff (ISO string with offset) as a datetime, None if missing or unparsable"""
+    if not start_time or isinstance(start_time, datetime):
+        return start_time or None
+    try:
+        return datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    except ValueError:
+        logger.warning(f"⚠️ Unparsable kickoff time: {start_time}")
+        return None
+
+
+class PickHistoryService:
+    """Pick history for one user, a list of users or everyone"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def _query(self, user_ids=None, week=None):
+        """Picks with match (incl. team ids and names) and username in one query"""
+        from app import Pick, Match, User
+
+        # Points of unscored completed picks come from the same rules as the scoring update
+        rules = get_scoring_rules()
+        live_points = case((rules.scored_match_filter(Match), rules.points_expression(Pick, Match)), else_=None)
+
+        query = self.db.session.query(
+            Pick, Match, User.username, live_points
+        ).join(
+            Match, Pick.match_id == Match.id
+        ).join(
+            User, Pick.user_id == User.id
+        )
+
+        if user_ids is not None:
+            query = query.filter(Pick.user_id.in_(list(user_ids)))
+        if week is not None:
+            query = query.filter(Match.week == week)
+
+        return query.order_by(Pick.user_id, Match.week, Match.start_time)
+
+    def get_history(self, user_ids=None, week=None):
+        """
+        Pick history grouped by user
+
+        Args:
+            user_ids: List of user ids (None = all users, e.g. for the "compare all players" view)
+            week: Only this week
+
+        Returns:
+            Dict[int, List[Dict]]: {user_id: [pick entry, ...]} ordered by week
+        """
+        history = {}
+
+        for pick, match, username, live_points in self._query(user_ids, week):
+            team_names = {match.home_team_id: match.home_team_name, match.away_team_id: match.away_team_name}
+
+            is_correct = None
+            points = 0
+            if live_points is not None:
+                is_correct = match.winner_team_id is not None and pick.chosen_team_id == match.winner_team_id
+                stored_points = getattr(pick, 'points_earned', None)
+                points = stored_points if stored_points is not None else live_points
+
+            loser_team_id = match.away_team_id if pick.chosen_team_id == match.home_team_id else match.home_team_id
+
+            history.setdefault(pick.user_id, []).append({
+                'pick_id': pick.id,
+                'user_id': pick.user_id,
+                'username': username,
+                'match_id': match.id,
+                'week': match.week,
+                'start_time': _kickoff(match.start_time),
+                'home_team': _team_info(match.home_team_id, match.home_team_name),
+                'away_team': _team_info(match.away_team_id, match.away_team_name),
+                'chosen_team': _team_info(pick.chosen_team_id, team_names.get(pick.chosen_team_id)),
+                'loser_team': _team_info(loser_team_id, team_names.get(loser_team_id)),
+                'winner_team': _team_info(match.winner_team_id, team_names.get(match.winner_team_id)),
+                'is_completed': bool(match.is_completed),
+                'is_correct': is_correct,
+                'points': points,
+                'home_score': match.home_score,
+                'away_score': match.away_score
+            })
+
+        return history
+
+    def get_user_history(self, user_id, week=None):
+        """Pick history of one user"""
+        return self.get_history([user_id], week).get(user_id, [])
@@ -8,6 +8,9 @@ from datetime import datetime
 import pytz
 from typing import Dict, List, Optional, Tuple
 import logging
+from event_bus import get_event_bus, PICK_CHANGED
+from pick_history import PickHistoryService
+from data_version import bump_data_version
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -58,7 +61,9 @@ class PickLogicBackend:
                 # Neuen Pick erstellen
                 result = self._create_new_pick(user_id, match_id, chosen_team_id, loser_team_id)
             
+            bump_data_version(db.session)
             db.session.commit()
+            get_event_bus().publish(PICK_CHANGED, user_id=user_id, match_id=match_id, week=match.week)
             
             logger.info(f"✅ Pick operation successful: {user.username} chose {chosen_team.name} in Week {match.week}")
             
@@ -126,12 +131,23 @@ class PickLogicBackend:
         Returns:
             bool: True wenn Spiel gestartet
         """
-        if match.is_completed:
+        return self._has_started(match.start_time, match.is_completed)
+    
+    def _has_started(self, start_time, is_completed) -> bool:
+        """Spielbeginn-Prüfung aus Anstoßzeit und Status (ohne Match-Objekt)"""
+        if is_completed:
             return True
         
-        now = datetime.now(self.vienna_tz)
-        game_start = match.start_time.replace(tzinfo=self.vienna_tz)
+        # Matches store the kickoff as an ISO string with offset
+        game_start = start_time
+        if isinstance(game_start, str):
+            game_start = datetime.fromisoformat(game_start.replace('Z', '+00:00'))
+        if game_start is None:
+            return False
+        if game_start.tzinfo is None:
+            game_start = self.vienna_tz.localize(game_start)
         
+        now = datetime.now(self.vienna_tz)
         return now >= game_start
     
     def _validate_team_usage(self, user_id: int, match, chosen_team_id: int) -> Dict:
@@ -350,45 +366,30 @@ class PickLogicBackend:
         Returns:
             Optional[Dict]: Pick-Informationen oder None
         """
-        from app import Pick, Match, Team
+        from app import db
         
-        pick = Pick.query.filter_by(user_id=user_id).join(Match).filter(Match.week == week).first()
+        # Pick, Spiel und alle Teams in einer Abfrage
+        entries = PickHistoryService(db).get_user_history(user_id, week=week)
         
-        if not pick:
+        if not entries:
             return None
         
-        match = Match.query.get(pick.match_id)
-        chosen_team = Team.query.get(pick.chosen_team_id)
-        home_team = Team.query.get(match.home_team_id)
-        away_team = Team.query.get(match.away_team_id)
-        
-        # Bestimme Verlierer-Team
-        if pick.chosen_team_id == match.home_team_id:
-            loser_team = away_team
-        else:
-            loser_team = home_team
+        entry = entries[0]
+        is_started = self._has_started(entry['start_time'], entry['is_completed'])
         
         return {
-            'pick_id': pick.id,
-            'match_id': match.id,
+            'pick_id': entry['pick_id'],
+            'match_id': entry['match_id'],
             'week': week,
-            'chosen_team': {
-                'id': chosen_team.id,
-                'name': chosen_team.name,
-                'abbreviation': chosen_team.abbreviation
-            },
-            'loser_team': {
-                'id': loser_team.id,
-                'name': loser_team.name,
-                'abbreviation': loser_team.abbreviation
-            },
+            'chosen_team': entry['chosen_team'],
+            'loser_team': entry['loser_team'],
             'match_info': {
-                'home_team': home_team.name,
-                'away_team': away_team.name,
-                'start_time': match.start_time.isoformat(),
-                'is_started': self._is_game_started(match),
-                'is_completed': match.is_completed
+                'home_team': entry['home_team']['name'],
+                'away_team': entry['away_team']['name'],
+                'start_time': entry['start_time'].isoformat() if entry['start_time'] else None,
+                'is_started': is_started,
+                'is_completed': entry['is_completed']
             },
-            'can_change': not self._is_game_started(match)
+            'can_change': not is_started
         }
 
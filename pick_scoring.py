@@ -0,0 +1,96 @@
+"""
+Pick Scoring for NFL PickEm 2025
+Set-based scoring: one UPDATE ... FROM matches per batch stores is_correct/points_earned on the picks
+"""
+
+import logging
+from sqlalchemy import update, func
+from scoring_rules import get_scoring_rules
+from data_version import bump_data_version
+from job_progress import report_progress
+
+logger = logging.getLogger(__name__)
+
+# Match ids per UPDATE (stays well below SQLite's bound parameter limit)
+SCORING_BATCH_SIZE = 500
+
+
+def _scoring_values(Pick, Match, rules, correct_field, points_field):
+    """SET clause for the pick columns the model actually has"""
+    values = {}
+    if hasattr(Pick, correct_field):
+        values[correct_field] = rules.correct_expression(Pick, Match)
+    if hasattr(Pick, points_field):
+        values[points_field] = rules.points_expression(Pick, Match)
+    return values
+
+
+def score_picks(db, Match, Pick, match_ids=None, weeks=None, correct_field='is_correct',
+                points_field='points_earned', commit=True, rules=None):
+    """
+    Score all picks of completed matches (winner set or tie) with the scoring rules
+
+    Args:
+        match_ids: Only these matches (e.g. the ones that just went final), in batches
+        weeks: Only matches of these weeks; neither given = all completed matches
+        correct_field / points_field: Pick columns to write (e.g. 'is_winner' for HistoricalPick)
+        commit: False leaves the commit to the caller
+        rules: ScoringRules (default: get_scoring_rules())
+
+    Returns:
+        int: Number of picks scored
+    """
+    rules = rules or get_scoring_rules()
+    values = _scoring_values(Pick, Match, rules, correct_field, points_field)
+    if not values:
+        return 0
+
+    base_filter = [Pick.match_id == Match.id, rules.scored_match_filter(Match)]
+    if weeks is not None:
+        base_filter.append(Match.week.in_(list(weeks)))
+
+    if match_ids is None:
+        batches = [None]
+    else:
+        match_ids = list(match_ids)
+        batches = [match_ids[i:i + SCORING_BATCH_SIZE] for i in range(0, len(match_ids), SCORING_BATCH_SIZE)]
+
+    scored = 0
+    for batch in batches:
+        criteria = base_filter + ([Match.id.in_(batch)] if batch is not None else [])
+        statement = update(Pick).where(*criteria).values(values).execution_options(synchronize_session=False)
+        scored += db.session.execute(statement).rowcount
+
+    # Invalidates the leaderboard caches of all workers once committed
+    if scored:
+        bump_data_version(db.session)
+    report_progress(picks_written=scored)
+
+    if commit:
+        db.session.commit()
+    logger.info(f"✅ Scored {scored} picks")
+    return scored
+
+
+def points_by_user(db, Pick, user_ids=None, points_field='points_earned'):
+    """
+    Stored points and pick counts per user with one aggregate query
+
+    Returns:
+        Dict[int, Dict]: {user_id: {'points': ..., 'correct_picks': ..., 'total_picks': ...}}
+    """
+    points_column = getattr(Pick, points_field)
+    query = db.session.query(
+        Pick.user_id,
+        func.coalesce(func.sum(points_column), 0),
+        func.count(Pick.id).filter(Pick.is_correct == True),
+        func.count(Pick.id)
+    ).group_by(Pick.user_id)
+
+    if user_ids is not None:
+        query = query.filter(Pick.user_id.in_(list(user_ids)))
+
+    return {
+        user_id: {'points': int(points), 'correct_picks': correct, 'total_picks': total}
+        for user_id, points, correct, total in query.all()
+    }
@@ -0,0 +1,232 @@
+"""
+Provider Rate Limiter for NFL PickEm 2025
+Shared token buckets and daily request budgets for all external NFL data providers
+"""
+
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Priority classes - lower value wins the queue
+PRIORITY_LIVE = 0       # Live score polling while games are running
+PRIORITY_DEFAULT = 5    # Regular scheduled syncs and manual calls
+PRIORITY_BACKFILL = 10  # Nightly / full-season backfills
+
+# Default limits per provider (requests per minute, burst size, daily budget, reserve for live polling)
+PROVIDER_LIMITS = {
+    'espn': {'rate_per_minute': 30, 'burst': 5, 'daily_budget': 5000, 'live_reserve': 500},
+    'sportsdata': {'rate_per_minute': 10, 'burst': 2, 'daily_budget': 1000, 'live_reserve': 100},
+}
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised when a provider request is refused by the rate limiter or the daily budget"""
+
+
+class ProviderRateLimiter:
+    """Token bucket with priority queueing and a daily request budget for one provider"""
+
+    def __init__(self, name, rate_per_minute, burst, daily_budget=None, live_reserve=0, lock_dir=None):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.daily_budget = daily_budget
+        self.live_reserve = live_reserve
+        self.lock_path = os.path.join(lock_dir, f'{name}.ratelimit.json') if lock_dir and fcntl else None
+
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._state = {'tokens': float(burst), 'updated': time.time(), 'day': self._today(), 'used': 0}
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def _refill(self, state, now):
+        """Refill tokens and reset the daily budget when the UTC day changes"""
+        elapsed = max(0.0, now - state['updated'])
+        state['tokens'] = min(float(self.burst), state['tokens'] + elapsed * self.rate)
+        state['updated'] = now
+
+        today = self._today()
+        if state['day'] != today:
+            state['day'] = today
+            state['used'] = 0
+
+    def _budget_allows(self, state, priority):
+        if self.daily_budget is None:
+            return True
+        limit = self.daily_budget if priority <= PRIORITY_LIVE else self.daily_budget - self.live_reserve
+        return state['used'] < limit
+
+    def _try_consume(self, state, priority):
+        """
+        Returns (result, wait_seconds) where result is True (token taken),
+        False (budget exhausted) or None (wait for the next token)
+        """
+        self._refill(state, time.time())
+
+        if not self._budget_allows(state, priority):
+            return False, 0.0
+
+        if state['tokens'] >= 1.0:
+            state['tokens'] -= 1.0
+            state['used'] += 1
+            return True, 0.0
+
+        return None, (1.0 - state['tokens']) / self.rate
+
+    def _try_consume_shared(self, priority):
+        """Consume a token from the state file shared by all processes on this host"""
+        with open(self.lock_path, 'a+') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                try:
+                    state = json.loads(raw) if raw else dict(self._state)
+                except ValueError:
+                    state = dict(self._state)
+
+                result = self._try_consume(state, priority)
+
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+                return result
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def acquire(self, priority=PRIORITY_DEFAULT, timeout=None):
+        """
+        Wait for a request slot
+
+        Args:
+            priority: Priority class, lower values are served first
+            timeout: Maximum seconds to wait (None = wait as long as needed)
+
+        Returns:
+            bool: True if the request may be sent, False on timeout or exhausted budget
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        entry = (priority, next(self._sequence))
+
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    wait = 0.1
+                    if self._waiters[0] == entry:
+                        if self.lock_path:
+                            result, wait = self._try_consume_shared(priority)
+                        else:
+                            result, wait = self._try_consume(self._state, priority)
+
+                        if result is not None:
+                            if not result:
+                                logger.warning(f"⚠️ Daily request budget for {self.name} exhausted (priority {priority})")
+                            return result
+
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            logger.warning(f"⚠️ Rate limit wait for {self.name} timed out (priority {priority})")
+                            return False
+                        wait = min(wait, remaining)
+
+                    self._condition.wait(max(wait, 0.01))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def get_status(self):
+        """Current bucket and budget state for monitoring"""
+        with self._condition:
+            state = self._state
+            if self.lock_path and os.path.exists(self.lock_path):
+                try:
+                    with open(self.lock_path) as handle:
+                        state = json.loads(handle.read() or '{}') or state
+                except (OSError, ValueError):
+                    pass
+
+            return {
+                'provider': self.name,
+                'tokens': round(state['tokens'], 2),
+                'requests_today': state['used'],
+                'daily_budget': self.daily_budget,
+                'queued': len(self._waiters),
+                'shared': self.lock_path is not None
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_priority_context = threading.local()
+
+
+def get_rate_limiter(provider):
+    """Process-wide rate limiter for a provider (created on first use)"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            config = dict(PROVIDER_LIMITS.get(provider, PROVIDER_LIMITS['espn']))
+            prefix = provider.upper()
+            config['rate_per_minute'] = float(os.environ.get(f'{prefix}_RATE_LIMIT_PER_MINUTE', config['rate_per_minute']))
+            config['daily_budget'] = int(os.environ.get(f'{prefix}_DAILY_REQUEST_BUDGET', config['daily_budget']))
+
+            limiter = ProviderRateLimiter(provider, lock_dir=os.environ.get('RATE_LIMIT_LOCK_DIR'), **config)
+            _limiters[provider] = limiter
+        return limiter
+
+
+@contextmanager
+def request_priority(priority):
+    """Run all provider requests of the current thread with the given priority class"""
+    previous = getattr(_priority_context, 'priority', None)
+    _priority_context.priority = priority
+    try:
+        yield
+    finally:
+        _priority_context.priority = previous
+
+
+def current_priority():
+    """Priority class of the current thread (PRIORITY_DEFAULT if none set)"""
+    priority = getattr(_priority_context, 'priority', None)
+    return PRIORITY_DEFAULT if priority is None else priority
+
+
+def rate_limited_get(provider, url, session=None, priority=None, wait_timeout=120, **kwargs):
+    """
+    GET request that waits for a slot in the provider's rate limiter
+
+    Raises:
+        RateLimitExceeded: If no slot became available or the daily budget is used up
+    """
+    if priority is None:
+        priority = current_priority()
+
+    limiter = get_rate_limiter(provider)
+    if not limiter.acquire(priority, timeout=wait_timeout):
+        raise RateLimitExceeded(f"Rate limit for {provider} refused request to {url}")
+
+    return (session or requests).get(url, **kwargs)
@@ -9,6 +9,13 @@ import logging
 from datetime import datetime, timedelta
 import pytz
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import or_
+from rate_limiter import rate_limited_get, request_priority, current_priority, get_rate_limiter, RateLimitExceeded
+from sync_fingerprint import game_fingerprint
+from sync_diff import SyncDiff
+from team_resolver import get_team_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,8 @@ class RealNFLDataSync:
         if not self.api_key:
             logger.warning("⚠️ No SportsData.io API key found. Cannot load real NFL data!")
             self.api_key = None
+        
+        self.last_diff = SyncDiff('sportsdata')
     
     def get_real_nfl_schedule(self, season=2025):
         """Lädt echten NFL Schedule für 2025 Season"""
@@ -36,7 +45,7 @@ class RealNFLDataSync:
             headers = {"Ocp-Apim-Subscription-Key": self.api_key}
             
             logger.info(f"🔄 Loading real NFL schedule for {season}...")
-            response = requests.get(url, headers=headers, timeout=30)
+            response = rate_limited_get('sportsdata', url, headers=headers, timeout=30)
             response.raise_for_status()
             
             games = response.json()
@@ -44,6 +53,9 @@ class RealNFLDataSync:
             
             return self.convert_to_our_format(games)
             
+        except RateLimitExceeded:
+            # Kein leeres Ergebnis - der Sync muss fehlschlagen statt Spiele als fehlend zu behandeln
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Failed to load real NFL schedule: {e}")
             return []
@@ -68,7 +80,7 @@ class RealNFLDataSync:
             headers = {"Ocp-Apim-Subscription-Key": self.api_key}
             
             logger.info(f"🔄 Loading real NFL scores for {season} week {week}...")
-            response = requests.get(url, headers=headers, timeout=30)
+            response = rate_limited_get('sportsdata', url, headers=headers, timeout=30)
             response.raise_for_status()
             
             scores = response.json()
@@ -76,6 +88,9 @@ class RealNFLDataSync:
             
             return self.convert_scores_to_our_format(scores)
             
+        except RateLimitExceeded:
+            # Kein leeres Ergebnis - der Sync muss fehlschlagen statt Spiele als fehlend zu behandeln
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Failed to load real NFL scores: {e}")
             return []
@@ -134,18 +149,7 @@ class RealNFLDataSync:
     
     def map_team_abbreviation(self, sportsdata_team):
         """Mappt SportsData.io Team-Namen zu unseren Abkürzungen"""
-        team_mapping = {
-            'ARI': 'ARI', 'ATL': 'ATL', 'BAL': 'BAL', 'BUF': 'BUF',
-            'CAR': 'CAR', 'CHI': 'CHI', 'CIN': 'CIN', 'CLE': 'CLE',
-            'DAL': 'DAL', 'DEN': 'DEN', 'DET': 'DET', 'GB': 'GB',
-            'HOU': 'HOU', 'IND': 'IND', 'JAX': 'JAX', 'KC': 'KC',
-            'LV': 'LV', 'LAC': 'LAC', 'LAR': 'LAR', 'MIA': 'MIA',
-            'MIN': 'MIN', 'NE': 'NE', 'NO': 'NO', 'NYG': 'NYG',
-            'NYJ': 'NYJ', 'PHI': 'PHI', 'PIT': 'PIT', 'SF': 'SF',
-            'SEA': 'SEA', 'TB': 'TB', 'TEN': 'TEN', 'WAS': 'WAS'
-        }
-        
-        return team_mapping.get(sportsdata_team, sportsdata_team)
+        return get_team_resolver().resolve(sportsdata_team, 'sportsdata') or sportsdata_team
     
     def determine_winner(self, game):
         """Bestimmt Gewinner basierend auf echten Scores"""
@@ -173,7 +177,7 @@ class RealNFLDataSync:
             url = f"{self.base_url}/scores/json/CurrentWeek"
             headers = {"Ocp-Apim-Subscription-Key": self.api_key}
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = rate_limited_get('sportsdata', url, headers=headers, timeout=10)
             response.raise_for_status()
             
             current_week = response.json()
@@ -186,116 +190,188 @@ class RealNFLDataSync:
             logger.warning(f"⚠️ Failed to get current NFL week: {e}")
             return 3  # Fallback
     
-    def sync_real_nfl_data(self, app, db, Team, Match):
-        """Synchronisiert echte NFL-Daten in die Datenbank"""
-        logger.info("🔄 Starting real NFL data sync...")
+    def fetch_season_data(self, season=2025, current_week=None):
+        """
+        Lädt Schedule und die Scores aller Wochen bis zur aktuellen Woche parallel
         
-        with app.app_context():
+        Die Dauer ist durch den langsamsten Request begrenzt, nicht durch die Summe.
+        
+        Returns:
+            Tuple[List[Dict], List[Dict]]: (schedule games, score games) im konvertierten Format
+        
+        Raises:
+            RateLimitExceeded: Rate Limit oder Tagesbudget erschöpft - die offenen Requests werden abgebrochen
+        """
+        current_week = current_week or self.get_current_nfl_week()
+        weeks = list(range(1, min(current_week, 18) + 1))
+        
+        # Priority is thread-local - hand the caller's class to the worker threads
+        priority = current_priority()
+        
+        def with_priority(fetch, *args):
+            with request_priority(priority):
+                return fetch(*args)
+        
+        # More threads than the limiter's burst would only queue on its tokens (and run into the acquire timeout)
+        max_workers = max(1, min(get_rate_limiter('sportsdata').burst, len(weeks) + 1))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            schedule_future = executor.submit(with_priority, self.get_real_nfl_schedule, season)
+            score_futures = [executor.submit(with_priority, self.get_real_nfl_scores, season, week) for week in weeks]
+            
             try:
-                # 1. Lade echten NFL Schedule
-                real_games = self.get_real_nfl_schedule(2025)
-                
-                if not real_games:
-                    logger.error("❌ No real NFL games loaded!")
-                    return False
-                
-                # 2. Sync Spiele in Datenbank
-                synced_count = 0
-                for game_data in real_games:
-                    if self.sync_game_to_database(game_data, db, Team, Match):
-                        synced_count += 1
-                
-                # 3. Lade echte Ergebnisse für abgeschlossene Wochen
-                for week in [1, 2]:  # Woche 1 und 2 sollten abgeschlossen sein
-                    real_scores = self.get_real_nfl_scores(2025, week)
-                    for score_data in real_scores:
-                        self.update_game_results(score_data, db, Match)
-                
-                db.session.commit()
-                logger.info(f"✅ Real NFL data sync completed: {synced_count} games synced")
-                return True
-                
-            except Exception as e:
-                logger.error(f"❌ Real NFL data sync failed: {e}")
-                db.session.rollback()
-                return False
+                schedule_games = schedule_future.result()
+                score_games = [game for future in score_futures for game in future.result()]
+            except RateLimitExceeded as e:
+                logger.error(f"❌ SportsData.io rate limit reached, aborting the season fetch: {e}")
+                executor.shutdown(cancel_futures=True)
+                raise
+        
+        logger.info(f"✅ Fetched schedule and scores for weeks 1-{weeks[-1] if weeks else 0} in parallel")
+        return schedule_games, score_games
     
-    def sync_game_to_database(self, game_data, db, Team, Match):
-        """Synchronisiert ein einzelnes Spiel in die Datenbank"""
-        try:
-            # Teams finden
-            away_team = Team.query.filter_by(abbreviation=game_data['away_team']).first()
-            home_team = Team.query.filter_by(abbreviation=game_data['home_team']).first()
+    def merge_games(self, schedule_games, score_games):
+        """Führt Schedule und Scores zusammen - Scores überschreiben den Schedule-Eintrag des gleichen Spiels"""
+        merged = {}
+        for game in list(schedule_games) + list(score_games):
+            key = game.get('sportsdata_id') or (game.get('week'), game.get('home_team'), game.get('away_team'))
+            merged[key] = game
+        return list(merged.values())
+    
+    def diff_games(self, games, Match, dry_run=False):
+        """
+        Vergleicht alle Spiele in-memory mit der Datenbank
+        
+        Returns:
+            SyncDiff: Neue Spiele und nur die geänderten Spalten geänderter Spiele
+        """
+        diff = SyncDiff('sportsdata', dry_run=dry_run)
+        
+        # Preload teams (keyed by canonical abbreviation like the parsed games) and all affected matches once
+        teams = get_team_resolver().teams()
+        weeks = {game['week'] for game in games if game.get('week')}
+        game_keys = {str(game['sportsdata_id']) for game in games if game.get('sportsdata_id')}
+        
+        rows = Match.query.with_entities(
+            Match.id, Match.week, Match.home_team_id, Match.away_team_id, Match.sportsdata_game_key,
+            Match.start_time, Match.is_completed, Match.home_score, Match.away_score,
+            Match.winner_team_id, Match.sync_fingerprint
+        ).filter(or_(Match.week.in_(weeks), Match.sportsdata_game_key.in_(game_keys))).all()
+        
+        matches_by_key = {}
+        matches_by_teams = {}
+        for row in rows:
+            row = dict(row._mapping)
+            matches_by_teams[(row['week'], row['home_team_id'], row['away_team_id'])] = row
+            if row['sportsdata_game_key']:
+                matches_by_key[row['sportsdata_game_key']] = row
+        
+        for game_data in games:
+            away_team = teams.get(game_data['away_team'])
+            home_team = teams.get(game_data['home_team'])
             
             if not away_team or not home_team:
                 logger.warning(f"⚠️ Teams not found: {game_data['away_team']} vs {game_data['home_team']}")
-                return False
-            
-            # Prüfe ob Spiel bereits existiert
-            existing_match = Match.query.filter_by(
-                week=game_data['week'],
-                away_team_id=away_team.id,
-                home_team_id=home_team.id
-            ).first()
+                continue
             
-            if existing_match:
-                # Update existierendes Spiel
-                existing_match.start_time = game_data['start_time']
-                existing_match.is_completed = game_data['is_completed']
-                if game_data['winner_team']:
-                    winner_team = Team.query.filter_by(abbreviation=game_data['winner_team']).first()
-                    if winner_team:
-                        existing_match.winner_team_id = winner_team.id
-                existing_match.away_score = game_data['away_score']
-                existing_match.home_score = game_data['home_score']
-            else:
-                # Erstelle neues Spiel
-                winner_team_id = None
-                if game_data['winner_team']:
-                    winner_team = Team.query.filter_by(abbreviation=game_data['winner_team']).first()
-                    if winner_team:
-                        winner_team_id = winner_team.id
-                
-                new_match = Match(
-                    week=game_data['week'],
-                    away_team_id=away_team.id,
-                    home_team_id=home_team.id,
+            game_key = str(game_data['sportsdata_id']) if game_data.get('sportsdata_id') else None
+            winner_team = teams.get(game_data['winner_team']) if game_data['winner_team'] else None
+            winner_team_id = winner_team.id if winner_team else None
+            label = f"{game_data['away_team']} @ {game_data['home_team']}"
+            # matches.start_time is an ISO string like the ESPN sync writes it
+            start_time = game_data['start_time'].isoformat() if game_data['start_time'] else None
+            values = {
+                'week': game_data['week'],
+                'start_time': start_time,
+                'is_completed': game_data['is_completed'],
+                'away_score': game_data['away_score'],
+                'home_score': game_data['home_score'],
+                'sync_fingerprint': game_fingerprint(
                     start_time=game_data['start_time'],
                     is_completed=game_data['is_completed'],
-                    winner_team_id=winner_team_id,
-                    away_score=game_data['away_score'],
-                    home_score=game_data['home_score']
+                    home_score=game_data['home_score'],
+                    away_score=game_data['away_score']
                 )
-                db.session.add(new_match)
+            }
             
-            return True
+            # GameKey first (also finds moved games), then week + teams
+            existing = matches_by_key.get(game_key) or matches_by_teams.get((game_data['week'], home_team.id, away_team.id))
             
-        except Exception as e:
-            logger.error(f"❌ Failed to sync game: {e}")
-            return False
+            if existing:
+                if start_time is None:
+                    del values['start_time']  # Keep the stored kickoff
+                values['sportsdata_game_key'] = game_key or existing['sportsdata_game_key']
+                if winner_team_id:
+                    values['winner_team_id'] = winner_team_id
+                elif game_data['is_completed'] and game_data['home_score'] == game_data['away_score']:
+                    values['winner_team_id'] = None  # Unentschieden
+                diff.compare(existing['id'], existing, values, label)
+            elif start_time is None:
+                logger.warning(f"⚠️ No kickoff time for new game {label}, skipped")
+            else:
+                # Matches store the team names next to the ids
+                values.update({
+                    'away_team_id': away_team.id,
+                    'away_team_name': away_team.name,
+                    'home_team_id': home_team.id,
+                    'home_team_name': home_team.name,
+                    'source': 'sportsdata',
+                    'winner_team_id': winner_team_id,
+                    'sportsdata_game_key': game_key
+                })
+                diff.add_insert(values, label)
+        
+        return diff
     
-    def update_game_results(self, score_data, db, Match):
-        """Aktualisiert Spielergebnisse in der Datenbank"""
-        try:
-            # Finde Match in Datenbank
-            match = Match.query.filter_by(week=score_data['week']).join(
-                Team, Match.away_team_id == Team.id
-            ).filter(Team.abbreviation == score_data['away_team']).first()
-            
-            if match and score_data['is_completed']:
-                match.is_completed = True
-                match.away_score = score_data['away_score']
-                match.home_score = score_data['home_score']
+    def sync_real_nfl_data(self, app, db, Match, season=2025, dry_run=False):
+        """
+        Synchronisiert echte NFL-Daten in die Datenbank (parallel laden, ein Bulk-Upsert)
+        
+        Args:
+            dry_run: Nur den Diff berechnen und zurückgeben, nichts schreiben
+        
+        Returns:
+            bool, bzw. der strukturierte Diff bei dry_run (None bei Fehlern)
+        """
+        logger.info(f"🔄 Starting real NFL data sync{' (dry run)' if dry_run else ''}...")
+        
+        with app.app_context():
+            try:
+                # 1. Schedule + Scores aller Wochen bis zur aktuellen Woche parallel laden
+                started = time.perf_counter()
+                schedule_games, score_games = self.fetch_season_data(season)
+                fetched = time.perf_counter()
                 
-                if score_data['winner_team']:
-                    winner_team = Team.query.filter_by(abbreviation=score_data['winner_team']).first()
-                    if winner_team:
-                        match.winner_team_id = winner_team.id
+                if not schedule_games and not score_games:
+                    logger.error("❌ No real NFL games loaded!")
+                    return None if dry_run else False
                 
-                logger.info(f"✅ Updated game result: {score_data['away_team']} vs {score_data['home_team']}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to update game result: {e}")
+                # 2. Zusammenführen (gleiches Format aus einem Konverter)
+                games = self.merge_games(schedule_games, score_games)
+                merged = time.perf_counter()
+                
+                # 3. Diff gegen die Datenbank, dann Bulk-Upsert in einer Transaktion
+                diff = self.diff_games(games, Match, dry_run=dry_run)
+                diffed = time.perf_counter()
+                stats = diff.apply_to_session(db, Match)
+                applied = time.perf_counter()
+                self.last_diff = diff
+                diff.publish_events()
+                
+                logger.info(
+                    f"⏱️ Sync stages: fetch {fetched - started:.2f}s, merge {merged - fetched:.2f}s, "
+                    f"diff {diffed - merged:.2f}s, upsert {applied - diffed:.2f}s, total {applied - started:.2f}s"
+                )
+                logger.info(
+                    f"✅ Real NFL data sync {'dry run' if dry_run else 'completed'}: {stats['created']} created, "
+                    f"{stats['updated']} updated, {stats['unchanged']} unchanged"
+                )
+                return diff.to_dict() if dry_run else True
+                
+            except Exception as e:
+                logger.error(f"❌ Real NFL data sync failed: {e}")
+                db.session.rollback()
+                return None if dry_run else False
 
 if __name__ == '__main__':
     # Test der echten NFL-Daten Sync
@@ -5,6 +5,12 @@ Berechnet Punkte basierend auf echten NFL Ergebnissen
 
 import logging
 from datetime import datetime
+from itertools import groupby
+from pick_scoring import points_by_user
+from pick_history import PickHistoryService
+from scoring_rules import get_scoring_rules
+from leaderboard import get_leaderboard_rows
+from team_resolver import get_team_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -16,29 +22,13 @@ class RealPointsCalculator:
         self.db = db
     
     def calculate_user_points(self, user_id):
-        """Berechnet Gesamtpunkte für einen User basierend auf echten Ergebnissen"""
-        from app import Pick, Match, Team
+        """Gesamtpunkte eines Users aus den gespeicherten Pick-Punkten (siehe pick_scoring)"""
+        from app import Pick
         
         with self.app.app_context():
             try:
-                # Alle Picks des Users für abgeschlossene Spiele
-                user_picks = self.db.session.query(Pick, Match).join(
-                    Match, Pick.match_id == Match.id
-                ).filter(
-                    Pick.user_id == user_id,
-                    Match.is_completed == True,
-                    Match.winner_team_id.isnot(None)
-                ).all()
-                
-                total_points = 0
-                
-                for pick, match in user_picks:
-                    # Punkte-Logik: +1 Punkt wenn gewähltes Team gewinnt
-                    if pick.chosen_team_id == match.winner_team_id:
-                        total_points += 1
-                        logger.debug(f"✅ User {user_id} gets 1 point for correct pick in match {match.id}")
-                    else:
-                        logger.debug(f"❌ User {user_id} gets 0 points for incorrect pick in match {match.id}")
+                totals = points_by_user(self.db, Pick, user_ids=[user_id])
+                total_points = totals.get(user_id, {}).get('points', 0)
                 
                 logger.info(f"📊 User {user_id} total points: {total_points}")
                 return total_points
@@ -48,17 +38,17 @@ class RealPointsCalculator:
                 return 0
     
     def calculate_all_user_points(self):
-        """Berechnet Punkte für alle User"""
-        from app import User
+        """Berechnet Punkte für alle User (eine Aggregat-Abfrage)"""
+        from app import User, Pick
         
         with self.app.app_context():
             try:
                 users = User.query.all()
+                totals = points_by_user(self.db, Pick)
                 user_points = {}
                 
                 for user in users:
-                    points = self.calculate_user_points(user.id)
-                    user_points[user.username] = points
+                    user_points[user.username] = totals.get(user.id, {}).get('points', 0)
                 
                 logger.info(f"📊 All user points calculated: {user_points}")
                 return user_points
@@ -67,29 +57,19 @@ class RealPointsCalculator:
                 logger.error(f"❌ Failed to calculate all user points: {e}")
                 return {}
     
-    def get_leaderboard(self):
-        """Erstellt Leaderboard basierend auf echten Punkten"""
-        from app import User
+    def get_leaderboard(self, top=None, around_user_id=None):
+        """Erstellt Leaderboard basierend auf echten Punkten (Ränge per SQL, Gleichstand = gleicher Rang)"""
+        from app import User, Pick, Match
         
         with self.app.app_context():
             try:
-                users = User.query.all()
-                leaderboard = []
-                
-                for user in users:
-                    points = self.calculate_user_points(user.id)
-                    leaderboard.append({
-                        'username': user.username,
-                        'points': points,
-                        'user_id': user.id
-                    })
-                
-                # Sortiere nach Punkten (höchste zuerst)
-                leaderboard.sort(key=lambda x: x['points'], reverse=True)
-                
-                # Füge Ränge hinzu
-                for i, entry in enumerate(leaderboard):
-                    entry['rank'] = i + 1
+                rows = get_leaderboard_rows(self.db, User, Pick, Match, top=top, around_user_id=around_user_id)
+                leaderboard = [{
+                    'username': row['username'],
+                    'points': row['points'],
+                    'user_id': row['user_id'],
+                    'rank': row['rank']
+                } for row in rows]
                 
                 logger.info(f"🏆 Leaderboard created: {leaderboard}")
                 return leaderboard
@@ -98,60 +78,80 @@ class RealPointsCalculator:
                 logger.error(f"❌ Failed to create leaderboard: {e}")
                 return []
     
-    def validate_completed_matches(self):
-        """Validiert alle abgeschlossenen Spiele und berechnet Punkte neu"""
-        from app import Match, Pick, User, Team
+    def iter_validation_report(self, batch_size=500):
+        """
+        Validierungsbericht aller abgeschlossenen Spiele, wochenweise gestreamt
         
+        Eine Abfrage für Spiele, Picks und User statt Einzelabfragen pro Spiel und Pick;
+        Teams kommen aus den Team-Spalten der Spiele (es gibt keine Team-Tabelle).
+        
+        Yields:
+            (week, [match_result, ...])
+        """
+        from app import Match, Pick, User
+        
+        resolver = get_team_resolver()
+        
+        # Punkte mit denselben Regeln wie das Scoring-Update, direkt in der Abfrage
+        rows = self.db.session.query(
+            Match.id, Match.week, Match.winner_team_id, Match.away_score, Match.home_score,
+            Match.away_team_id, Match.away_team_name, Match.home_team_id, Match.home_team_name,
+            Pick.id, Pick.chosen_team_id, User.username,
+            get_scoring_rules().points_expression(Pick, Match)
+        ).outerjoin(
+            Pick, Pick.match_id == Match.id
+        ).outerjoin(
+            User, Pick.user_id == User.id
+        ).filter(
+            Match.is_completed == True,
+            Match.winner_team_id.isnot(None)
+        ).order_by(Match.week, Match.id, Pick.id).yield_per(batch_size)
+        
+        for week, week_rows in groupby(rows, key=lambda row: row[1]):
+            week_results = []
+            
+            for match_id, match_rows in groupby(week_rows, key=lambda row: row[0]):
+                match_rows = list(match_rows)
+                _, _, winner_team_id, away_score, home_score, away_team_id, away_name, home_team_id, home_name = match_rows[0][:9]
+                abbr_by_team_id = {away_team_id: resolver.resolve(away_name), home_team_id: resolver.resolve(home_name)}
+                
+                match_result = {
+                    'match_id': match_id,
+                    'week': week,
+                    'away_team': abbr_by_team_id[away_team_id],
+                    'home_team': abbr_by_team_id[home_team_id],
+                    'winner': abbr_by_team_id.get(winner_team_id),
+                    'away_score': away_score,
+                    'home_score': home_score,
+                    'picks': []
+                }
+                
+                for *_, pick_id, chosen_team_id, username, points in match_rows:
+                    if pick_id is None:
+                        continue
+                    
+                    match_result['picks'].append({
+                        'username': username,
+                        'chosen_team': abbr_by_team_id.get(chosen_team_id),
+                        'is_correct': chosen_team_id == winner_team_id,
+                        'points': points
+                    })
+                
+                week_results.append(match_result)
+            
+            yield week, week_results
+    
+    def validate_completed_matches(self):
+        """Validiert alle abgeschlossenen Spiele (Bericht aus einer Abfrage, wochenweise aufgebaut)"""
         with self.app.app_context():
             try:
-                # Alle abgeschlossenen Spiele
-                completed_matches = Match.query.filter(
-                    Match.is_completed == True,
-                    Match.winner_team_id.isnot(None)
-                ).all()
-                
-                logger.info(f"🔄 Validating {len(completed_matches)} completed matches...")
-                
                 validation_results = []
                 
-                for match in completed_matches:
-                    # Alle Picks für dieses Spiel
-                    picks = Pick.query.filter_by(match_id=match.id).all()
-                    
-                    match_result = {
-                        'match_id': match.id,
-                        'week': match.week,
-                        'away_team': match.away_team.abbreviation,
-                        'home_team': match.home_team.abbreviation,
-                        'winner': match.winner_team.abbreviation,
-                        'away_score': match.away_score,
-                        'home_score': match.home_score,
-                        'picks': []
-                    }
-                    
-                    for pick in picks:
-                        user = User.query.get(pick.user_id)
-                        chosen_team = Team.query.get(pick.chosen_team_id)
-                        
-                        is_correct = pick.chosen_team_id == match.winner_team_id
-                        points = 1 if is_correct else 0
-                        
-                        pick_result = {
-                            'username': user.username,
-                            'chosen_team': chosen_team.abbreviation,
-                            'is_correct': is_correct,
-                            'points': points
-                        }
-                        
-                        match_result['picks'].append(pick_result)
-                        
-                        logger.debug(f"📊 {user.username} picked {chosen_team.abbreviation}, "
-                                   f"winner was {match.winner_team.abbreviation}, "
-                                   f"correct: {is_correct}, points: {points}")
-                    
-                    validation_results.append(match_result)
+                for week, week_results in self.iter_validation_report():
+                    validation_results.extend(week_results)
+                    logger.debug(f"📊 Week {week}: {len(week_results)} completed matches validated")
                 
-                logger.info("✅ Match validation completed")
+                logger.info(f"✅ Match validation completed: {len(validation_results)} matches")
                 return validation_results
                 
             except Exception as e:
@@ -159,52 +159,25 @@ class RealPointsCalculator:
                 return []
     
     def get_user_pick_history(self, user_id):
-        """Holt Pick-Historie für einen User mit Ergebnissen"""
-        from app import Pick, Match, Team, User
-        
+        """Holt Pick-Historie für einen User mit Ergebnissen (eine Abfrage, siehe PickHistoryService)"""
         with self.app.app_context():
             try:
-                user = User.query.get(user_id)
-                if not user:
-                    return []
-                
-                # Alle Picks des Users mit Match-Details
-                picks_query = self.db.session.query(Pick, Match, Team).join(
-                    Match, Pick.match_id == Match.id
-                ).join(
-                    Team, Pick.chosen_team_id == Team.id
-                ).filter(Pick.user_id == user_id).order_by(Match.week).all()
-                
-                pick_history = []
-                
-                for pick, match, chosen_team in picks_query:
-                    away_team = Team.query.get(match.away_team_id)
-                    home_team = Team.query.get(match.home_team_id)
-                    winner_team = Team.query.get(match.winner_team_id) if match.winner_team_id else None
-                    
-                    is_correct = None
-                    points = 0
-                    
-                    if match.is_completed and winner_team:
-                        is_correct = pick.chosen_team_id == match.winner_team_id
-                        points = 1 if is_correct else 0
-                    
-                    pick_entry = {
-                        'week': match.week,
-                        'away_team': away_team.abbreviation,
-                        'home_team': home_team.abbreviation,
-                        'chosen_team': chosen_team.abbreviation,
-                        'winner_team': winner_team.abbreviation if winner_team else None,
-                        'is_completed': match.is_completed,
-                        'is_correct': is_correct,
-                        'points': points,
-                        'away_score': match.away_score,
-                        'home_score': match.home_score
-                    }
-                    
-                    pick_history.append(pick_entry)
-                
-                logger.info(f"📋 Pick history for {user.username}: {len(pick_history)} picks")
+                entries = PickHistoryService(self.db).get_user_history(user_id)
+                
+                pick_history = [{
+                    'week': entry['week'],
+                    'away_team': entry['away_team']['abbreviation'],
+                    'home_team': entry['home_team']['abbreviation'],
+                    'chosen_team': entry['chosen_team']['abbreviation'] if entry['chosen_team'] else None,
+                    'winner_team': entry['winner_team']['abbreviation'] if entry['winner_team'] else None,
+                    'is_completed': entry['is_completed'],
+                    'is_correct': entry['is_correct'],
+                    'points': entry['points'],
+                    'away_score': entry['away_score'],
+                    'home_score': entry['home_score']
+                } for entry in entries]
+                
+                logger.info(f"📋 Pick history for user {user_id}: {len(pick_history)} picks")
                 return pick_history
                 
             except Exception as e:
@@ -0,0 +1,67 @@
+"""
+Result Matcher for NFL PickEm 2025
+Hash-join of provider game results onto the matches of a week
+"""
+
+
+def build_match_index(matches, abbr_by_team_id):
+    """
+    Build a (home_abbr, away_abbr) -> match index for one week
+
+    Args:
+        matches: Match objects (or rows) with home_team_id / away_team_id
+        abbr_by_team_id: Team lookup table {team_id: abbreviation}
+
+    Returns:
+        Dict: {(home_abbr, away_abbr): match}
+    """
+    index = {}
+    for match in matches:
+        home_abbr = abbr_by_team_id.get(match.home_team_id)
+        away_abbr = abbr_by_team_id.get(match.away_team_id)
+        if home_abbr and away_abbr:
+            index[(home_abbr, away_abbr)] = match
+    return index
+
+
+def build_external_index(matches, attribute):
+    """
+    Build a provider id -> match index (e.g. attribute='espn_event_id')
+
+    Matches without a stored provider id are skipped.
+    """
+    index = {}
+    for match in matches:
+        external_id = getattr(match, attribute, None)
+        if external_id:
+            index[str(external_id)] = match
+    return index
+
+
+def match_results(results, match_index, result_key, external_index=None, external_key=None):
+    """
+    Resolve every provider result to its match in O(1)
+
+    Args:
+        results: Provider results
+        match_index: Index from build_match_index()
+        result_key: Callable returning (home_abbr, away_abbr) for a result
+        external_index: Optional index from build_external_index(), tried first
+        external_key: Callable returning the provider id of a result
+
+    Returns:
+        Tuple[List, List]: (matched (result, match) pairs, unmatched results)
+    """
+    matched = []
+    unmatched = []
+    for result in results:
+        match = None
+        if external_index:
+            match = external_index.get(str(external_key(result) or ''))
+        if match is None:
+            match = match_index.get(result_key(result))
+        if match is None:
+            unmatched.append(result)
+        else:
+            matched.append((result, match))
+    return matched, unmatched
@@ -0,0 +1,118 @@
+"""
+Scoring Rules for NFL PickEm 2025
+Declarative pick scoring, compiled to one SQL expression for the set-based scoring update
+"""
+
+import os
+import threading
+from sqlalchemy import case, func, and_, or_, table, column, Integer, Boolean
+from sqlalchemy.dialects import sqlite
+
+# Default rules - each value can be overridden with SCORING_<NAME> (e.g. SCORING_UPSET_BONUS=1)
+DEFAULT_SCORING_RULES = {
+    'base_points': 1,        # Chosen team won
+    'upset_bonus': 0,        # Chosen team won on the road (no odds data: the away team counts as underdog)
+    'margin_bonus': 0,       # Chosen team won by at least margin_threshold points
+    'margin_threshold': 14,
+    'wrong_points': 0,       # Chosen team lost
+    'tie_points': 0          # Game ended in a tie (completed, equal scores, no winner)
+}
+
+
+# Columns the expressions read, for the raw SQLite variants (compiled from the same expressions)
+PICK_COLUMNS = {'chosen_team_id': Integer}
+MATCH_COLUMNS = {
+    'is_completed': Boolean,
+    'winner_team_id': Integer,
+    'away_team_id': Integer,
+    'home_score': Integer,
+    'away_score': Integer
+}
+
+
+class ScoringRules:
+    """One scoring rule set as SQLAlchemy expressions (the raw SQLite variants are compiled from them)"""
+
+    def __init__(self, **rules):
+        unknown = set(rules) - set(DEFAULT_SCORING_RULES)
+        if unknown:
+            raise ValueError(f"Unknown scoring rules: {', '.join(sorted(unknown))}")
+
+        values = dict(DEFAULT_SCORING_RULES, **rules)
+        for name, value in values.items():
+            # Integers only - they are inlined into the raw SQL variant
+            setattr(self, name, int(value))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in DEFAULT_SCORING_RULES}
+
+    def scored_match_filter(self, Match):
+        """Completed matches that can be scored: a winner is set, or a tie with equal scores"""
+        return and_(
+            Match.is_completed == True,
+            or_(
+                Match.winner_team_id.isnot(None),
+                and_(Match.home_score.isnot(None), Match.home_score == Match.away_score)
+            )
+        )
+
+    def correct_expression(self, Pick, Match):
+        """is_correct for a scored match (False for ties)"""
+        return case((Match.winner_team_id.is_(None), False), else_=Pick.chosen_team_id == Match.winner_team_id)
+
+    def points_expression(self, Pick, Match):
+        """Points for a pick of a scored match"""
+        won_points = self.base_points
+        if self.upset_bonus:
+            won_points = won_points + case((Pick.chosen_team_id == Match.away_team_id, self.upset_bonus), else_=0)
+        if self.margin_bonus:
+            won_points = won_points + case(
+                (func.abs(Match.home_score - Match.away_score) >= self.margin_threshold, self.margin_bonus), else_=0
+            )
+
+        return case(
+            (Match.winner_team_id.is_(None), self.tie_points),
+            (Pick.chosen_team_id == Match.winner_team_id, won_points),
+            else_=self.wrong_points
+        )
+
+    def scored_match_sql(self, match='m'):
+        """scored_match_filter() for raw SQLite statements"""
+        return _sqlite_sql(self.scored_match_filter(_raw_columns(match, MATCH_COLUMNS)))
+
+    def correct_sql(self, pick='pick', match='m'):
+        """correct_expression() for raw SQLite statements"""
+        return _sqlite_sql(self.correct_expression(_raw_columns(pick, PICK_COLUMNS), _raw_columns(match, MATCH_COLUMNS)))
+
+    def points_sql(self, pick='pick', match='m'):
+        """points_expression() for raw SQLite statements"""
+        return _sqlite_sql(self.points_expression(_raw_columns(pick, PICK_COLUMNS), _raw_columns(match, MATCH_COLUMNS)))
+
+
+def _raw_columns(name, columns):
+    """Columns of a raw SQL table or alias, usable like the model attributes in the expressions"""
+    return table(name, *(column(column_name, column_type) for column_name, column_type in columns.items())).c
+
+
+def _sqlite_sql(expression):
+    """Expression as inline SQLite SQL - the rule values are integers, so literal binds are safe"""
+    return str(expression.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def get_scoring_rules():
+    """Process-wide scoring rules (defaults plus SCORING_<NAME> environment overrides)"""
+    global _rules
+
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                overrides = {
+                    name: os.environ[f'SCORING_{name.upper()}']
+                    for name in DEFAULT_SCORING_RULES if f'SCORING_{name.upper()}' in os.environ
+                }
+                _rules = ScoringRules(**overrides)
+    return _rules
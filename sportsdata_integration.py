@@ -4,12 +4,12 @@ SportsData.io Integration für NFL PickEm 2025
 Lädt echte NFL Ergebnisse und validiert Spieler-Picks
 """
 
-import requests
 import os
 from datetime import datetime, timedelta
 import pytz
 import logging
 from typing import Dict, List, Optional
+from rate_limiter import rate_limited_get
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -48,7 +48,7 @@ class SportsDataAPI:
             url = f"{self.base_url}/scores/json/CurrentWeek"
             headers = {"Ocp-Apim-Subscription-Key": self.api_key}
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = rate_limited_get('sportsdata', url, headers=headers, timeout=10)
             response.raise_for_status()
             
             current_week = response.json()
@@ -102,7 +102,7 @@ class SportsDataAPI:
             url = f"{self.base_url}/scores/json/ScoresByWeek/{season}/{week}"
             headers = {"Ocp-Apim-Subscription-Key": self.api_key}
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = rate_limited_get('sportsdata', url, headers=headers, timeout=30)
             response.raise_for_status()
             
             scores = response.json()
@@ -0,0 +1,140 @@
+"""
+SQLite Connection Manager for NFL PickEm 2025
+Shared per-thread WAL connections for the raw-sqlite modules (validator, database sync API) on the app's database
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlparse
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Pragmas applied once per connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',         # Readers and the writer no longer block each other
+    'synchronous': 'NORMAL',       # Safe with WAL, far fewer fsyncs than FULL
+    'cache_size': -20000,          # ~20 MB page cache (negative = KiB)
+    'mmap_size': 268435456,        # 256 MB memory-mapped reads
+    'busy_timeout': 5000,          # Wait up to 5s for a lock instead of failing
+    'temp_store': 'MEMORY'
+}
+
+
+# Database file used when DATABASE_URL is not set (app.py and the raw-sqlite modules)
+DEFAULT_DATABASE_FILE = 'nfl_pickem_robust.db'
+
+
+def get_database_url():
+    """
+    The app's SQLAlchemy database URL: DATABASE_URL (postgres:// normalized), else the default SQLite file
+
+    app.py configures SQLALCHEMY_DATABASE_URI from this, so the raw-sqlite modules open the same file.
+    """
+    database_url = os.environ.get('DATABASE_URL', f'sqlite:///{os.path.abspath(DEFAULT_DATABASE_FILE)}')
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    return database_url
+
+
+def resolve_database_path(database_url=None):
+    """
+    Resolve the one SQLite file shared by the app and all raw-sqlite modules
+
+    Order: SQLITE_DATABASE_PATH, then the file of the app's sqlite:// database URL
+    (default get_database_url()). With a non-SQLite DATABASE_URL the default file is used.
+    """
+    explicit_path = os.environ.get('SQLITE_DATABASE_PATH')
+    if explicit_path:
+        return os.path.abspath(explicit_path)
+
+    database_url = database_url or get_database_url()
+    if database_url.startswith('sqlite:'):
+        path = urlparse(database_url).path[1:]
+        if path and path != ':memory:':
+            # sqlite:////abs/path -> /abs/path, sqlite:///rel/path -> rel/path
+            return os.path.abspath(path)
+
+    logger.warning(f"⚠️ DATABASE_URL is not a SQLite file, raw-sqlite modules use {DEFAULT_DATABASE_FILE}")
+    return os.path.abspath(DEFAULT_DATABASE_FILE)
+
+
+def apply_sqlite_pragmas(conn):
+    """Apply SQLITE_PRAGMAS to a DB-API sqlite3 connection"""
+    cursor = conn.cursor()
+    try:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+    finally:
+        cursor.close()
+
+
+def register_sqlite_pragmas(engine):
+    """Apply SQLITE_PRAGMAS to every connection a SQLAlchemy engine opens (no-op for other databases)"""
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    event.listen(engine, 'connect', lambda dbapi_connection, connection_record: apply_sqlite_pragmas(dbapi_connection))
+    logger.info(f"✅ SQLite pragmas registered for {engine.url}")
+    return True
+
+
+class SQLiteConnectionManager:
+    """One pooled connection per thread (and process) for a SQLite file"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_PRAGMAS['busy_timeout'] / 1000)
+        conn.row_factory = sqlite3.Row
+        apply_sqlite_pragmas(conn)
+        logger.info(f"✅ SQLite connection opened ({self.db_path}, thread {threading.current_thread().name})")
+        return conn
+
+    def connection(self):
+        """The calling thread's connection (opened on first use, reopened after fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def release(self, conn):
+        """Give a connection back: roll back anything left uncommitted, keep it open"""
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+
+    def checkpoint(self):
+        """Fold the WAL into the main database file (before copying the file)"""
+        try:
+            self.connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ WAL checkpoint failed: {e}")
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path=None):
+    """Shared connection manager for a database file (default: resolve_database_path())"""
+    db_path = os.path.abspath(db_path) if db_path else resolve_database_path()
+
+    with _managers_lock:
+        manager = _managers.get(db_path)
+        if manager is None:
+            manager = SQLiteConnectionManager(db_path)
+            _managers[db_path] = manager
+    return manager
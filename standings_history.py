@@ -0,0 +1,115 @@
+"""
+Standings History for NFL PickEm 2025
+Appends the standings (points, rank, rank delta) once per completed week and serves season charts
+"""
+
+import logging
+from sqlalchemy import func
+from leaderboard import get_leaderboard_rows
+from data_version import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+
+def week_is_complete(db, Match, week):
+    """True once the week has matches and all of them are final"""
+    total, completed = db.session.query(
+        func.count(Match.id),
+        func.count(Match.id).filter(Match.is_completed == True)
+    ).filter(Match.week == week).one()
+    return total > 0 and total == completed
+
+
+def record_week_standings(db, Match, Pick, User, StandingsHistory, week, force=False):
+    """
+    Append the standings after a completed week (once per week)
+
+    Points are cumulative through the week (stored pick points), ranks use the leaderboard ranking.
+    delta = previous week's rank - this week's rank (positive = moved up).
+
+    Args:
+        force: Replace an existing snapshot of the week (e.g. after a score correction)
+
+    Returns:
+        int: Number of rows written (0 if the week is not complete or already recorded)
+    """
+    if not week_is_complete(db, Match, week):
+        return 0
+
+    existing = db.session.query(StandingsHistory.id).filter(StandingsHistory.week == week)
+    if existing.first() is not None:
+        if not force:
+            return 0
+        existing.delete(synchronize_session=False)
+
+    previous_ranks = dict(db.session.query(StandingsHistory.user_id, StandingsHistory.rank).filter(
+        StandingsHistory.week == week - 1
+    ).all())
+
+    # Cumulative points and rank through this week for every user, ranked in SQL
+    rows = []
+    for standing in get_leaderboard_rows(db, User, Pick, Match, through_week=week):
+        previous_rank = previous_ranks.get(standing['user_id'])
+        rows.append({
+            'user_id': standing['user_id'],
+            'week': week,
+            'points': standing['points'],
+            'rank': standing['rank'],
+            'delta': previous_rank - standing['rank'] if previous_rank is not None else None
+        })
+
+    db.session.bulk_insert_mappings(StandingsHistory, rows)
+    bump_data_version(db.session)
+    db.session.commit()
+    logger.info(f"✅ Standings for week {week} recorded ({len(rows)} users)")
+    return len(rows)
+
+
+def record_completed_weeks(db, Match, Pick, User, StandingsHistory):
+    """Record all completed weeks that have no snapshot yet, in week order (e.g. after a full rescore)"""
+    weeks = [week for (week,) in db.session.query(Match.week).distinct().order_by(Match.week).all()]
+    recorded = 0
+    for week in weeks:
+        recorded += record_week_standings(db, Match, Pick, User, StandingsHistory, week)
+    return recorded
+
+
+def get_standings_history(db, StandingsHistory, User, from_week=None, to_week=None):
+    """
+    Season chart data from one range scan over (week, user_id)
+
+    Returns:
+        Dict: {'weeks': [...], 'users': [{'user_id', 'username', 'points': [...], 'ranks': [...], 'deltas': [...]}]}
+    """
+    query = db.session.query(
+        StandingsHistory.week, StandingsHistory.user_id, User.username,
+        StandingsHistory.points, StandingsHistory.rank, StandingsHistory.delta
+    ).join(User, StandingsHistory.user_id == User.id)
+
+    if from_week is not None:
+        query = query.filter(StandingsHistory.week >= from_week)
+    if to_week is not None:
+        query = query.filter(StandingsHistory.week <= to_week)
+
+    weeks = []
+    users = {}
+    for week, user_id, username, points, rank, delta in query.order_by(StandingsHistory.week, StandingsHistory.user_id):
+        if not weeks or weeks[-1] != week:
+            weeks.append(week)
+
+        series = users.setdefault(user_id, {
+            'user_id': user_id,
+            'username': username,
+            'points': [],
+            'ranks': [],
+            'deltas': []
+        })
+        # Users added mid-season get None for the weeks before their first snapshot
+        missing = len(weeks) - 1 - len(series['points'])
+        for key in ('points', 'ranks', 'deltas'):
+            series[key].extend([None] * missing)
+        series['points'].append(points)
+        series['ranks'].append(rank)
+        series['deltas'].append(delta)
+
+    return {'weeks': weeks, 'users': list(users.values())}
@@ -0,0 +1,228 @@
+"""
+Sync Diff for NFL PickEm 2025
+In-memory change sets for sync jobs - reported in dry-run mode, applied otherwise
+"""
+
+from datetime import datetime
+from event_bus import get_event_bus, MATCH_COMPLETED, SCHEDULE_CHANGED
+
+# Reported change type per column
+FIELD_CHANGE_TYPES = {
+    'week': 'moved',
+    'start_time': 'time_change',
+    'is_completed': 'score_update',
+    'home_score': 'score_update',
+    'away_score': 'score_update',
+    'winner_team_id': 'winner_change',
+    'espn_event_id': 'link',
+    'sportsdata_game_key': 'link'
+}
+
+# Columns covered by sync_fingerprint - skipped when the stored fingerprint matches
+FINGERPRINTED_FIELDS = ('start_time', 'is_completed', 'home_score', 'away_score', 'winner_team_id')
+
+# Written along with real changes, never reported as a change themselves
+BOOKKEEPING_FIELDS = ('sync_fingerprint',)
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return value
+    return value
+
+
+def _same_time(old, new):
+    """Kickoff comparison to the minute - naive values (tz dropped by the DB) compare by wall time"""
+    old, new = _as_datetime(old), _as_datetime(new)
+    if not isinstance(old, datetime) or not isinstance(new, datetime):
+        return old == new
+
+    if (old.tzinfo is None) != (new.tzinfo is None):
+        old, new = old.replace(tzinfo=None), new.replace(tzinfo=None)
+    return old.replace(second=0, microsecond=0) == new.replace(second=0, microsecond=0)
+
+
+def _same_value(field, old, new):
+    if field == 'start_time':
+        return _same_time(old, new)
+    if field == 'is_completed':
+        return bool(old) == bool(new)
+    if old is None or new is None:
+        return old is None and new is None
+    return str(old) == str(new)
+
+
+class SyncDiff:
+    """Change set of one sync run against one table"""
+
+    def __init__(self, source, dry_run=False):
+        self.source = source
+        self.dry_run = dry_run
+        self.inserts = []   # Row dicts for new rows
+        self.updates = []   # {'id': ..., <changed columns>}
+        self.changes = []   # Reported changes
+        self.unchanged = 0
+
+    def add_insert(self, values, label, change_type='new_match'):
+        """Record a new row"""
+        self.inserts.append(values)
+        self.changes.append({
+            'type': change_type,
+            'match': label,
+            'week': values.get('week'),
+            'start_time': _json_value(values.get('start_time'))
+        })
+
+    def compare(self, row_id, stored, values, label):
+        """
+        Diff incoming values against the stored row and record only changed columns
+
+        Args:
+            row_id: Primary key of the stored row
+            stored: {column: stored value}
+            values: {column: incoming value} - only the columns the sync writes
+
+        Returns:
+            bool: True if the row changes
+        """
+        fingerprint = values.get('sync_fingerprint')
+        skip_fingerprinted = fingerprint is not None and stored.get('sync_fingerprint') == fingerprint
+
+        changed = {}
+        for field, new in values.items():
+            if field in BOOKKEEPING_FIELDS or (skip_fingerprinted and field in FINGERPRINTED_FIELDS):
+                continue
+
+            old = stored.get(field)
+            if _same_value(field, old, new):
+                continue
+
+            changed[field] = new
+            self.changes.append({
+                'type': FIELD_CHANGE_TYPES.get(field, 'field_change'),
+                'match_id': row_id,
+                'match': label,
+                'field': field,
+                'old': _json_value(old),
+                'new': _json_value(new)
+            })
+
+        if not changed:
+            self.unchanged += 1
+            return False
+
+        for field in BOOKKEEPING_FIELDS:
+            if field in values:
+                changed[field] = values[field]
+        self.updates.append(dict(changed, id=row_id))
+        return True
+
+    def merge(self, other):
+        """Add another diff (e.g. the next week) to this one"""
+        self.inserts.extend(other.inserts)
+        self.updates.extend(other.updates)
+        self.changes.extend(other.changes)
+        self.unchanged += other.unchanged
+        return self
+
+    @property
+    def stats(self):
+        """Counters in the new_sync_stats() format"""
+        return {'created': len(self.inserts), 'updated': len(self.updates), 'unchanged': self.unchanged}
+
+    @property
+    def has_changes(self):
+        return bool(self.inserts or self.updates)
+
+    def apply_to_session(self, db, Model):
+        """Write the change set with one bulk insert/update and one commit (no-op for dry runs)"""
+        if self.dry_run or not self.has_changes:
+            return self.stats
+
+        db.session.bulk_insert_mappings(Model, self.inserts)
+        db.session.bulk_update_mappings(Model, self.updates)
+        db.session.commit()
+        return self.stats
+
+    def apply_to_sqlite(self, conn, table):
+        """
+        Write the updates to a raw sqlite table without committing (no-op for dry runs)
+
+        Rows with the same set of changed columns share one executemany.
+        """
+        if self.dry_run:
+            return 0
+
+        batches = {}
+        for update in self.updates:
+            columns = tuple(sorted(column for column in update if column != 'id'))
+            batches.setdefault(columns, []).append(tuple(update[column] for column in columns) + (update['id'],))
+
+        written = 0
+        for columns, rows in batches.items():
+            assignments = ', '.join(f"{column} = ?" for column in columns)
+            cursor = conn.executemany(f"UPDATE {table} SET {assignments} WHERE id = ?", rows)
+            written += cursor.rowcount
+        return written
+
+    def events(self):
+        """
+        Domain events for the applied change set (none for dry runs)
+
+        Returns:
+            List[Tuple[str, Dict]]: match_completed per newly final match, one schedule_changed for new/moved/rescheduled matches
+        """
+        if self.dry_run:
+            return []
+
+        events = []
+        rescheduled = []
+        weeks = {values.get('week') for values in self.inserts} - {None}
+
+        for update in self.updates:
+            if update.get('is_completed') or update.get('winner_team_id') is not None:
+                events.append((MATCH_COMPLETED, {
+                    'match_id': update['id'],
+                    'winner_team_id': update.get('winner_team_id'),
+                    'source': self.source
+                }))
+            if 'start_time' in update or 'week' in update:
+                rescheduled.append(update['id'])
+                if update.get('week') is not None:
+                    weeks.add(update['week'])
+
+        if self.inserts or rescheduled:
+            events.append((SCHEDULE_CHANGED, {
+                'match_ids': rescheduled,
+                'weeks': sorted(weeks),
+                'source': self.source
+            }))
+        return events
+
+    def publish_events(self, bus=None):
+        """Publish events() after the change set was committed"""
+        bus = bus or get_event_bus()
+        for event, payload in self.events():
+            bus.publish(event, **payload)
+
+    def to_dict(self):
+        """Structured diff for dry-run reports"""
+        counts = {}
+        for change in self.changes:
+            counts[change['type']] = counts.get(change['type'], 0) + 1
+
+        return {
+            'source': self.source,
+            'dry_run': self.dry_run,
+            'summary': dict(self.stats, changes=counts),
+            'changes': self.changes
+        }
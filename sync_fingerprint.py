@@ -0,0 +1,58 @@
+"""
+Sync Fingerprints for NFL PickEm 2025
+Content hashes of provider game payloads, so sync runs only write changed matches
+"""
+
+import json
+import hashlib
+from datetime import datetime, timezone
+
+
+def _normalize_time(value):
+    """Normalize datetimes and ISO strings to a UTC ISO string"""
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return value
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M')
+
+
+def _winner_side(home_score, away_score, is_completed):
+    if not is_completed or home_score is None or away_score is None:
+        return None
+    if home_score > away_score:
+        return 'home'
+    if away_score > home_score:
+        return 'away'
+    return 'tie'
+
+
+def game_fingerprint(start_time=None, is_completed=False, home_score=None, away_score=None):
+    """
+    Content hash of everything a sync writes for one game
+
+    The winner is encoded as the winning side so ESPN ids, SportsData keys
+    and display names all produce the same fingerprint.
+    """
+    is_completed = bool(is_completed)
+    payload = {
+        'start_time': _normalize_time(start_time),
+        'completed': is_completed,
+        'home_score': home_score if is_completed else None,
+        'away_score': away_score if is_completed else None,
+        'winner': _winner_side(home_score, away_score, is_completed)
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def new_sync_stats():
+    """Counters reported by every sync run"""
+    return {'created': 0, 'updated': 0, 'unchanged': 0}
@@ -0,0 +1,182 @@
+"""
+Sync Worker for NFL PickEm 2025
+Separate worker process for sync, validation and scoring - claims jobs from the durable job queue
+(the web process only enqueues). Start with: python sync_worker.py
+"""
+
+import os
+import time
+import signal
+import logging
+import threading
+
+from job_queue import JobQueue, worker_id
+from job_progress import JobProgress, track_job_progress
+from job_metrics import get_job_metrics
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s:%(name)s:%(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Seconds between queue polls when idle / between claim renewals of a running job
+POLL_INTERVAL = float(os.environ.get('WORKER_POLL_SECONDS', 5))
+HEARTBEAT_INTERVAL = 60
+PRUNE_INTERVAL = 60 * 60
+
+
+class JobFailed(Exception):
+    """Raised for handlers that report failure by returning False"""
+
+
+class SyncWorker:
+    """Claims queued jobs and runs the registered handler for each job type"""
+
+    def __init__(self, queue, handlers=None, poll_interval=POLL_INTERVAL, heartbeat_interval=HEARTBEAT_INTERVAL,
+                 state=None):
+        """
+        Args:
+            state: JobStateStore - records last run / last success of scheduled jobs for the catch-up
+        """
+        self.queue = queue
+        self.state = state
+        self.handlers = dict(handlers or {})
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.owner = worker_id()
+        self._stop_event = threading.Event()
+
+    def register(self, job_type, handler):
+        """handler(**payload) - returning False or raising fails the attempt"""
+        self.handlers[job_type] = handler
+
+    def _heartbeat(self, job_id, done):
+        while not done.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(job_id, self.owner):
+                logger.warning(f"⚠️ Lost the claim on job #{job_id}")
+                return
+
+    def execute(self, job):
+        """Run one claimed job and record success, retry or dead letter"""
+        handler = self.handlers.get(job['job_type'])
+        if handler is None:
+            self.queue.fail(job['id'], f"No handler for job type {job['job_type']}")
+            return False
+
+        logger.info(f"🔄 Job #{job['id']} {job['job_type']} (attempt {job['attempts']}/{job['max_attempts']})")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job['id'], done), daemon=True)
+        heartbeat.start()
+
+        # Sync code reports stages and counters through job_progress while the handler runs
+        progress = JobProgress(flush=lambda data: self.queue.update_progress(job['id'], data))
+        metrics = get_job_metrics()
+        run = metrics.start(job['job_type'], 'worker')
+        try:
+            with track_job_progress(progress):
+                result = handler(**(job['payload'] or {}))
+            if result is False:
+                raise JobFailed(f"{job['job_type']} reported failure")
+            metrics.finish(run, True, counters=progress.counters)
+            if self.state is not None:
+                self.state.record(job['job_type'], 'success', job['started_at'])
+            self.queue.complete(job['id'], result, progress.to_dict())
+            logger.info(f"✅ Job #{job['id']} {job['job_type']} succeeded")
+            return True
+        except Exception as e:
+            metrics.finish(run, False, e, progress.counters)
+            if self.state is not None:
+                self.state.record(job['job_type'], 'failed', job['started_at'], e)
+            self.queue.fail(job['id'], e, progress.to_dict())
+            return False
+        finally:
+            done.set()
+
+    def run_once(self):
+        """Claim and run one job (False if the queue had nothing runnable)"""
+        job = self.queue.claim(self.owner, job_types=self.handlers.keys())
+        if job is None:
+            return False
+        self.execute(job)
+        return True
+
+    def run(self):
+        """Worker loop - a stop request lets the running job finish before exiting"""
+        logger.info(f"🚀 Sync worker {self.owner} started ({', '.join(sorted(self.handlers))})")
+        last_prune = 0
+
+        while not self._stop_event.is_set():
+            try:
+                # Keep results and errors of recent runs only
+                if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                    self.queue.prune()
+                    last_prune = time.monotonic()
+
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"❌ Error in sync worker loop: {e}")
+            self._stop_event.wait(self.poll_interval)
+
+        logger.info(f"🛑 Sync worker {self.owner} stopped")
+
+    def stop(self, *args):
+        self._stop_event.set()
+
+
+def build_worker(app, db):
+    """
+    Worker with all sync/validation/scoring handlers
+
+    Scheduled jobs are enqueued by the leader's job scheduler and run by whichever worker claims them.
+    The ESPN scheduler owns the one results job and the one live poller; the validator only runs on demand.
+
+    Returns:
+        (SyncWorker, ESPNScheduler)
+    """
+    from espn_data_sync import ESPNDataSync
+    from espn_points_calculator import ESPNPointsCalculator
+    from espn_scheduler import ESPNScheduler
+    from game_validator import NFLGameValidator
+
+    with app.app_context():
+        queue = JobQueue(db.engine)
+
+    espn_sync = ESPNDataSync(app, db)
+    points_calculator = ESPNPointsCalculator(app, db)
+    espn_scheduler = ESPNScheduler(app, espn_sync, points_calculator)
+    espn_scheduler.scheduler.use_queue(queue)
+
+    validator = NFLGameValidator()
+
+    worker = SyncWorker(queue, state=espn_scheduler.scheduler.state)
+    worker.register('manual_sync', espn_scheduler.manual_sync)
+    worker.register('daily_espn_sync', espn_scheduler.daily_sync)
+    worker.register('weekly_schedule_sync', espn_scheduler.weekly_schedule_sync)
+    worker.register('validate_incomplete_weeks', validator.validate_all_incomplete_weeks)
+    worker.register('validate_week', validator.validate_week)
+    worker.register('calculate_all_points', points_calculator.calculate_all_points)
+    return worker, espn_scheduler
+
+
+def main():
+    """Worker process entry point"""
+    from app import app, db, init_db
+
+    init_db()
+    worker, espn_scheduler = build_worker(app, db)
+
+    # Render/gunicorn deploys send SIGTERM - finish the current job, then exit
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    espn_scheduler.start_scheduler()
+    try:
+        worker.run()
+    finally:
+        espn_scheduler.stop_scheduler()
+
+
+if __name__ == '__main__':
+    main()
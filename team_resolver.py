@@ -0,0 +1,275 @@
+"""
+Team Resolver for NFL PickEm 2025
+One lookup table for team identities across ESPN, SportsData.io, display names and logo keys
+"""
+
+import logging
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+# Canonical NFL teams: (abbreviation, ESPN id, display name)
+NFL_TEAMS = [
+    ('ARI', '22', 'Arizona Cardinals'),
+    ('ATL', '1', 'Atlanta Falcons'),
+    ('BAL', '33', 'Baltimore Ravens'),
+    ('BUF', '2', 'Buffalo Bills'),
+    ('CAR', '29', 'Carolina Panthers'),
+    ('CHI', '3', 'Chicago Bears'),
+    ('CIN', '4', 'Cincinnati Bengals'),
+    ('CLE', '5', 'Cleveland Browns'),
+    ('DAL', '6', 'Dallas Cowboys'),
+    ('DEN', '7', 'Denver Broncos'),
+    ('DET', '8', 'Detroit Lions'),
+    ('GB', '9', 'Green Bay Packers'),
+    ('HOU', '34', 'Houston Texans'),
+    ('IND', '11', 'Indianapolis Colts'),
+    ('JAX', '30', 'Jacksonville Jaguars'),
+    ('KC', '12', 'Kansas City Chiefs'),
+    ('LV', '13', 'Las Vegas Raiders'),
+    ('LAC', '24', 'Los Angeles Chargers'),
+    ('LAR', '14', 'Los Angeles Rams'),
+    ('MIA', '15', 'Miami Dolphins'),
+    ('MIN', '16', 'Minnesota Vikings'),
+    ('NE', '17', 'New England Patriots'),
+    ('NO', '18', 'New Orleans Saints'),
+    ('NYG', '19', 'New York Giants'),
+    ('NYJ', '20', 'New York Jets'),
+    ('PHI', '21', 'Philadelphia Eagles'),
+    ('PIT', '23', 'Pittsburgh Steelers'),
+    ('SF', '25', 'San Francisco 49ers'),
+    ('SEA', '26', 'Seattle Seahawks'),
+    ('TB', '27', 'Tampa Bay Buccaneers'),
+    ('TEN', '10', 'Tennessee Titans'),
+    ('WAS', '28', 'Washington Commanders'),
+]
+
+# Historical and provider-specific abbreviations
+EXTRA_ABBREVIATIONS = {
+    'WSH': 'WAS',
+    'JAC': 'JAX',
+    'LA': 'LAR',
+    'STL': 'LAR',
+    'SD': 'LAC',
+    'OAK': 'LV',
+}
+
+ALIAS_TYPES = ('abbreviation', 'espn_id', 'sportsdata', 'display_name', 'nickname', 'logo_key')
+
+# A canonical team with its database id (the app has no team table - matches store team id and name)
+TeamInfo = namedtuple('TeamInfo', ['id', 'abbreviation', 'name'])
+
+
+def normalize_alias(value):
+    """Normalize an alias for lookup (case and whitespace insensitive)"""
+    if value is None:
+        return ''
+    return ' '.join(str(value).strip().lower().split())
+
+
+def seed_aliases():
+    """
+    Default alias rows for all 32 teams
+
+    Returns:
+        List[Dict]: Rows with alias_type, alias_value and abbreviation
+    """
+    rows = []
+    for abbreviation, espn_id, name in NFL_TEAMS:
+        slug = name.lower().replace(' ', '-')
+        rows.extend([
+            {'alias_type': 'abbreviation', 'alias_value': abbreviation, 'abbreviation': abbreviation},
+            {'alias_type': 'espn_id', 'alias_value': espn_id, 'abbreviation': abbreviation},
+            {'alias_type': 'sportsdata', 'alias_value': abbreviation, 'abbreviation': abbreviation},
+            {'alias_type': 'display_name', 'alias_value': name, 'abbreviation': abbreviation},
+            {'alias_type': 'nickname', 'alias_value': name.split()[-1], 'abbreviation': abbreviation},
+            {'alias_type': 'logo_key', 'alias_value': abbreviation.lower(), 'abbreviation': abbreviation},
+            {'alias_type': 'logo_key', 'alias_value': slug, 'abbreviation': abbreviation},
+        ])
+
+    for alias, abbreviation in EXTRA_ABBREVIATIONS.items():
+        rows.append({'alias_type': 'abbreviation', 'alias_value': alias, 'abbreviation': abbreviation})
+
+    return rows
+
+
+def _field(row, key):
+    """Read a field from an alias dict or a TeamAlias row"""
+    if isinstance(row, dict):
+        return row.get(key)
+    return getattr(row, key, None)
+
+
+class TeamResolver:
+    """Immutable alias -> team lookup table, resolved with a single dict lookup"""
+
+    def __init__(self, rows, team_ids=None):
+        """
+        Args:
+            rows: Alias rows (dicts or objects) with alias_type, alias_value, abbreviation
+            team_ids: Optional {abbreviation: database team id}
+        """
+        by_type = {}
+        by_value = {}
+        ids = dict(team_ids or {})
+
+        for row in rows:
+            alias_type = _field(row, 'alias_type')
+            value = normalize_alias(_field(row, 'alias_value'))
+            abbreviation = _field(row, 'abbreviation')
+
+            by_type[(alias_type, value)] = abbreviation
+            by_value.setdefault(value, abbreviation)
+
+            team_id = _field(row, 'team_id')
+            if team_id is not None:
+                ids.setdefault(abbreviation, team_id)
+
+        self._by_type = MappingProxyType(by_type)
+        self._by_value = MappingProxyType(by_value)
+        self._team_ids = MappingProxyType(ids)
+
+    def resolve(self, value, alias_type=None):
+        """
+        Resolve any team identifier to the canonical abbreviation
+
+        Args:
+            value: ESPN id, SportsData key, abbreviation, display name, nickname or logo key
+            alias_type: Restrict the lookup to one alias type
+
+        Returns:
+            Optional[str]: Canonical abbreviation or None
+        """
+        key = normalize_alias(value)
+        if alias_type:
+            return self._by_type.get((alias_type, key))
+        return self._by_value.get(key)
+
+    def team_id(self, value, alias_type=None):
+        """Database team id for any team identifier (None if unknown)"""
+        abbreviation = self.resolve(value, alias_type)
+        return self._team_ids.get(abbreviation) if abbreviation else None
+
+    def display_name(self, value, alias_type=None):
+        """Canonical display name for any team identifier"""
+        abbreviation = self.resolve(value, alias_type)
+        return _DISPLAY_NAMES.get(abbreviation)
+
+    def team(self, value, alias_type=None):
+        """TeamInfo for any team identifier (None if unknown or without database id)"""
+        abbreviation = self.resolve(value, alias_type)
+        team_id = self._team_ids.get(abbreviation) if abbreviation else None
+        if team_id is None:
+            return None
+        return TeamInfo(team_id, abbreviation, _DISPLAY_NAMES.get(abbreviation, abbreviation))
+
+    def teams(self):
+        """All teams with a database id: {canonical abbreviation: TeamInfo}"""
+        return {
+            abbreviation: TeamInfo(team_id, abbreviation, _DISPLAY_NAMES.get(abbreviation, abbreviation))
+            for abbreviation, team_id in self._team_ids.items()
+        }
+
+
+_DISPLAY_NAMES = MappingProxyType({abbreviation: name for abbreviation, _, name in NFL_TEAMS})
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def team_ids_from_matches(db, Match):
+    """
+    Database team ids as used by the stored matches
+
+    Returns:
+        Dict[str, int]: {canonical abbreviation: team id}, resolved from the team names on the matches
+    """
+    resolver = TeamResolver(seed_aliases())
+    home = db.session.query(Match.home_team_id, Match.home_team_name)
+    away = db.session.query(Match.away_team_id, Match.away_team_name)
+
+    team_ids = {}
+    for team_id, team_name in home.union(away).all():
+        abbreviation = resolver.resolve(team_name)
+        if abbreviation and team_id is not None:
+            team_ids.setdefault(abbreviation, team_id)
+    return team_ids
+
+
+def complete_team_ids(team_ids):
+    """Give teams without a database id the next free ids (in NFL_TEAMS order)"""
+    team_ids = dict(team_ids)
+    next_id = max(team_ids.values(), default=0) + 1
+    for abbreviation, _, _ in NFL_TEAMS:
+        if abbreviation not in team_ids:
+            team_ids[abbreviation] = next_id
+            next_id += 1
+    return team_ids
+
+
+def seed_team_aliases(db, TeamAlias, team_ids=None):
+    """Fill the persisted alias table with the default aliases (only missing rows) and update their team ids"""
+    aliases = TeamAlias.query.all()
+    existing = {(alias.alias_type, alias.alias_value) for alias in aliases}
+    team_ids = team_ids or {}
+
+    changed_ids = [
+        {'id': alias.id, 'team_id': team_ids[alias.abbreviation]}
+        for alias in aliases if alias.abbreviation in team_ids and alias.team_id != team_ids[alias.abbreviation]
+    ]
+    if changed_ids:
+        db.session.bulk_update_mappings(TeamAlias, changed_ids)
+        db.session.commit()
+        logger.info(f"✅ Stored team ids on {len(changed_ids)} team aliases")
+
+    new_rows = []
+    for row in seed_aliases():
+        value = normalize_alias(row['alias_value'])
+        if (row['alias_type'], value) not in existing:
+            new_rows.append(dict(row, alias_value=value, team_id=team_ids.get(row['abbreviation'])))
+            existing.add((row['alias_type'], value))
+
+    if new_rows:
+        db.session.bulk_insert_mappings(TeamAlias, new_rows)
+        db.session.commit()
+        logger.info(f"✅ Seeded {len(new_rows)} team aliases")
+
+    return len(new_rows)
+
+
+def init_team_resolver(db, TeamAlias, team_ids=None):
+    """
+    Seed the alias table and build the process-wide resolver from it (call at startup)
+
+    Args:
+        team_ids: {abbreviation: database team id} known from the matches (see team_ids_from_matches);
+                  ids stored on the aliases fill the gaps, remaining teams get the next free ids
+    """
+    global _resolver
+
+    try:
+        stored_ids = {alias.abbreviation: alias.team_id for alias in TeamAlias.query.all() if alias.team_id is not None}
+        team_ids = complete_team_ids(dict(stored_ids, **(team_ids or {})))
+        seed_team_aliases(db, TeamAlias, team_ids)
+        resolver = TeamResolver(TeamAlias.query.all(), team_ids)
+        logger.info("✅ Team resolver loaded from team_aliases")
+    except Exception as e:
+        logger.error(f"❌ Failed to load team aliases, using built-in table: {e}")
+        resolver = TeamResolver(seed_aliases(), team_ids)
+
+    with _resolver_lock:
+        _resolver = resolver
+    return resolver
+
+
+def get_team_resolver():
+    """Process-wide team resolver (built-in table until init_team_resolver() ran)"""
+    global _resolver
+
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = TeamResolver(seed_aliases())
+    return _resolver
@@ -0,0 +1,15 @@
+"""
+Test setup for NFL PickEm 2025
+app.py reads DATABASE_URL at import time - point it at a throwaway SQLite file before any test imports it
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix='nfl_pickem_tests_')
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TEST_DIR, 'nfl_pickem_test.db')}"
+os.environ['JOB_METRICS_LOG'] = os.path.join(TEST_DIR, 'job_metrics.jsonl')
+sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,123 @@
+"""
+NFLGameValidator tests on a throwaway copy of the app schema
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from game_validator import NFLGameValidator
+
+
+def espn_event(event_id, home, away, home_score, away_score):
+    """Minimal final ESPN scoreboard event"""
+    def competitor(name, home_away, score):
+        return {'team': {'displayName': name}, 'homeAway': home_away, 'score': str(score)}
+
+    return {
+        'id': event_id,
+        'date': '2025-09-21T17:00Z',
+        'status': {'type': {'name': 'STATUS_FINAL'}},
+        'competitions': [{'competitors': [competitor(home, 'home', home_score), competitor(away, 'away', away_score)]}]
+    }
+
+
+@pytest.fixture
+def validator(tmp_path):
+    from app import db
+
+    db_path = str(tmp_path / 'validator.db')
+    db.metadata.create_all(create_engine(f"sqlite:///{db_path}"))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO matches (id, week, home_team_id, home_team_name, away_team_id, away_team_name, start_time, is_completed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (1, 3, 5, 'Carolina Panthers', 1, 'Atlanta Falcons', '2025-09-21T19:00:00+02:00', 0),
+        (2, 3, 23, 'New York Giants', 4, 'Dallas Cowboys', '2025-09-21T19:00:00+02:00', 0)
+    ])
+    conn.execute("INSERT INTO users (id, username, password_hash, display_name) VALUES (1, 'Manuel', 'x', 'Manuel')")
+    conn.execute("INSERT INTO picks (user_id, match_id, chosen_team_id) VALUES (1, 1, 5)")
+    conn.commit()
+    conn.close()
+
+    return NFLGameValidator(db_path)
+
+
+def stored_match(validator, match_id):
+    conn = sqlite3.connect(validator.db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return dict(conn.execute("SELECT * FROM matches WHERE id = ?", (match_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def test_dry_run_returns_diff_without_writing(validator, monkeypatch):
+    week_3 = {'events': [espn_event('401', 'Carolina Panthers', 'Atlanta Falcons', 24, 17)]}
+    monkeypatch.setattr(validator, 'get_espn_scoreboard', lambda week, year=2025: week_3)
+
+    diff = validator.validate_all_incomplete_weeks(dry_run=True)
+
+    assert diff['dry_run'] is True
+    assert diff['summary']['updated'] == 1
+    assert {change['field'] for change in diff['changes'] if change['match_id'] == 1} >= {'is_completed', 'home_score', 'winner_team_id'}
+
+    match = stored_match(validator, 1)
+    assert not match['is_completed']
+    assert match['home_score'] is None
+    assert match['espn_event_id'] is None
+
+
+def test_validate_week_writes_result_and_scores_picks(validator):
+    week_3 = {'events': [espn_event('401', 'Carolina Panthers', 'Atlanta Falcons', 24, 17)]}
+
+    assert validator.validate_week(3, espn_data=week_3) is True
+
+    match = stored_match(validator, 1)
+    assert match['is_completed']
+    assert (match['home_score'], match['away_score'], match['winner_team_id']) == (24, 17, 5)
+    assert match['espn_event_id'] == '401'
+
+    conn = sqlite3.connect(validator.db_path)
+    try:
+        assert conn.execute("SELECT is_correct, points_earned FROM picks WHERE match_id = 1").fetchone() == (1, 1)
+    finally:
+        conn.close()
+
+
+def test_tie_is_completed_without_winner_and_scored_with_tie_points(validator, monkeypatch):
+    import game_validator
+    from scoring_rules import ScoringRules
+
+    monkeypatch.setattr(game_validator, 'get_scoring_rules', lambda: ScoringRules(tie_points=1))
+    week_3 = {'events': [espn_event('401', 'Carolina Panthers', 'Atlanta Falcons', 20, 20)]}
+
+    assert validator.validate_week(3, espn_data=week_3) is True
+
+    match = stored_match(validator, 1)
+    assert match['is_completed']
+    assert (match['home_score'], match['away_score'], match['winner_team_id']) == (20, 20, None)
+
+    conn = sqlite3.connect(validator.db_path)
+    try:
+        assert conn.execute("SELECT is_correct, points_earned FROM picks WHERE match_id = 1").fetchone() == (0, 1)
+    finally:
+        conn.close()
+
+
+def test_final_game_without_picks_records_week_standings(validator):
+    week_3 = {'events': [
+        espn_event('401', 'Carolina Panthers', 'Atlanta Falcons', 24, 17),
+        espn_event('402', 'New York Giants', 'Dallas Cowboys', 10, 31)
+    ]}
+
+    assert validator.validate_week(3, espn_data=week_3) is True
+
+    conn = sqlite3.connect(validator.db_path)
+    try:
+        assert conn.execute("SELECT user_id, week, points, rank FROM standings_history").fetchall() == [(1, 3, 1, 1)]
+    finally:
+        conn.close()
@@ -0,0 +1,25 @@
+"""
+/api/jobs - only operators listed in ADMIN_USERNAMES may queue jobs
+"""
+
+import job_api_endpoints
+
+
+def test_enqueue_requires_operator(monkeypatch):
+    from app import app, init_db, job_queue
+
+    init_db()
+    client = app.test_client()
+    assert client.post('/api/login', json={'username': 'Daniel', 'password': 'Daniel1'}).json['success']
+
+    monkeypatch.setattr(job_api_endpoints, 'ADMIN_USERNAMES', {'manuel'})
+    response = client.post('/api/jobs', json={'job_type': 'calculate_all_points'})
+    assert response.status_code == 403
+
+    monkeypatch.setattr(job_api_endpoints, 'ADMIN_USERNAMES', {'daniel'})
+    response = client.post('/api/jobs', json={'job_type': 'calculate_all_points'})
+    assert response.status_code == 202
+    assert response.json['job_id']
+
+    # Leave the queue empty for the worker tests
+    job_queue.complete(response.json['job_id'])
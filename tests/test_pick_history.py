@@ -0,0 +1,32 @@
+"""
+/api/picks/history on the app models (team names come from the matches)
+"""
+
+
+def test_pick_history_endpoint_returns_team_names_and_kickoff():
+    from app import app, db, init_db, Match, Pick, User
+
+    init_db()
+    with app.app_context():
+        user = User.query.filter_by(username='Manuel').one()
+        match = Match(
+            week=17, home_team_id=5, home_team_name='Carolina Panthers', away_team_id=1,
+            away_team_name='Atlanta Falcons', start_time='2025-12-28T19:00:00+01:00'
+        )
+        db.session.add(match)
+        db.session.flush()
+        db.session.add(Pick(user_id=user.id, match_id=match.id, chosen_team_id=1))
+        db.session.commit()
+        user_id, match_id = user.id, match.id
+
+    client = app.test_client()
+    assert client.post('/api/login', json={'username': 'Manuel', 'password': 'Manuel1'}).json['success']
+
+    response = client.get('/api/picks/history?week=17').json
+    assert response['success'] is True
+
+    entry = next(entry for entry in response['history'][str(user_id)] if entry['match_id'] == match_id)
+    assert entry['start_time'] == '2025-12-28T19:00:00+01:00'
+    assert entry['chosen_team'] == {'id': 1, 'name': 'Atlanta Falcons', 'abbreviation': 'ATL'}
+    assert entry['loser_team']['name'] == 'Carolina Panthers'
+    assert entry['winner_team'] is None
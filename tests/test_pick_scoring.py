@@ -0,0 +1,33 @@
+"""
+Pick scoring - the full rescore also scores the historical picks
+"""
+
+
+def test_rescore_scores_historical_picks():
+    from app import app, db, init_db, HistoricalPick, Match, User
+    from espn_points_calculator import ESPNPointsCalculator
+
+    init_db()
+    with app.app_context():
+        user = User.query.filter_by(username='Raff').one()
+        match = Match(
+            week=15, home_team_id=15, home_team_name='Miami Dolphins', away_team_id=5,
+            away_team_name='Carolina Panthers', start_time='2025-12-14T19:00:00+01:00',
+            is_completed=True, home_score=13, away_score=23, winner_team_id=5
+        )
+        db.session.add(match)
+        db.session.flush()
+        for team_id, team_name in ((5, 'Carolina Panthers'), (15, 'Miami Dolphins')):
+            db.session.add(HistoricalPick(
+                user_id=user.id, username=user.username, week=15, match_id=match.id, chosen_team_id=team_id,
+                chosen_team_name=team_name, pick_time='2025-12-14T12:00:00+01:00'
+            ))
+        db.session.commit()
+        match_id = match.id
+
+    assert ESPNPointsCalculator(app, db).calculate_all_points() is True
+
+    with app.app_context():
+        scored = {pick.chosen_team_id: (pick.is_winner, pick.points_earned)
+                  for pick in HistoricalPick.query.filter_by(match_id=match_id)}
+        assert scored == {5: (True, 1), 15: (False, 0)}
@@ -0,0 +1,36 @@
+"""
+SportsData.io sync on the app models (team names from the resolver, ISO kickoff strings)
+"""
+
+
+def sportsdata_game(game_key, home, away, date_time):
+    return {
+        'GameKey': game_key, 'Season': 2025, 'Week': 18, 'HomeTeam': home, 'AwayTeam': away,
+        'DateTime': date_time, 'IsOver': False, 'HomeScore': None, 'AwayScore': None
+    }
+
+
+def test_sync_inserts_matches_with_team_names_and_iso_kickoff(monkeypatch):
+    from app import app, db, init_db, Match
+    from real_nfl_data_sync import RealNFLDataSync
+
+    init_db()
+    sync = RealNFLDataSync()
+    schedule = sync.convert_to_our_format([
+        sportsdata_game('202501801', 'PHI', 'DAL', '2026-01-04T18:00:00Z'),
+        sportsdata_game('202501802', 'MIA', 'CAR', None)
+    ])
+    monkeypatch.setattr(sync, 'fetch_season_data', lambda season: (schedule, []))
+
+    assert sync.sync_real_nfl_data(app, db, Match) is True
+
+    with app.app_context():
+        match = Match.query.filter_by(sportsdata_game_key='202501801').one()
+        assert (match.home_team_name, match.away_team_name) == ('Philadelphia Eagles', 'Dallas Cowboys')
+        assert match.start_time == '2026-01-04T19:00:00+01:00'
+        assert match.source == 'sportsdata'
+        assert Match.query.filter_by(sportsdata_game_key='202501802').first() is None
+
+    # Second run finds the stored match unchanged
+    summary = sync.sync_real_nfl_data(app, db, Match, dry_run=True)['summary']
+    assert (summary['created'], summary['updated'], summary['unchanged']) == (0, 0, 1)
@@ -0,0 +1,62 @@
+"""
+The raw SQLite scoring (game validator) gives the same results as the ORM expressions (score_picks, reports)
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from scoring_rules import ScoringRules
+
+# (home_team_id, away_team_id, home_score, away_score, winner_team_id, chosen_team_id)
+GAMES = [
+    (1, 2, 24, 17, 1, 1),    # Home favourite won
+    (1, 2, 24, 17, 1, 2),    # Wrong pick
+    (3, 4, 10, 31, 4, 4),    # Away underdog won by 21 (upset and margin bonus)
+    (3, 4, 10, 31, 4, 3),    # Wrong pick against the upset
+    (5, 6, 20, 20, None, 5)  # Tie
+]
+
+
+@pytest.mark.parametrize('rules', [
+    ScoringRules(),
+    ScoringRules(upset_bonus=1),
+    ScoringRules(margin_bonus=2, margin_threshold=14),
+    ScoringRules(base_points=3, wrong_points=-1, tie_points=1),
+    ScoringRules(base_points=2, upset_bonus=1, margin_bonus=1, margin_threshold=7, wrong_points=-1, tie_points=1)
+])
+def test_raw_sql_matches_orm_expressions(rules):
+    from app import db, Match, Pick
+
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        for match_id, (home, away, home_score, away_score, winner, chosen) in enumerate(GAMES, start=1):
+            session.add(Match(
+                id=match_id, week=1, home_team_id=home, home_team_name=f'Team {home}', away_team_id=away,
+                away_team_name=f'Team {away}', start_time='2025-09-07T19:00:00+02:00', is_completed=True,
+                home_score=home_score, away_score=away_score, winner_team_id=winner
+            ))
+            session.add(Pick(id=match_id, user_id=1, match_id=match_id, chosen_team_id=chosen))
+        session.commit()
+
+        orm = session.execute(
+            select(Pick.id, rules.correct_expression(Pick, Match), rules.points_expression(Pick, Match))
+            .join(Match, Pick.match_id == Match.id).where(rules.scored_match_filter(Match)).order_by(Pick.id)
+        ).all()
+
+    with engine.connect() as conn:
+        raw = conn.exec_driver_sql(f"""
+            SELECT p.id, {rules.correct_sql('p', 'm')}, {rules.points_sql('p', 'm')}
+            FROM picks p JOIN matches m ON m.id = p.match_id
+            WHERE {rules.scored_match_sql('m')}
+            ORDER BY p.id
+        """).all()
+
+    assert len(raw) == len(GAMES)
+    assert [(pick_id, bool(correct), points) for pick_id, correct, points in raw] == \
+        [(pick_id, bool(correct), points) for pick_id, correct, points in orm]
+
+    # Away underdog won by 21: base points plus upset and margin bonus
+    upset_points = {pick_id: points for pick_id, _, points in raw}[3]
+    assert upset_points == rules.base_points + rules.upset_bonus + (rules.margin_bonus if 21 >= rules.margin_threshold else 0)
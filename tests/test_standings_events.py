@@ -0,0 +1,24 @@
+"""
+match_completed events append the week's standings, also when the final game has no picks
+"""
+
+
+def test_completed_game_without_picks_records_standings():
+    from app import app, db, init_db, Match, StandingsHistory, User
+    from espn_points_calculator import ESPNPointsCalculator
+
+    init_db()
+    with app.app_context():
+        match = Match(
+            week=16, home_team_id=22, home_team_name='Philadelphia Eagles', away_team_id=4,
+            away_team_name='Dallas Cowboys', start_time='2025-12-21T19:00:00+01:00',
+            is_completed=True, home_score=27, away_score=20, winner_team_id=22
+        )
+        db.session.add(match)
+        db.session.commit()
+        match_id = match.id
+
+    ESPNPointsCalculator(app, db).on_match_completed(match_id)
+
+    with app.app_context():
+        assert StandingsHistory.query.filter_by(week=16).count() == User.query.count()
@@ -0,0 +1,85 @@
+"""
+Failure reporting of the scheduled ESPN sync jobs (metrics, job state, queue retries)
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from job_queue import DEAD
+from job_metrics import get_job_metrics
+from job_scheduler import JobScheduler, Cron
+
+
+@pytest.fixture
+def failing_espn_scheduler(monkeypatch):
+    """ESPN scheduler whose results and schedule syncs fail like an unreachable ESPN API"""
+    from app import app, db, init_db
+    from sync_worker import build_worker
+
+    init_db()
+    worker, espn_scheduler = build_worker(app, db)
+    monkeypatch.setattr(espn_scheduler.espn_sync, 'get_current_week', lambda: 3)
+    monkeypatch.setattr(espn_scheduler.espn_sync, 'sync_results', lambda week: False)
+    monkeypatch.setattr(espn_scheduler.espn_sync, 'sync_season', lambda: False)
+    yield worker, espn_scheduler
+
+    # Leave the ESPN jobs covered, so the worker tests do not catch up the failed runs
+    now = datetime.now(timezone.utc).isoformat()
+    for job_id in ('daily_espn_sync', 'weekly_schedule_sync'):
+        espn_scheduler.scheduler.state.record(job_id, 'success', now)
+
+
+def _outcomes(job_id):
+    stats = get_job_metrics().summary().get(job_id, {})
+    return stats.get('successes', 0), stats.get('failures', 0)
+
+
+def test_failing_syncs_are_recorded_as_failures(failing_espn_scheduler):
+    worker, espn_scheduler = failing_espn_scheduler
+    assert espn_scheduler.daily_sync() is False
+    assert espn_scheduler.weekly_schedule_sync() is False
+
+    scheduler = JobScheduler()
+    scheduler.add_job('daily_espn_sync', espn_scheduler.daily_sync, Cron(7, 0))
+    successes, failures = _outcomes('daily_espn_sync')
+
+    assert scheduler.run_job('daily_espn_sync', wait=True)
+    assert _outcomes('daily_espn_sync') == (successes, failures + 1)
+    assert scheduler.jobs['daily_espn_sync'].last_result == 'failed'
+
+
+def test_failed_run_keeps_last_success_and_is_caught_up(failing_espn_scheduler):
+    worker, espn_scheduler = failing_espn_scheduler
+    state = espn_scheduler.scheduler.state
+    state.record('weekly_schedule_sync', 'success', '2025-01-01T00:00:00+00:00')
+
+    job_id = worker.queue.enqueue('weekly_schedule_sync', max_attempts=1)
+    assert worker.run_once() is True
+    assert worker.queue.get(job_id)['status'] == DEAD
+
+    job_state = state.load()['weekly_schedule_sync']
+    assert job_state['last_outcome'] == 'failed'
+    assert job_state['last_success_at'] == '2025-01-01T00:00:00+00:00'
+
+    # The failed Tuesday run is not covered - the next start catches it up
+    scheduler = JobScheduler(state=state)
+    scheduler.add_job('weekly_schedule_sync', espn_scheduler.weekly_schedule_sync, Cron(7, 0, weekdays='tue'))
+    assert scheduler.catch_up() == ['weekly_schedule_sync']
+
+
+def test_failing_queued_sync_is_retried_then_dead_lettered(failing_espn_scheduler, monkeypatch):
+    import job_queue
+
+    worker, espn_scheduler = failing_espn_scheduler
+    monkeypatch.setattr(job_queue, 'RETRY_BASE_SECONDS', 0)
+
+    job_id = worker.queue.enqueue('daily_espn_sync', max_attempts=2)
+    assert worker.run_once() is True
+    job = worker.queue.get(job_id)
+    assert (job['status'], job['attempts']) == (job_queue.QUEUED, 1)
+
+    assert worker.run_once() is True
+    job = worker.queue.get(job_id)
+    assert (job['status'], job['attempts']) == (DEAD, 2)
+    assert 'daily_espn_sync reported failure' in job['last_error']
@@ -0,0 +1,29 @@
+"""
+Boot smoke test for the sync worker (python sync_worker.py)
+"""
+
+from job_queue import SUCCEEDED
+
+
+def test_worker_boots_and_runs_a_queued_job():
+    from app import app, db, init_db
+    from sync_worker import build_worker
+
+    init_db()
+    worker, espn_scheduler = build_worker(app, db)
+
+    assert {'manual_sync', 'daily_espn_sync', 'validate_incomplete_weeks', 'calculate_all_points'} <= set(worker.handlers)
+    assert worker.run_once() is False
+
+    # One results job and one live poller - the validator only runs on demand
+    espn_scheduler.start_scheduler()
+    try:
+        status = espn_scheduler.scheduler.get_status()
+        assert {job['id'] for job in status['jobs']} == {'daily_espn_sync', 'weekly_schedule_sync'}
+        assert list(status['services']) == ['espn-live-poller']
+    finally:
+        espn_scheduler.stop_scheduler()
+
+    job_id = worker.queue.enqueue('calculate_all_points')
+    assert worker.run_once() is True
+    assert worker.queue.get(job_id)['status'] == SUCCEEDED